@@ -0,0 +1,222 @@
+"""
+Indeks artefak pipeline berbasis SQLite.
+
+Setiap run mendapat run_id unik (timestamp mikrodetik + sufiks acak) yang
+juga dipakai sebagai nama file, sehingga artefak tidak saling menimpa.
+Capture, teks EN, teks ID, WAV dan laporan latensi dicatat per run_id,
+jadi pencarian "terbaru" dan "per run" cukup satu query ber-index
+tanpa glob/stat seluruh folder.
+
+Contoh:
+    python artifactStore.py            # tampilkan run terbaru
+    python artifactStore.py <run_id>   # tampilkan artefak satu run
+"""
+
+import os
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Iterable, Optional
+
+DB_PATH = os.path.join(os.getcwd(), "artifacts.sqlite3")
+
+KIND_CAPTURE = "capture"
+KIND_TEXT_EN = "text_en"
+KIND_TEXT_ID = "text_id"
+KIND_WAV = "wav"
+KIND_AUDIO_COMPACT = "audio_compact"  # WAV yang sudah dikompresi ke Ogg/Opus (tidak bisa diputar aplay)
+KIND_LATENCY = "latency"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    latency_seconds REAL
+);
+CREATE TABLE IF NOT EXISTS artifacts (
+    run_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    path TEXT NOT NULL,
+    folder TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (run_id, kind)
+);
+CREATE INDEX IF NOT EXISTS idx_runs_created ON runs (created_at);
+CREATE INDEX IF NOT EXISTS idx_artifacts_latest ON artifacts (folder, kind, created_at);
+CREATE INDEX IF NOT EXISTS idx_artifacts_path ON artifacts (path);
+"""
+
+
+def new_run_id() -> str:
+    """
+    ID run unik, diawali timestamp agar tetap urut secara leksikografis.
+    Contoh: 20251208_084846_123456_a1b2
+    """
+    return f"{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}_{uuid.uuid4().hex[:4]}"
+
+
+class ArtifactStore:
+    """
+    Pembungkus tipis koneksi SQLite (aman dipakai dari banyak thread).
+    Kegagalan indeks hanya dicetak sebagai peringatan, tidak menghentikan pipeline.
+    """
+
+    def __init__(self, db_path: str = None):
+        self.db_path = db_path or DB_PATH
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def _execute(self, sql: str, params: tuple = (), fetch: str = None):
+        try:
+            with self._lock:
+                conn = self._connection()
+                with conn:
+                    cur = conn.execute(sql, params)
+                    if fetch == "one":
+                        return cur.fetchone()
+                    if fetch == "all":
+                        return cur.fetchall()
+                    return None
+        except sqlite3.Error as exc:
+            print(f"[WARN] Indeks artefak gagal diakses: {exc}")
+            return None
+
+    # --- penulisan ---
+
+    def record(self, run_id: str, kind: str, path: str) -> None:
+        """
+        Catat satu artefak untuk run_id (menimpa artefak jenis yang sama).
+        """
+        if not run_id or not path:
+            return
+        now = time.time()
+        abs_path = os.path.abspath(path)
+        self._execute("INSERT OR IGNORE INTO runs (run_id, created_at) VALUES (?, ?)", (run_id, now))
+        self._execute(
+            "INSERT OR REPLACE INTO artifacts (run_id, kind, path, folder, created_at) VALUES (?, ?, ?, ?, ?)",
+            (run_id, kind, abs_path, os.path.dirname(abs_path), now),
+        )
+
+    def record_latency(self, run_id: str, path: str, latency_seconds: float) -> None:
+        self.record(run_id, KIND_LATENCY, path)
+        self._execute("UPDATE runs SET latency_seconds = ? WHERE run_id = ?", (latency_seconds, run_id))
+
+    def update_path(self, old_path: str, new_path: str, kind: Optional[str] = None) -> None:
+        """
+        Ganti path artefak (misal setelah file dikompresi ulang). Dengan kind,
+        jenis artefak ikut diganti (misal WAV → KIND_AUDIO_COMPACT) agar query
+        jenis lama tidak lagi mengembalikan file dengan format lain.
+        """
+        new_abs = os.path.abspath(new_path)
+        if kind is None:
+            self._execute(
+                "UPDATE artifacts SET path = ?, folder = ? WHERE path = ?",
+                (new_abs, os.path.dirname(new_abs), os.path.abspath(old_path)),
+            )
+        else:
+            self._execute(
+                "UPDATE OR REPLACE artifacts SET path = ?, folder = ?, kind = ? WHERE path = ?",
+                (new_abs, os.path.dirname(new_abs), kind, os.path.abspath(old_path)),
+            )
+
+    def forget(self, path: str) -> None:
+        """
+        Hapus artefak dari indeks (misal setelah file dihapus).
+        """
+        self._execute("DELETE FROM artifacts WHERE path = ?", (os.path.abspath(path),))
+
+    # --- query ---
+
+    def latest(
+        self,
+        kinds: Iterable[str],
+        folder: Optional[str] = None,
+        since: Optional[float] = None,
+        exclude_run_suffix: Optional[str] = None,
+    ) -> Optional[str]:
+        """
+        Path artefak terbaru dengan jenis `kinds`, opsional dibatasi satu folder,
+        dicatat sejak `since` (epoch detik), dan bukan milik run_id berakhiran
+        `exclude_run_suffix` (misal artefak fase bahaya).
+        """
+        kinds = tuple(kinds)
+        placeholders = ",".join("?" for _ in kinds)
+        sql = f"SELECT path FROM artifacts WHERE kind IN ({placeholders})"
+        params = kinds
+        if folder is not None:
+            sql += " AND folder = ?"
+            params += (os.path.abspath(folder),)
+        if since is not None:
+            sql += " AND created_at >= ?"
+            params += (since,)
+        if exclude_run_suffix:
+            escaped = exclude_run_suffix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            sql += " AND run_id NOT LIKE ? ESCAPE '\\'"
+            params += (f"%{escaped}",)
+        row = self._execute(sql + " ORDER BY created_at DESC LIMIT 1", params, fetch="one")
+        return row[0] if row else None
+
+    def get_run(self, run_id: str) -> Optional[dict]:
+        """
+        Return dict {run_id, created_at, latency_seconds, <kind>: path, ...} atau None.
+        """
+        run = self._execute(
+            "SELECT run_id, created_at, latency_seconds FROM runs WHERE run_id = ?", (run_id,), fetch="one"
+        )
+        if not run:
+            return None
+        info = {"run_id": run[0], "created_at": run[1], "latency_seconds": run[2]}
+        rows = self._execute("SELECT kind, path FROM artifacts WHERE run_id = ?", (run_id,), fetch="all") or []
+        info.update({kind: path for kind, path in rows})
+        return info
+
+    def latest_run(self) -> Optional[dict]:
+        row = self._execute("SELECT run_id FROM runs ORDER BY created_at DESC LIMIT 1", fetch="one")
+        return self.get_run(row[0]) if row else None
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_store: Optional[ArtifactStore] = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> ArtifactStore:
+    """
+    Store bersama untuk proses ini (mengikuti DB_PATH saat pertama dipanggil).
+    """
+    global _store
+    with _store_lock:
+        if _store is None or _store.db_path != DB_PATH:
+            _store = ArtifactStore(DB_PATH)
+        return _store
+
+
+def main():
+    store = get_store()
+    run = store.get_run(sys.argv[1]) if len(sys.argv) > 1 else store.latest_run()
+    if not run:
+        print("[INFO] Belum ada run yang tercatat.")
+        return
+    for key, value in run.items():
+        print(f"{key}={value}")
+
+
+if __name__ == "__main__":
+    main()
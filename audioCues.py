@@ -0,0 +1,147 @@
+"""
+Cue suara singkat yang disintesis sekali saat startup lalu disimpan sebagai
+PCM di memori, supaya pengguna langsung mendengar respons setelah menekan
+tombol (tanpa menunggu pipeline ~45 detik).
+
+Cue default:
+    processing       : "Sedang memproses."  (saat tombol ditekan)
+    still_processing : "Masih memproses."   (tombol ditekan lagi / progres berkala)
+    failed           : "Gagal."             (pipeline gagal)
+
+Cue diputar lewat jalur audio terpisah (proses aplay sendiri yang membaca
+PCM mentah dari stdin, atau winsound di Windows) sehingga tidak menunggu
+dan tidak memblokir playback utama.
+
+Konfigurasi:
+    CUE_DEVICE        : device ALSA untuk cue (default sama dengan playAudio)
+    CUE_PROGRESS_SEC  : interval cue progres selama vision (default 15, 0 = nonaktif)
+"""
+
+import io
+import os
+import shutil
+import subprocess
+import threading
+import time
+import wave
+from typing import Dict, Optional
+
+from playAudio import DEFAULT_DEVICE
+
+try:
+    import winsound
+except ImportError:
+    winsound = None
+
+CUE_PROCESSING = "processing"
+CUE_STILL_PROCESSING = "still_processing"
+CUE_FAILED = "failed"
+
+CUE_TEXTS = {
+    CUE_PROCESSING: "Sedang memproses.",
+    CUE_STILL_PROCESSING: "Masih memproses.",
+    CUE_FAILED: "Gagal.",
+}
+
+CUE_DEVICE = os.getenv("CUE_DEVICE", DEFAULT_DEVICE)
+PROGRESS_INTERVAL_SEC = float(os.getenv("CUE_PROGRESS_SEC", "15"))
+
+_ALSA_FORMATS = {1: "U8", 2: "S16_LE", 4: "S32_LE"}
+
+
+class _Cue:
+    def __init__(self, wav_bytes: bytes):
+        self.wav_bytes = wav_bytes
+        with wave.open(io.BytesIO(wav_bytes), "rb") as wav_in:
+            self.sample_rate = wav_in.getframerate()
+            self.sample_width = wav_in.getsampwidth()
+            self.channels = wav_in.getnchannels()
+            self.pcm = wav_in.readframes(wav_in.getnframes())
+
+
+class CuePlayer:
+    """
+    Cache cue PCM + pemutar non-blocking.
+
+    Parameter:
+        voice   : PiperVoice (atau RemoteVoice) yang sudah diload.
+        device  : device ALSA untuk aplay.
+        backend : "aplay", "winsound", atau None untuk deteksi otomatis.
+    """
+
+    def __init__(self, voice, device: str = CUE_DEVICE, backend: Optional[str] = None):
+        self.voice = voice
+        self.device = device
+        if backend is None:
+            backend = "winsound" if winsound is not None else ("aplay" if shutil.which("aplay") else None)
+        self.backend = backend
+        self._cues: Dict[str, _Cue] = {}
+
+    def preload(self, texts: Dict[str, str] = None) -> None:
+        """
+        Sintesis semua cue sekali (dipanggil saat startup).
+        """
+        for name, text in (texts or CUE_TEXTS).items():
+            buf = io.BytesIO()
+            try:
+                with wave.open(buf, "wb") as wav_file:
+                    self.voice.synthesize_wav(text, wav_file)
+                self._cues[name] = _Cue(buf.getvalue())
+            except Exception as exc:
+                print(f"[WARN] Gagal menyiapkan cue '{name}': {exc}")
+        print(f"[INFO] Cue audio siap: {', '.join(sorted(self._cues)) or '-'}")
+
+    def play(self, name: str) -> Optional[float]:
+        """
+        Putar cue tanpa menunggu selesai. Return time.monotonic() saat audio
+        sudah diserahkan ke pemutar, atau None bila cue/pemutar tidak tersedia.
+        """
+        cue = self._cues.get(name)
+        if cue is None or self.backend is None:
+            return None
+        try:
+            if self.backend == "winsound":
+                threading.Thread(
+                    target=winsound.PlaySound, args=(cue.wav_bytes, winsound.SND_MEMORY), daemon=True
+                ).start()
+                return time.monotonic()
+
+            proc = subprocess.Popen(
+                [
+                    "aplay", "-q", "-D", self.device, "-t", "raw",
+                    "-f", _ALSA_FORMATS.get(cue.sample_width, "S16_LE"),
+                    "-r", str(cue.sample_rate), "-c", str(cue.channels), "-",
+                ],
+                stdin=subprocess.PIPE,
+            )
+            handed_over = time.monotonic()
+            threading.Thread(target=self._feed, args=(proc, cue.pcm), daemon=True).start()
+            return handed_over
+        except Exception as exc:
+            print(f"[WARN] Gagal memutar cue '{name}': {exc}")
+            return None
+
+    @staticmethod
+    def _feed(proc: subprocess.Popen, pcm: bytes) -> None:
+        try:
+            proc.stdin.write(pcm)
+            proc.stdin.close()
+            proc.wait()
+        except Exception:
+            proc.kill()
+
+    def start_progress(self, interval: float = PROGRESS_INTERVAL_SEC) -> threading.Event:
+        """
+        Putar CUE_STILL_PROCESSING setiap `interval` detik sampai Event yang
+        dikembalikan di-set. interval <= 0 menonaktifkan cue progres.
+        """
+        stop = threading.Event()
+        if interval <= 0 or CUE_STILL_PROCESSING not in self._cues:
+            return stop
+
+        def _loop():
+            while not stop.wait(interval):
+                self.play(CUE_STILL_PROCESSING)
+
+        threading.Thread(target=_loop, name="cue-progress", daemon=True).start()
+        return stop
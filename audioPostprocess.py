@@ -0,0 +1,168 @@
+"""
+Post-processing WAV hasil Piper sebelum diputar: buang hening di awal/akhir
+dan persingkat jeda panjang antar-kalimat, supaya waktu dengar pengguna
+tidak habis untuk hening.
+
+Semua operasi tervektorisasi dengan NumPy pada frame 10 ms:
+1. energi RMS per frame → frame bersuara bila di atas ambang (dBFS)
+2. hening di awal/akhir dipotong (disisakan AUDIO_EDGE_PAD_MS)
+3. jeda di tengah yang lebih panjang dari AUDIO_MAX_PAUSE_MS dipendekkan
+   menjadi AUDIO_MAX_PAUSE_MS (separuh awal + separuh akhir jeda dipertahankan
+   supaya transisi tetap halus)
+
+File ditulis ulang di tempat. Durasi yang dihemat dan biaya proses
+dikembalikan untuk dicatat ke laporan latensi.
+
+Konfigurasi:
+    AUDIO_POSTPROCESS   : 0 untuk menonaktifkan (default 1)
+    AUDIO_SILENCE_DB    : ambang hening dalam dBFS (default -45)
+    AUDIO_MAX_PAUSE_MS  : jeda terpanjang yang dipertahankan (default 350)
+    AUDIO_EDGE_PAD_MS   : hening yang disisakan di awal/akhir (default 60)
+
+Coba langsung:
+    python audioPostprocess.py audios/output_xxx.wav
+"""
+
+import os
+import sys
+import time
+import wave
+from typing import Dict, Optional
+
+from spanTracer import traced
+
+ENABLED = os.getenv("AUDIO_POSTPROCESS", "1") != "0"
+SILENCE_DB = float(os.getenv("AUDIO_SILENCE_DB", "-45"))
+MAX_PAUSE_MS = int(os.getenv("AUDIO_MAX_PAUSE_MS", "350"))
+EDGE_PAD_MS = int(os.getenv("AUDIO_EDGE_PAD_MS", "60"))
+FRAME_MS = 10
+
+
+def compute_keep_mask(voiced, max_pause_frames: int, edge_pad_frames: int):
+    """
+    Dari mask frame bersuara (bool), hitung frame yang dipertahankan.
+    Return array bool dengan panjang sama; semua False bila tidak ada suara.
+    """
+    import numpy as np
+
+    n = voiced.size
+    keep = np.zeros(n, dtype=bool)
+    voiced_idx = np.flatnonzero(voiced)
+    if voiced_idx.size == 0:
+        return keep
+
+    first = max(voiced_idx[0] - edge_pad_frames, 0)
+    last = min(voiced_idx[-1] + edge_pad_frames, n - 1)
+    keep[first:last + 1] = True
+
+    # run-length hening di antara frame bersuara
+    inner = voiced[voiced_idx[0]:voiced_idx[-1] + 1]
+    boundaries = np.flatnonzero(np.diff(inner.astype(np.int8))) + 1
+    starts = np.concatenate(([0], boundaries))
+    lengths = np.diff(np.concatenate((starts, [inner.size])))
+    silent_runs = ~inner[starts]
+
+    long_runs = silent_runs & (lengths > max_pause_frames)
+    if not long_runs.any():
+        return keep
+
+    # posisi tiap frame di dalam run-nya, tanpa loop Python
+    run_of_frame = np.repeat(np.arange(starts.size), lengths)
+    pos = np.arange(inner.size) - starts[run_of_frame]
+    run_len = lengths[run_of_frame]
+    head = max_pause_frames // 2
+    tail = max_pause_frames - head
+    drop = long_runs[run_of_frame] & (pos >= head) & (pos < run_len - tail)
+    keep[voiced_idx[0]:voiced_idx[-1] + 1] &= ~drop
+    return keep
+
+
+@traced("audio_postprocess")
+def postprocess_wav(
+    wav_path: str,
+    silence_db: float = SILENCE_DB,
+    max_pause_ms: int = MAX_PAUSE_MS,
+    edge_pad_ms: int = EDGE_PAD_MS,
+) -> Dict[str, float]:
+    """
+    Trim hening dan persingkat jeda pada file WAV (PCM 16-bit), ditulis ulang
+    di tempat. Return metrik {audio_original_seconds, audio_seconds,
+    audio_saved_seconds, audio_postprocess_seconds}; kosong bila dilewati.
+    """
+    if not ENABLED or not wav_path:
+        return {}
+    try:
+        import numpy as np
+    except ImportError:
+        print("[WARN] numpy belum terpasang, post-processing audio dilewati.")
+        return {}
+
+    t0 = time.perf_counter()
+    try:
+        with wave.open(wav_path, "rb") as wav_in:
+            params = wav_in.getparams()
+            raw = wav_in.readframes(params.nframes)
+    except Exception as exc:
+        print(f"[WARN] Gagal membaca WAV untuk post-processing: {exc}")
+        return {}
+    if params.sampwidth != 2 or params.nframes == 0:
+        return {}
+
+    samples = np.frombuffer(raw, dtype=np.int16).reshape(-1, params.nchannels)
+    frame_len = max(params.framerate * FRAME_MS // 1000, 1)
+    n_frames = -(-samples.shape[0] // frame_len)
+    padded = np.zeros((n_frames * frame_len, params.nchannels), dtype=np.int16)
+    padded[:samples.shape[0]] = samples
+
+    frames = padded.reshape(n_frames, frame_len * params.nchannels).astype(np.float32)
+    rms = np.sqrt(np.mean(frames * frames, axis=1)) / 32768.0
+    threshold = 10 ** (silence_db / 20.0)
+    keep = compute_keep_mask(
+        rms > threshold,
+        max_pause_frames=max(max_pause_ms // FRAME_MS, 1),
+        edge_pad_frames=max(edge_pad_ms // FRAME_MS, 0),
+    )
+    if not keep.any():
+        return {}  # seluruhnya hening: biarkan apa adanya
+
+    kept = padded.reshape(n_frames, frame_len, params.nchannels)[keep].reshape(-1, params.nchannels)
+    if keep[-1]:
+        kept = kept[:kept.shape[0] - (padded.shape[0] - samples.shape[0])]  # buang padding nol
+
+    original_seconds = samples.shape[0] / params.framerate
+    processed_seconds = kept.shape[0] / params.framerate
+    if kept.shape[0] < samples.shape[0]:
+        try:
+            with wave.open(wav_path, "wb") as wav_out:
+                wav_out.setnchannels(params.nchannels)
+                wav_out.setsampwidth(params.sampwidth)
+                wav_out.setframerate(params.framerate)
+                wav_out.writeframes(kept.tobytes())
+        except Exception as exc:
+            print(f"[WARN] Gagal menulis WAV hasil post-processing: {exc}")
+            return {}
+
+    stats = {
+        "audio_original_seconds": original_seconds,
+        "audio_seconds": processed_seconds,
+        "audio_saved_seconds": original_seconds - processed_seconds,
+        "audio_postprocess_seconds": time.perf_counter() - t0,
+    }
+    print(f"[INFO] Audio dipangkas {stats['audio_saved_seconds']:.2f} s "
+          f"({original_seconds:.2f} → {processed_seconds:.2f} s) "
+          f"dalam {stats['audio_postprocess_seconds'] * 1000:.1f} ms.")
+    return stats
+
+
+def main(argv: Optional[list] = None):
+    paths = (argv if argv is not None else sys.argv[1:])
+    if not paths:
+        print("Pemakaian: python audioPostprocess.py file.wav [file2.wav ...]")
+        return
+    for path in paths:
+        for key, value in postprocess_wav(path).items():
+            print(f"{path}: {key}={value:.3f}")
+
+
+if __name__ == "__main__":
+    main()
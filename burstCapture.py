@@ -0,0 +1,174 @@
+"""
+Capture burst: ambil beberapa frame berturut-turut lalu kirim hanya frame
+paling tajam dengan eksposur wajar.
+
+Saat pengguna berjalan, satu frame dari cap.read() sering kabur karena
+gerakan, dan satu panggilan vision (puluhan detik) terbuang untuk gambar
+yang tidak berguna. Mode burst:
+
+1. baca hingga CAPTURE_BURST_FRAMES frame, berhenti lebih awal bila
+   CAPTURE_BURST_BUDGET_SEC terlampaui (minimal satu frame selalu diambil)
+2. tiap frame diperkecil ke lebar CAPTURE_SCORE_WIDTH dan diubah ke
+   grayscale; frame penuh disimpan apa adanya
+3. semua thumbnail dinilai sekaligus (array N x h x w, NumPy tervektorisasi):
+       ketajaman = variansi Laplacian 4-tetangga
+       eksposur  = (1 - |rata-rata kecerahan - 0.5|) x (1 - fraksi piksel terpotong)
+       skor      = ketajaman x eksposur
+4. frame dengan skor tertinggi dipakai
+
+Ketajaman dinilai pada thumbnail supaya biayanya kecil dan tidak bergantung
+pada resolusi kamera; noise sensor juga teredam oleh downscale.
+
+Konfigurasi:
+    CAPTURE_BURST_FRAMES     : jumlah frame per burst (default 1 = mode burst mati)
+    CAPTURE_BURST_BUDGET_SEC : batas waktu membaca burst (default 0.5)
+    CAPTURE_SCORE_WIDTH      : lebar thumbnail penilaian (default 320)
+
+Coba langsung pada file gambar (urut dari skor tertinggi):
+    python burstCapture.py testing-data/*.jpg
+"""
+
+import os
+import sys
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from spanTracer import span
+
+BURST_FRAMES = int(os.getenv("CAPTURE_BURST_FRAMES", "1"))
+BURST_BUDGET_SEC = float(os.getenv("CAPTURE_BURST_BUDGET_SEC", "0.5"))
+SCORE_WIDTH = int(os.getenv("CAPTURE_SCORE_WIDTH", "320"))
+CLIP_LOW, CLIP_HIGH = 5, 250  # piksel <= / >= nilai ini dianggap hitam/putih terpotong
+
+
+@dataclass
+class FrameScore:
+    index: int
+    sharpness: float    # variansi Laplacian thumbnail (skala piksel 0-255)
+    brightness: float   # rata-rata kecerahan 0-1
+    clipped: float      # fraksi piksel terpotong (terlalu gelap/terang)
+    exposure: float     # faktor eksposur 0-1
+    score: float
+
+
+def thumbnail(frame, width: int = SCORE_WIDTH):
+    """
+    Thumbnail grayscale uint8 selebar `width` (tidak diperbesar). Frame
+    besar lebih dulu diambil tiap n piksel (slicing, tanpa salinan) sampai
+    tersisa ~2x lebar target, supaya INTER_AREA tidak merata-ratakan jutaan piksel.
+    """
+    import cv2
+
+    h, w = frame.shape[:2]
+    step = w // (width * 2)
+    if step > 1:
+        frame = frame[::step, ::step]
+        h, w = frame.shape[:2]
+    if w > width:
+        frame = cv2.resize(frame, (width, max(round(h * width / w), 1)), interpolation=cv2.INTER_AREA)
+    return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+
+
+def score_thumbnails(thumbs: list) -> List[FrameScore]:
+    """
+    Nilai semua thumbnail sekaligus. Thumbnail berbeda ukuran (jarang, misal
+    kamera berganti mode) dinilai per kelompok ukuran.
+    """
+    import numpy as np
+
+    groups = {}
+    for index, thumb in enumerate(thumbs):
+        groups.setdefault(thumb.shape, []).append(index)
+
+    scores: List[Optional[FrameScore]] = [None] * len(thumbs)
+    for indices in groups.values():
+        stack = np.stack([thumbs[i] for i in indices]).astype(np.float32)
+        if stack.shape[1] < 3 or stack.shape[2] < 3:
+            laplacian = np.zeros((len(indices), 1, 1), dtype=np.float32)
+        else:
+            laplacian = (
+                stack[:, :-2, 1:-1] + stack[:, 2:, 1:-1] + stack[:, 1:-1, :-2] + stack[:, 1:-1, 2:]
+                - 4.0 * stack[:, 1:-1, 1:-1]
+            )
+        sharpness = laplacian.reshape(len(indices), -1).var(axis=1)
+        flat = stack.reshape(len(indices), -1)
+        brightness = flat.mean(axis=1) / 255.0
+        clipped = ((flat <= CLIP_LOW) | (flat >= CLIP_HIGH)).mean(axis=1)
+        exposure = (1.0 - np.abs(brightness - 0.5)) * (1.0 - clipped)
+        for k, index in enumerate(indices):
+            scores[index] = FrameScore(
+                index=index,
+                sharpness=float(sharpness[k]),
+                brightness=float(brightness[k]),
+                clipped=float(clipped[k]),
+                exposure=float(exposure[k]),
+                score=float(sharpness[k] * exposure[k]),
+            )
+    return scores
+
+
+def read_burst(cap, frames: int = BURST_FRAMES, budget_sec: float = BURST_BUDGET_SEC) -> Tuple[object, dict]:
+    """
+    Baca burst dari cv2.VideoCapture yang sudah terbuka dan pilih frame terbaik.
+    Return (frame, info) atau (None, info) bila tidak ada frame terbaca.
+    info: capture_burst_frames, capture_burst_seconds, capture_scoring_seconds,
+    capture_best_index, capture_sharpness, capture_exposure, capture_score.
+    """
+    captured, thumbs = [], []
+    scoring_seconds = 0.0
+    start = time.perf_counter()
+    with span("camera_burst", frames=frames):
+        for _ in range(max(frames, 1)):
+            ret, frame = cap.read()
+            if ret and frame is not None:
+                t0 = time.perf_counter()
+                thumbs.append(thumbnail(frame))
+                scoring_seconds += time.perf_counter() - t0
+                captured.append(frame)
+            if captured and time.perf_counter() - start >= budget_sec:
+                break
+    info = {"capture_burst_frames": len(captured), "capture_burst_seconds": time.perf_counter() - start}
+    if not captured:
+        return None, info
+
+    t0 = time.perf_counter()
+    with span("frame_scoring", frames=len(thumbs)):
+        scores = score_thumbnails(thumbs)
+        best = max(scores, key=lambda s: s.score)
+    info.update(
+        capture_scoring_seconds=scoring_seconds + time.perf_counter() - t0,
+        capture_best_index=best.index,
+        capture_sharpness=best.sharpness,
+        capture_exposure=best.exposure,
+        capture_score=best.score,
+    )
+    return captured[best.index], info
+
+
+def main(argv: Optional[list] = None):
+    import cv2
+
+    paths = argv if argv is not None else sys.argv[1:]
+    if not paths:
+        print("Pemakaian: python burstCapture.py gambar1.jpg [gambar2.jpg ...]")
+        return
+    thumbs, names = [], []
+    for path in paths:
+        frame = cv2.imread(path, cv2.IMREAD_COLOR)
+        if frame is None:
+            print(f"[WARN] Gambar tidak bisa dibaca: {path}")
+            continue
+        thumbs.append(thumbnail(frame))
+        names.append(path)
+    t0 = time.perf_counter()
+    scores = score_thumbnails(thumbs)
+    elapsed = time.perf_counter() - t0
+    for s in sorted(scores, key=lambda s: s.score, reverse=True):
+        print(f"skor {s.score:9.1f}  tajam {s.sharpness:8.1f}  terang {s.brightness:.2f}  "
+              f"terpotong {s.clipped:.3f}  {names[s.index]}")
+    print(f"[INFO] {len(scores)} gambar dinilai dalam {elapsed * 1000:.1f} ms.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+"""
+Deteksi kamera dengan probing paralel dan profil perangkat yang disimpan.
+
+- Indeks kandidat (default 0-9) diprobe bersamaan di thread daemon masing-masing,
+  dengan batas waktu total; indeks yang macet saat dibuka cukup ditinggalkan.
+- Untuk tiap kamera dicatat backend OpenCV, mode bawaan driver, resolusi
+  yang didukung (dari CANDIDATE_RESOLUTIONS) dan FPS yang dilaporkan driver.
+- Profil kamera terpilih disimpan ke camera_profile.json sehingga saat
+  startup kamera langsung dibuka ulang di indeks/backend/resolusi yang sama
+  tanpa probing. Probing ulang hanya dilakukan bila profil tidak ada atau
+  kamera di profil gagal dibuka.
+
+Konfigurasi:
+    CAMERA_PROFILE_PATH   : lokasi profil (default ./camera_profile.json)
+    CAMERA_PROBE_INDICES  : indeks kandidat, misal "0,1,2" (default 0-9)
+    CAMERA_PROBE_TIMEOUT  : batas waktu probing total (detik, default 5)
+    CAMERA_WIDTH / CAMERA_HEIGHT : resolusi yang diinginkan
+                            (default: mode bawaan driver, atau 640x480 bila
+                            driver tidak melaporkannya; resolusi lebih besar
+                            menambah waktu capture, tulis PNG dan bandwidth USB)
+
+Contoh:
+    python cameraDiscovery.py            # probe ulang dan simpan profil
+    python cameraDiscovery.py --show     # tampilkan profil tersimpan
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+PROFILE_PATH = os.getenv("CAMERA_PROFILE_PATH", os.path.join(os.getcwd(), "camera_profile.json"))
+PROBE_INDICES = [
+    int(index) for index in os.getenv("CAMERA_PROBE_INDICES", ",".join(str(i) for i in range(10))).split(",")
+    if index.strip()
+]
+PROBE_TIMEOUT_SEC = float(os.getenv("CAMERA_PROBE_TIMEOUT", "5"))
+CAMERA_WIDTH = int(os.getenv("CAMERA_WIDTH", "0"))
+CAMERA_HEIGHT = int(os.getenv("CAMERA_HEIGHT", "0"))
+
+FALLBACK_RESOLUTION = (640, 480)
+CANDIDATE_RESOLUTIONS: List[Tuple[int, int]] = [
+    (640, 480),
+    (1280, 720),
+    (1920, 1080),
+]
+
+_profile_cache: Optional[dict] = None
+_profile_lock = threading.Lock()
+
+
+def _backend_id(name: Optional[str]) -> int:
+    """Nama backend (misal "V4L2", "DSHOW") → konstanta cv2.CAP_*; CAP_ANY bila tidak dikenal."""
+    import cv2
+
+    if not name:
+        return cv2.CAP_ANY
+    return getattr(cv2, f"CAP_{name.upper()}", cv2.CAP_ANY)
+
+
+def _set_resolution(cap, width: int, height: int) -> Tuple[int, int]:
+    import cv2
+
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+    return int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+
+
+def probe_device(index: int) -> Optional[dict]:
+    """
+    Buka satu indeks kamera dan catat backend, resolusi yang didukung dan FPS.
+    Return dict info atau None bila tidak bisa dibuka / tidak menghasilkan frame.
+    """
+    import cv2
+
+    cap = cv2.VideoCapture(index)
+    try:
+        if not cap.isOpened():
+            return None
+        ok, _frame = cap.read()
+        if not ok:
+            return None
+        try:
+            backend = cap.getBackendName()
+        except Exception:
+            backend = None
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        default_mode = {
+            "width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            "fps": round(fps, 2) if fps > 0 else None,
+        }
+
+        modes = []
+        for width, height in CANDIDATE_RESOLUTIONS:
+            actual = _set_resolution(cap, width, height)
+            if actual == (width, height):
+                fps = cap.get(cv2.CAP_PROP_FPS)
+                modes.append({"width": width, "height": height, "fps": round(fps, 2) if fps > 0 else None})
+        if not modes and default_mode["width"] and default_mode["height"]:
+            # driver menolak semua kandidat: catat resolusi bawaannya
+            modes.append(dict(default_mode))
+        return {"index": index, "backend": backend, "default_mode": default_mode, "modes": modes}
+    finally:
+        cap.release()
+
+
+def discover_devices(indices: List[int] = None, timeout: float = PROBE_TIMEOUT_SEC) -> List[dict]:
+    """
+    Probe semua indeks secara paralel. Indeks yang belum selesai saat
+    batas waktu habis dianggap tidak tersedia (thread daemon dibiarkan).
+    """
+    indices = PROBE_INDICES if indices is None else indices
+    results: Dict[int, Optional[dict]] = {}
+    lock = threading.Lock()
+
+    def _worker(index: int):
+        try:
+            info = probe_device(index)
+        except Exception as exc:
+            print(f"[WARN] Probing kamera index {index} gagal: {exc}")
+            info = None
+        with lock:
+            results[index] = info
+
+    threads = [
+        threading.Thread(target=_worker, args=(index,), name=f"camera-probe-{index}", daemon=True)
+        for index in indices
+    ]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(max(timeout - (time.monotonic() - started), 0.0))
+
+    with lock:
+        pending = [index for index in indices if index not in results]
+        devices = [results[index] for index in indices if results.get(index)]
+    if pending:
+        print(f"[WARN] Probing kamera melewati {timeout:.1f} detik untuk index: {pending}")
+    print(f"[INFO] Probing kamera selesai dalam {time.monotonic() - started:.2f} detik, "
+          f"ditemukan {len(devices)} kamera.")
+    return devices
+
+
+def choose_profile(devices: List[dict], width: int = CAMERA_WIDTH, height: int = CAMERA_HEIGHT) -> Optional[dict]:
+    """
+    Pilih kamera dengan indeks terkecil beserta resolusinya: resolusi yang
+    dikonfigurasi bila didukung, selain itu mode bawaan driver (seperti
+    cap.read() tanpa pengaturan), atau FALLBACK_RESOLUTION bila driver tidak
+    melaporkannya. Mode lain hanya dipakai bila dikonfigurasi eksplisit.
+    """
+    if not devices:
+        return None
+    device = min(devices, key=lambda info: info["index"])
+    mode = None
+    if width and height:
+        mode = next((m for m in device["modes"] if (m["width"], m["height"]) == (width, height)), None)
+        if mode is None:
+            print(f"[WARN] Resolusi {width}x{height} tidak didukung kamera index {device['index']}, "
+                  f"memakai mode bawaan.")
+    source = "configured" if mode is not None else "driver_default"
+    if mode is None:
+        default = device.get("default_mode") or {}
+        if default.get("width") and default.get("height"):
+            mode = default
+        else:
+            mode = {"width": FALLBACK_RESOLUTION[0], "height": FALLBACK_RESOLUTION[1], "fps": None}
+            source = "fallback"
+    return {
+        "index": device["index"],
+        "backend": device["backend"],
+        "width": mode["width"],
+        "height": mode["height"],
+        "fps": mode["fps"],
+        "mode_source": source,
+        "probed_at": datetime.now().isoformat(timespec="seconds"),
+        "devices": devices,
+    }
+
+
+def save_profile(profile: dict, path: str = PROFILE_PATH) -> None:
+    try:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(profile, f, indent=2)
+        print(f"[INFO] Profil kamera disimpan: {path}")
+    except Exception as exc:
+        print(f"[WARN] Gagal menyimpan profil kamera: {exc}")
+
+
+def load_profile(path: str = PROFILE_PATH) -> Optional[dict]:
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception as exc:
+        print(f"[WARN] Profil kamera tidak bisa dibaca ({exc}), probing ulang.")
+        return None
+
+
+def rediscover(path: str = PROFILE_PATH) -> Optional[dict]:
+    """Probe ulang semua kamera, simpan profil terpilih dan return profil tersebut."""
+    global _profile_cache
+    profile = choose_profile(discover_devices())
+    if profile is not None:
+        save_profile(profile, path)
+    with _profile_lock:
+        _profile_cache = profile
+    return profile
+
+
+def get_profile(path: str = PROFILE_PATH) -> Optional[dict]:
+    """Profil dari cache memori → file → probing (urutan tercepat dulu)."""
+    global _profile_cache
+    with _profile_lock:
+        if _profile_cache is not None:
+            return _profile_cache
+        _profile_cache = load_profile(path)
+        if _profile_cache is not None and "mode_source" not in _profile_cache:
+            # profil lama memilih resolusi terbesar; probe ulang agar kembali ke mode bawaan
+            print("[INFO] Profil kamera versi lama, probing ulang.")
+            _profile_cache = None
+        if _profile_cache is not None:
+            return _profile_cache
+    return rediscover(path)
+
+
+def _open_with_profile(profile: dict):
+    import cv2
+
+    cap = cv2.VideoCapture(profile["index"], _backend_id(profile.get("backend")))
+    if not cap.isOpened():
+        cap.release()
+        return None
+    _set_resolution(cap, profile["width"], profile["height"])
+    return cap
+
+
+def open_camera():
+    """
+    Buka kamera sesuai profil tersimpan. Bila gagal, probe ulang sekali.
+    Return (cv2.VideoCapture, profile) atau (None, profile/None).
+    """
+    profile = get_profile()
+    if profile is None:
+        return None, None
+    cap = _open_with_profile(profile)
+    if cap is not None:
+        return cap, profile
+
+    print(f"[WARN] Kamera index {profile['index']} dari profil tidak bisa dibuka, probing ulang...")
+    profile = rediscover()
+    if profile is None:
+        return None, None
+    return _open_with_profile(profile), profile
+
+
+def print_devices(devices: List[dict]) -> None:
+    if not devices:
+        print("Tidak ada webcam yang ditemukan.")
+        return
+    print("Webcam yang tersedia:")
+    for device in devices:
+        modes = ", ".join(
+            f"{m['width']}x{m['height']}" + (f"@{m['fps']:g}" if m["fps"] else "") for m in device["modes"]
+        )
+        print(f"  index {device['index']} ({device['backend'] or '?'}): {modes}")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Deteksi kamera dan simpan profil perangkat.")
+    parser.add_argument("--show", action="store_true", help="Tampilkan profil tersimpan tanpa probing.")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.show:
+        profile = load_profile()
+        if profile is None:
+            print(f"Belum ada profil kamera di {PROFILE_PATH}.")
+            return
+        print_devices(profile.get("devices", []))
+        print(f"Profil terpilih: index {profile['index']}, {profile['width']}x{profile['height']}, "
+              f"backend {profile.get('backend') or '?'}")
+        return
+
+    profile = rediscover()
+    print_devices(profile["devices"] if profile else [])
+    if profile:
+        print(f"Profil terpilih: index {profile['index']}, {profile['width']}x{profile['height']}")
+
+
+if __name__ == "__main__":
+    main()
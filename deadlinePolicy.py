@@ -0,0 +1,286 @@
+"""
+Anggaran latensi tekan-tombol → suara beserta fallback saat anggaran terlampaui.
+
+Konfigurasi (environment variable, detik):
+    PIPELINE_TYPICAL_VISION_SEC      : durasi vision tipikal terukur di perangkat
+                                       (default 36, latency di outputs-time/ Jetson)
+    PIPELINE_DEADLINE_SEC            : batas total press-to-speech (default = jumlah
+                                       anggaran tahap + cadangan fallback + capture,
+                                       75 dengan default lain; 0 = nonaktif)
+    PIPELINE_VISION_BUDGET_SEC       : anggaran tahap vision (default 1.25 x vision
+                                       tipikal = 45)
+    PIPELINE_TRANSLATION_BUDGET_SEC  : anggaran tahap terjemahan (default 8)
+    PIPELINE_TTS_BUDGET_SEC          : anggaran tahap TTS (default 10, hanya dicatat)
+    PIPELINE_VISION_FALLBACKS        : urutan fallback vision
+                                       (default "short_prompt,fast_model,cached")
+    PIPELINE_VISION_FALLBACK_BUDGET_SEC : waktu yang disisihkan dari percobaan
+                                       vision utama untuk fallback ber-HTTP
+                                       (default 8, ditambah MIN_ATTEMPT_SEC)
+    OLLAMA_FAST_MODEL                : model untuk fallback fast_model (default = MODEL_NAME)
+    PIPELINE_CACHED_MAX_AGE_SEC      : umur maksimum deskripsi untuk fallback cached
+                                       (default 300)
+
+Percobaan vision utama dibatasi supaya setelah timeout masih tersisa
+MIN_ATTEMPT_SEC + PIPELINE_VISION_FALLBACK_BUDGET_SEC untuk fallback
+ber-HTTP (hanya bila short_prompt/fast_model ada di urutan fallback).
+Bila vision melewati anggarannya, fallback dicoba berurutan selama sisa
+deadline masih cukup:
+    short_prompt : ulangi dengan prompt pendek dan jumlah token dibatasi
+    fast_model   : profil model cepat (OLLAMA_FAST_MODEL, gambar lebih kecil)
+    cached       : deskripsi terakhir yang berhasil (dari proses ini atau run
+                   pipeline live di outputs-EN/, bukan fase bahaya/batch) yang
+                   belum lebih tua dari PIPELINE_CACHED_MAX_AGE_SEC, diucapkan
+                   dengan awalan "Tampilan sebelumnya."
+Bila terjemahan gagal atau melewati anggaran, teks bahasa Inggris yang diucapkan.
+Semua deadline miss dan fallback dicatat ke laporan latensi (lewat `extra`).
+"""
+
+import os
+import threading
+import time
+from typing import List, Optional, Tuple
+
+from artifactStore import KIND_TEXT_EN, get_store
+from generateText import HAZARD_SUFFIX, MODEL_NAME, OUTPUT_DIR_EN, PreparedImage, generate_text_from_image_path
+
+STAGE_VISION = "vision_generate"
+STAGE_TRANSLATION = "translation"
+STAGE_TTS = "tts"
+
+TYPICAL_VISION_SEC = float(os.getenv("PIPELINE_TYPICAL_VISION_SEC", "36"))
+VISION_BUDGET_FACTOR = 1.25   # ruang di atas durasi tipikal sebelum dianggap lambat
+CAPTURE_ALLOWANCE_SEC = 2.0   # capture berjalan sebelum vision di dalam deadline yang sama
+STAGE_BUDGETS = {
+    STAGE_VISION: float(os.getenv("PIPELINE_VISION_BUDGET_SEC", str(TYPICAL_VISION_SEC * VISION_BUDGET_FACTOR))),
+    STAGE_TRANSLATION: float(os.getenv("PIPELINE_TRANSLATION_BUDGET_SEC", "8")),
+    STAGE_TTS: float(os.getenv("PIPELINE_TTS_BUDGET_SEC", "10")),
+}
+VISION_FALLBACKS = [
+    name.strip()
+    for name in os.getenv("PIPELINE_VISION_FALLBACKS", "short_prompt,fast_model,cached").split(",")
+    if name.strip()
+]
+FAST_MODEL_NAME = os.getenv("OLLAMA_FAST_MODEL", MODEL_NAME)
+FALLBACK_BUDGET_SEC = float(os.getenv("PIPELINE_VISION_FALLBACK_BUDGET_SEC", "8"))
+HTTP_FALLBACKS = ("short_prompt", "fast_model")
+FALLBACK_NAMES = HTTP_FALLBACKS + ("cached", "english")  # english = teks EN diucapkan tanpa terjemahan
+CACHED_MAX_AGE_SEC = float(os.getenv("PIPELINE_CACHED_MAX_AGE_SEC", "300"))
+
+SHORT_PROMPT = (
+    "You are a visually impaired assistant. In at most two short sentences, "
+    "say what is in front and whether there is any danger."
+)
+FALLBACK_OPTIONS = {"num_predict": 48}
+FAST_MODEL_MAX_SIDE = 448
+MIN_ATTEMPT_SEC = 2.0        # sisa waktu minimum agar fallback ber-HTTP layak dicoba
+TIMEOUT_SLACK_SEC = 0.05     # toleransi saat menilai apakah kegagalan karena timeout
+PREVIOUS_VIEW_NOTICE = {True: "Tampilan sebelumnya.", False: "Previous view."}
+
+
+def fallback_reserve(fallbacks: List[str] = None) -> float:
+    """Waktu yang disisihkan dari percobaan vision utama untuk fallback ber-HTTP."""
+    fallbacks = VISION_FALLBACKS if fallbacks is None else fallbacks
+    if not any(name in HTTP_FALLBACKS for name in fallbacks):
+        return 0.0
+    return MIN_ATTEMPT_SEC + FALLBACK_BUDGET_SEC
+
+
+def default_deadline() -> float:
+    """
+    Deadline yang memberi percobaan vision utama anggaran penuhnya: capture +
+    semua anggaran tahap + cadangan fallback. Dengan deadline yang lebih kecil,
+    vision tipikal sudah terpotong dan tekanan biasa berakhir di fallback.
+    """
+    return CAPTURE_ALLOWANCE_SEC + sum(STAGE_BUDGETS.values()) + fallback_reserve()
+
+
+DEADLINE_SEC = float(os.getenv("PIPELINE_DEADLINE_SEC") or default_deadline())
+
+_last_description: Optional[Tuple[str, float]] = None  # (teks, waktu epoch)
+_last_lock = threading.Lock()
+
+
+def remember_description(text: str) -> None:
+    """Simpan deskripsi EN terakhir yang berhasil (untuk fallback cached)."""
+    global _last_description
+    with _last_lock:
+        _last_description = (text, time.time())
+
+
+def cached_description(max_age: float = None) -> Optional[str]:
+    """
+    Deskripsi terakhir dari memori, atau dari indeks artefak bila proses baru
+    mulai. Hanya deskripsi yang belum lebih tua dari max_age (default
+    CACHED_MAX_AGE_SEC); dari indeks hanya teks run live di OUTPUT_DIR_EN
+    (bukan hasil batch di folder lain) dan bukan teks fase bahaya.
+    """
+    since = time.time() - (CACHED_MAX_AGE_SEC if max_age is None else max_age)
+    with _last_lock:
+        if _last_description and _last_description[1] >= since:
+            return _last_description[0]
+    path = get_store().latest((KIND_TEXT_EN,), folder=OUTPUT_DIR_EN, since=since,
+                              exclude_run_suffix=HAZARD_SUFFIX)
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read().strip() or None
+    except Exception:
+        return None
+
+
+class DeadlineTracker:
+    """
+    Melacak sisa waktu satu job dan mencatat miss/fallback.
+    """
+
+    def __init__(self, deadline_sec: float = DEADLINE_SEC, budgets: dict = None,
+                 vision_reserve: Optional[float] = None):
+        self.deadline_sec = deadline_sec
+        self.budgets = dict(STAGE_BUDGETS if budgets is None else budgets)
+        self.vision_reserve = fallback_reserve() if vision_reserve is None else vision_reserve
+        self.started = time.monotonic()
+        self.misses: List[str] = []
+        self.fallbacks: List[str] = []
+        self.previous_view = False
+
+    @property
+    def enabled(self) -> bool:
+        return self.deadline_sec > 0
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    def remaining(self) -> float:
+        return self.deadline_sec - self.elapsed()
+
+    def reserve_after(self, stage: str) -> float:
+        """Total anggaran tahap-tahap sesudah `stage`."""
+        order = [STAGE_VISION, STAGE_TRANSLATION, STAGE_TTS]
+        after = order[order.index(stage) + 1:] if stage in order else []
+        return sum(self.budgets.get(name, 0.0) for name in after)
+
+    def budget(self, stage: str) -> Optional[float]:
+        """
+        Batas waktu tahap: anggaran tahap, dipotong oleh sisa deadline
+        dikurangi cadangan untuk tahap sesudahnya. Untuk vision, cadangan
+        fallback (vision_reserve) ikut dikurangi supaya fallback ber-HTTP
+        masih sempat dicoba setelah timeout. None bila nonaktif.
+        """
+        if not self.enabled:
+            return None
+        available = self.remaining() - self.reserve_after(stage)
+        if stage == STAGE_VISION:
+            available -= self.vision_reserve
+        return max(min(self.budgets.get(stage, available), available), 0.0)
+
+    def check(self, stage: str, duration: Optional[float]) -> bool:
+        """Catat miss bila durasi tahap melewati anggarannya. Return True bila miss."""
+        if not self.enabled or duration is None:
+            return False
+        if duration > self.budgets.get(stage, float("inf")):
+            self.miss(stage)
+            return True
+        return False
+
+    def miss(self, stage: str) -> None:
+        if stage not in self.misses:
+            self.misses.append(stage)
+            print(f"[DEADLINE] Tahap {stage} melewati anggaran.")
+
+    def fallback(self, name: str) -> None:
+        if name not in FALLBACK_NAMES:
+            raise ValueError(f"Fallback tidak dikenal: {name}")
+        self.fallbacks.append(name)
+        print(f"[DEADLINE] Memakai fallback: {name}")
+
+    def finish(self, total_seconds: float) -> dict:
+        """
+        Return metrik untuk laporan latensi.
+        """
+        if not self.enabled:
+            return {}
+        if total_seconds > self.deadline_sec:
+            self.miss("total")
+        return {
+            "deadline_seconds": self.deadline_sec,
+            "deadline_missed": ",".join(self.misses) or "none",
+            "fallbacks": ",".join(self.fallbacks) or "none",
+        }
+
+
+def vision_with_fallbacks(
+    tracker: DeadlineTracker,
+    image_path: str,
+    output_name: Optional[str] = None,
+    resize: bool = False,
+    run_id: Optional[str] = None,
+    timings: Optional[dict] = None,
+    prepared: Optional[PreparedImage] = None,
+) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Jalankan vision dengan batas waktu tracker, lalu fallback bila anggaran
+    terlampaui. Dipanggil dari thread executor tahap vision.
+    Return (text, txt_path); txt_path None untuk fallback cached.
+    timings (opsional) diisi info percobaan vision terakhir (vision_tokens_est, dst.).
+    prepared (hasil prefetch) hanya terpakai oleh percobaan dengan resize yang sama.
+    """
+    timings = {} if timings is None else timings
+    common = {"output_name": output_name, "run_id": run_id, "prepared": prepared}
+
+    def _attempt(**kwargs):
+        text, txt_path, attempt_timings = generate_text_from_image_path(
+            image_path, return_timings=True, **common, **kwargs
+        )
+        timings.update(attempt_timings)
+        return text, txt_path
+
+    timeout = tracker.budget(STAGE_VISION)
+    t0 = time.monotonic()
+    text, txt_path = _attempt(resize=resize, timeout=timeout)
+    elapsed = time.monotonic() - t0
+    if text:
+        remember_description(text)
+        tracker.check(STAGE_VISION, elapsed)
+        return text, txt_path
+
+    if timeout is None or elapsed < timeout - TIMEOUT_SLACK_SEC:
+        return None, txt_path  # gagal karena sebab lain, bukan deadline
+    tracker.miss(STAGE_VISION)
+
+    for name in VISION_FALLBACKS:
+        if name not in FALLBACK_NAMES or name == "english":
+            print(f"[WARN] Fallback vision tidak dikenal: {name}")
+            continue
+        if name == "cached":
+            cached = cached_description()
+            if cached:
+                tracker.fallback(name)
+                tracker.previous_view = True
+                return cached, None
+            continue
+
+        # cadangkan waktu untuk terjemahan + TTS
+        timeout = tracker.remaining() - tracker.reserve_after(STAGE_VISION)
+        if timeout < MIN_ATTEMPT_SEC:
+            continue
+        tracker.fallback(name)
+        if name == "short_prompt":
+            text, txt_path = _attempt(
+                resize=resize, prompt=SHORT_PROMPT, options=FALLBACK_OPTIONS, timeout=timeout
+            )
+        else:
+            text, txt_path = _attempt(
+                resize=True, max_side=FAST_MODEL_MAX_SIDE, model=FAST_MODEL_NAME,
+                prompt=SHORT_PROMPT, options=FALLBACK_OPTIONS, timeout=timeout
+            )
+        if text:
+            remember_description(text)
+            return text, txt_path
+
+    return None, None
+
+
+def previous_view_notice(spoken_text: str, translated: bool) -> str:
+    """Tambahkan awalan 'tampilan sebelumnya' sesuai bahasa yang diucapkan."""
+    return f"{PREVIOUS_VIEW_NOTICE[translated]} {spoken_text}"
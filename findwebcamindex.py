@@ -1,23 +1,9 @@
-import cv2
-
-# Fungsi untuk mencari webcam yang tersedia
-def find_webcams():
-    available_webcams = []
-    
-    # Coba indeks dari 0 sampai 9 (biasanya webcam pertama memiliki indeks 0, dan seterusnya)
-    for index in range(10):
-        cap = cv2.VideoCapture(index)
-        if cap.isOpened():
-            available_webcams.append(index)
-            cap.release()
-    
-    return available_webcams
-
-# Menampilkan hasil
-webcams = find_webcams()
-if webcams:
-    print("Webcam yang tersedia ditemukan pada indeks berikut:")
-    print(webcams)
-else:
-    print("Tidak ada webcam yang ditemukan.")
+from cameraDiscovery import print_devices, rediscover
 
+# Cari webcam yang tersedia (probing paralel, lihat cameraDiscovery.py)
+# sekaligus perbarui profil kamera yang dipakai capture_image.
+if __name__ == "__main__":
+    profile = rediscover()
+    print_devices(profile["devices"] if profile else [])
+    if profile:
+        print(f"Profil kamera: index {profile['index']} ({profile['width']}x{profile['height']})")
@@ -1,42 +1,88 @@
 import os
 import glob
+import threading
 import wave
-import datetime
 
-from piper import PiperVoice  # pastikan ini yang dipakai
+from artifactStore import KIND_TEXT_EN, KIND_TEXT_ID, KIND_WAV, get_store, new_run_id
+from spanTracer import span
+from stageProfiler import profiled
 
 # === PATH FOLDER ===
 OUTPUT_FOLDER = "outputs"   # tempat file .txt
 AUDIO_FOLDER = "audios"     # tempat simpan file .wav
 MODEL_PATH = "id_ID-news_tts-medium.onnx"  # sesuaikan kalau beda lokasi
+# Kecepatan bicara Piper: < 1.0 lebih cepat, > 1.0 lebih lambat (1.0 = bawaan model)
+LENGTH_SCALE = float(os.getenv("PIPER_LENGTH_SCALE", "1.0"))
 
-os.makedirs(AUDIO_FOLDER, exist_ok=True)
+# piper baru diimport di load_voice dan folder audio dibuat saat TTS pertama,
+# supaya import modul ini tidak ikut memuat onnxruntime.
+
+# Fonemisasi Piper (espeak-ng) memakai state global, jadi sintesis dengan
+# voice bersama diserialkan bila tts_from_text dipanggil dari banyak thread.
+_synth_lock = threading.Lock()
 
 def get_latest_txt(folder=OUTPUT_FOLDER):
     """
     Cari file .txt terbaru di folder yang diberikan.
+    Dicari lewat indeks artefak; glob + mtime hanya dipakai untuk file lama
+    yang belum tercatat di indeks.
     Return: path file .txt atau None.
     """
+    indexed = get_store().latest((KIND_TEXT_ID, KIND_TEXT_EN), folder=folder)
+    if indexed and os.path.exists(indexed):
+        return indexed
+
     files = glob.glob(os.path.join(folder, "*.txt"))
     if not files:
         return None
     return max(files, key=os.path.getmtime)
 
 
-def load_voice(model_path=MODEL_PATH):
+def load_voice(model_path=MODEL_PATH, use_service: bool = True):
     """
     Load model Piper dan return objek PiperVoice.
     Dipanggil sekali, lalu di-share ke pemanggil lain.
+    Bila daemon TTS (ttsService.py) aktif dan use_service=True, return
+    RemoteVoice yang memakai model yang sudah panas di daemon.
     """
+    if use_service:
+        from ttsService import connect_service
+
+        with span("tts_service_connect"):
+            remote = connect_service()
+        if remote is not None:
+            print(f"[INFO] Memakai daemon TTS: {remote.socket_path}")
+            return remote
+
+    with span("piper_import"):
+        from piper import PiperVoice  # pastikan ini yang dipakai
+
     print("[INFO] Memuat model Piper...")
-    voice = PiperVoice.load(model_path)
+    with span("piper_load", model=model_path):
+        voice = PiperVoice.load(model_path)
     print("[INFO] Model Piper siap.")
     return voice
 
 
-def tts_from_text(text, voice=None, audio_folder=AUDIO_FOLDER):
+def synthesis_config(length_scale: float = LENGTH_SCALE):
+    """
+    SynthesisConfig Piper untuk kecepatan bicara, atau None bila memakai
+    bawaan model (atau piper tidak terpasang).
+    """
+    if not length_scale or length_scale == 1.0:
+        return None
+    try:
+        from piper import SynthesisConfig
+    except ImportError:
+        return None
+    return SynthesisConfig(length_scale=length_scale)
+
+
+@profiled("tts_from_text")
+def tts_from_text(text, voice=None, audio_folder=AUDIO_FOLDER, run_id=None):
     """
     Ubah teks (string) menjadi audio WAV.
+    run_id dipakai sebagai nama file dan kunci indeks artefak (dibuat baru bila None).
     Return: path file .wav atau None.
     """
     if not text or not text.strip():
@@ -46,18 +92,25 @@ def tts_from_text(text, voice=None, audio_folder=AUDIO_FOLDER):
     if voice is None:
         voice = load_voice()
 
-    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-    output_path = os.path.join(audio_folder, f"output_{timestamp}.wav")
+    run_id = run_id or new_run_id()
+    output_path = os.path.join(audio_folder, f"output_{run_id}.wav")
 
     print("[INFO] Mengubah teks menjadi audio (Piper TTS)...")
     try:
-        with wave.open(output_path, "wb") as wav_file:
-            voice.synthesize_wav(text, wav_file)
+        os.makedirs(audio_folder, exist_ok=True)
+        syn_config = synthesis_config()
+        with _synth_lock, span("piper_synthesize", chars=len(text)), wave.open(output_path, "wb") as wav_file:
+            if syn_config is None:
+                voice.synthesize_wav(text, wav_file)
+            else:
+                voice.synthesize_wav(text, wav_file, syn_config=syn_config)
     except Exception as e:
         print(f"[ERROR] Gagal membuat file audio: {e}")
         return None
 
     print(f"[INFO] Audio berhasil dibuat: {output_path}")
+    with span("artifact_record"):
+        get_store().record(run_id, KIND_WAV, output_path)
     return output_path
 
 
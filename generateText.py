@@ -1,146 +1,587 @@
 import os
-import cv2
+import math
+import time
 import base64
-import requests
+import threading
+from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Optional, Tuple
+
+from artifactStore import KIND_CAPTURE, KIND_TEXT_EN, KIND_TEXT_ID, get_store, new_run_id
+import burstCapture
+from cameraDiscovery import open_camera
+import ollamaEndpoints
+from spanTracer import span
+from stageProfiler import profiled
+import visionCache
 
 # === KONFIGURASI OLLAMA ===
 MODEL_NAME = "qwen2.5vl:3b"
-OLLAMA_URL = "http://127.0.0.1:11434/api/chat"  # endpoint chat Ollama
+OLLAMA_URL = "http://127.0.0.1:11434/api/chat"  # endpoint chat Ollama (beberapa server: OLLAMA_ENDPOINTS)
+VISION_PROMPT = (
+    "You are a visually impaired assistant. Describe the image briefly without being wordy. "
+    "Mention if there is any danger for visually impaired people. Use simple, short sentences."
+)
+
+# === PREPROCESSING GAMBAR (ANGGARAN TOKEN VISUAL) ===
+# Qwen2.5-VL memakai satu token visual per blok 28x28 piksel, jadi biaya
+# prompt-eval sebanding dengan luas gambar. Gambar diperkecil (dan disejajarkan
+# ke grid 28 px) supaya jumlah token tidak melebihi anggaran.
+VISION_PATCH_SIZE = 28
+VISION_TOKEN_BUDGET = int(os.getenv("VISION_TOKEN_BUDGET", "400"))  # 0 = nonaktif
+VISION_CROP = os.getenv("VISION_CROP", "")      # "center:0.8" atau "x,y,w,h" (fraksi 0-1)
+VISION_ENCODE = os.getenv("VISION_ENCODE", "png").lower()  # "png" atau "jpg"
+JPEG_QUALITY = int(os.getenv("VISION_JPEG_QUALITY", "90"))
+# JPEG besar (foto ponsel) di-decode langsung pada skala 1/2, 1/4 atau 1/8
+# (IDCT terskala libjpeg, IMREAD_REDUCED_COLOR_*) selama hasilnya masih
+# >= ukuran target, jadi piksel yang toh dibuang saat resize tidak di-decode.
+REDUCED_DECODE = os.getenv("VISION_REDUCED_DECODE", "1").lower() in ("1", "true", "yes")
+JPEG_EXTENSIONS = (".jpg", ".jpeg", ".jpe", ".jfif")
+
+# === MODE DUA FASE (bahaya dulu, deskripsi menyusul) ===
+TWO_PHASE_MODE = os.getenv("VISION_TWO_PHASE", "0").lower() in ("1", "true", "yes")
+HAZARD_PROMPT = (
+    "You are a visually impaired assistant. In one short sentence, name only the most "
+    "important danger or obstacle in front. If there is none, answer exactly: No danger."
+)
+HAZARD_OPTIONS = {"num_predict": int(os.getenv("VISION_HAZARD_TOKENS", "32")), "temperature": 0}
+HAZARD_SUFFIX = "_hazard"  # sufiks run_id / nama file untuk artefak fase 1
+
+# === NARASI KONTINU (deteksi perubahan adegan) ===
+NARRATION_MODE = os.getenv("PIPELINE_NARRATION", "0").lower() in ("1", "true", "yes")
+# Selisih rata-rata absolut (0-1) antar thumbnail grayscale 32x24 di atas
+# ambang ini dianggap adegan berubah.
+SCENE_CHANGE_THRESHOLD = float(os.getenv("NARRATION_SCENE_THRESHOLD", "0.12"))
+SCENE_THUMB_SIZE = (32, 24)
 
 # === FOLDER ===
 CAPTURE_DIR = os.path.join(os.getcwd(), "captures")
 OUTPUT_DIR = os.path.join(os.getcwd(), "outputs")
 OUTPUT_DIR_EN = os.path.join(os.getcwd(), "outputs-EN")
 
-os.makedirs(CAPTURE_DIR, exist_ok=True)
-os.makedirs(OUTPUT_DIR, exist_ok=True)
-os.makedirs(OUTPUT_DIR_EN, exist_ok=True)
+# Folder dibuat saat pertama kali ditulis (bukan saat import), cv2 dan
+# requests juga baru diimport saat dipakai supaya import modul tetap ringan.
 
 
-def capture_image():
+@profiled("capture_image")
+def capture_image(run_id: Optional[str] = None, timings: Optional[dict] = None):
     """
-    Ambil satu frame dari kamera index 0 dan simpan ke CAPTURE_DIR.
+    Ambil satu frame dari kamera sesuai profil cameraDiscovery (indeks,
+    backend dan resolusi tersimpan) dan simpan ke CAPTURE_DIR.
+    Dengan CAPTURE_BURST_FRAMES > 1 beberapa frame dibaca dan hanya yang
+    paling tajam dengan eksposur wajar yang disimpan (lihat burstCapture.py).
+    run_id dipakai sebagai nama file dan kunci indeks artefak (dibuat baru bila None).
+    timings (opsional) diisi metrik burst (capture_score, capture_scoring_seconds, dst.).
     Return: path gambar atau None jika gagal.
     """
-    print("[STEP] Menangkap gambar dari kamera (index 0)...")
-    cap = cv2.VideoCapture(0)
-
-    if not cap.isOpened():
-        print("[ERROR] Kamera (index 0) tidak ditemukan atau tidak bisa dibuka.")
+    with span("camera_open"):
+        cap, profile = open_camera()
+    if cap is None:
+        print("[ERROR] Kamera tidak ditemukan atau tidak bisa dibuka.")
         return None
+    print(f"[STEP] Menangkap gambar dari kamera (index {profile['index']}, "
+          f"{profile['width']}x{profile['height']})...")
+
+    if burstCapture.BURST_FRAMES > 1:
+        try:
+            frame, info = burstCapture.read_burst(cap, burstCapture.BURST_FRAMES, burstCapture.BURST_BUDGET_SEC)
+        finally:
+            cap.release()
+        if frame is not None:
+            print(f"[INFO] Burst {info['capture_burst_frames']} frame "
+                  f"({info['capture_burst_seconds']:.2f} s), dipilih frame #{info['capture_best_index']} "
+                  f"(skor {info['capture_score']:.1f}, tajam {info['capture_sharpness']:.1f}, "
+                  f"penilaian {info['capture_scoring_seconds'] * 1000:.1f} ms).")
+        if timings is not None:
+            timings.update(info)
+    else:
+        with span("camera_read"):
+            ret, frame = cap.read()
+            cap.release()
+        frame = frame if ret else None
 
-    ret, frame = cap.read()
-    cap.release()
-
-    if not ret or frame is None:
+    if frame is None:
         print("[ERROR] Tidak dapat menangkap gambar dari kamera.")
         return None
 
-    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-    image_path = os.path.join(CAPTURE_DIR, f"capture_{ts}.png")
+    run_id = run_id or new_run_id()
+    image_path = os.path.join(CAPTURE_DIR, f"capture_{run_id}.png")
     try:
-        cv2.imwrite(image_path, frame)
+        import cv2
+
+        os.makedirs(CAPTURE_DIR, exist_ok=True)
+        with span("image_write", path=image_path):
+            cv2.imwrite(image_path, frame)
         print(f"[INFO] Gambar disimpan: {image_path}")
+        get_store().record(run_id, KIND_CAPTURE, image_path)
         return image_path
     except Exception as e:
         print(f"[ERROR] Gagal menyimpan gambar: {e}")
         return None
 
 
-def run_ollama_with_image(image_path, output_name=None, resize: bool = False, max_side: int = 640):
+def _parse_crop(spec: str) -> Optional[Tuple[float, float, float, float]]:
     """
-    Kirim gambar ke model Qwen2.5-VL:3b.
-    Hasil teks disimpan ke OUTPUT_DIR sebagai .txt.
-    Return: path file .txt atau None.
-    Parameter:
-        resize   : jika True, lakukan resize agar sisi terpanjang <= max_side.
-        max_side : batas sisi terpanjang saat resize aktif.
+    "center:0.8" → potong tengah 80%; "x,y,w,h" → ROI dalam fraksi lebar/tinggi.
+    Return (x, y, w, h) fraksi, atau None bila kosong/tidak valid.
     """
-    if not os.path.exists(image_path):
-        print(f"[ERROR] File gambar tidak ada: {image_path}")
+    spec = (spec or "").strip().lower()
+    if not spec:
+        return None
+    try:
+        if spec.startswith("center:"):
+            frac = min(max(float(spec.split(":", 1)[1]), 0.05), 1.0)
+            return ((1 - frac) / 2, (1 - frac) / 2, frac, frac)
+        x, y, w, h = (float(v) for v in spec.split(","))
+        if w <= 0 or h <= 0:
+            raise ValueError("lebar/tinggi ROI harus > 0")
+        return (x, y, w, h)
+    except ValueError as exc:
+        print(f"[WARN] VISION_CROP tidak valid ({spec}): {exc}. Crop dinonaktifkan.")
         return None
 
-    # Encode ke base64 (format multimodal Ollama) dengan opsi resize
+
+def estimate_visual_tokens(width: int, height: int, patch: int = VISION_PATCH_SIZE) -> int:
+    """Perkiraan jumlah token visual Qwen2.5-VL (grid dibulatkan ke kelipatan patch)."""
+    return max(round(width / patch), 1) * max(round(height / patch), 1)
+
+
+def budget_target_size(
+    width: int,
+    height: int,
+    token_budget: int = VISION_TOKEN_BUDGET,
+    max_side: Optional[int] = None,
+    patch: int = VISION_PATCH_SIZE,
+) -> Tuple[int, int]:
+    """
+    Ukuran target yang sejajar grid patch, tidak melebihi token_budget
+    (dan max_side bila diberikan), tanpa memperbesar gambar.
+    """
+    scale = 1.0
+    if max_side:
+        scale = min(scale, max_side / max(width, height))
+    if token_budget > 0:
+        scale = min(scale, math.sqrt(token_budget * patch * patch / (width * height)))
+    target_w = max(int(width * scale) // patch, 1) * patch
+    target_h = max(int(height * scale) // patch, 1) * patch
+    return target_w, target_h
+
+
+def _crop_box(width: int, height: int, crop: Optional[Tuple[float, float, float, float]]):
+    """Kotak crop (x0, y0, x1, y1) dalam piksel, atau None bila tanpa crop/terlalu kecil."""
+    if crop is None:
+        return None
+    x, y, w, h = crop
+    x0, y0 = int(width * max(x, 0.0)), int(height * max(y, 0.0))
+    x1, y1 = min(int(width * (x + w)), width), min(int(height * (y + h)), height)
+    if x1 - x0 >= VISION_PATCH_SIZE and y1 - y0 >= VISION_PATCH_SIZE:
+        return x0, y0, x1, y1
+    return None
+
+
+def _target_size(width: int, height: int, resize: bool, max_side: int, token_budget: int) -> Tuple[int, int]:
+    if token_budget > 0:
+        return budget_target_size(width, height, token_budget, max_side if resize else None)
+    if resize and max(height, width) > max_side:
+        scale = max_side / max(height, width)
+        return int(width * scale), int(height * scale)
+    return width, height
+
+
+def prepare_image_for_vision(
+    img,
+    resize: bool = False,
+    max_side: int = 640,
+    token_budget: int = VISION_TOKEN_BUDGET,
+    crop: Optional[Tuple[float, float, float, float]] = None,
+    source_scale: float = 1.0,
+):
+    """
+    Crop (opsional, slicing NumPy tanpa salin) lalu resize ke ukuran target.
+    - token_budget > 0 : ukuran sejajar grid 28 px dalam anggaran token
+                         (max_side ikut dipakai bila resize=True).
+    - token_budget = 0 : perilaku lama (resize ke max_side bila resize=True).
+    source_scale > 1 berarti img hasil decode tereduksi (1/source_scale):
+    ukuran target tetap dihitung dari resolusi asli sehingga hasilnya sama
+    dengan decode penuh.
+    Return (img, info) dengan info berisi ukuran asli/akhir dan perkiraan token.
+    """
+    import cv2
+
+    src_h, src_w = img.shape[:2]
+    box = _crop_box(src_w, src_h, crop)
+    if box is not None:
+        x0, y0, x1, y1 = box
+        img = img[y0:y1, x0:x1]
+
+    h, w = img.shape[:2]
+    new_w, new_h = _target_size(round(w * source_scale), round(h * source_scale), resize, max_side, token_budget)
+    new_w, new_h = min(new_w, w), min(new_h, h)
+    if (new_w, new_h) != (w, h):
+        img = cv2.resize(img, (new_w, new_h), interpolation=cv2.INTER_AREA)
+
+    info = {
+        "vision_source_width": round(src_w * source_scale),
+        "vision_source_height": round(src_h * source_scale),
+        "vision_width": new_w,
+        "vision_height": new_h,
+        "vision_tokens_est": estimate_visual_tokens(new_w, new_h),
+    }
+    return img, info
+
+
+def jpeg_dimensions(image_path: str) -> Optional[Tuple[int, int]]:
+    """
+    (lebar, tinggi) JPEG dari header SOF tanpa decode gambar.
+    None bila bukan JPEG atau header tidak terbaca.
+    """
+    try:
+        with open(image_path, "rb") as f:
+            if f.read(2) != b"\xff\xd8":
+                return None
+            while True:
+                byte = f.read(1)
+                while byte and byte != b"\xff":  # lewati byte sampah sebelum marker
+                    byte = f.read(1)
+                while byte == b"\xff":           # padding 0xFF boleh berulang
+                    byte = f.read(1)
+                if not byte:
+                    return None
+                marker = byte[0]
+                if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:
+                    continue  # marker tanpa panjang segmen
+                if marker == 0xD9:
+                    return None
+                length_bytes = f.read(2)
+                if len(length_bytes) < 2:
+                    return None
+                length = int.from_bytes(length_bytes, "big")
+                # SOF0-SOF15 kecuali DHT (C4), JPG (C8) dan DAC (CC)
+                if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+                    sof = f.read(5)
+                    if len(sof) < 5:
+                        return None
+                    height = int.from_bytes(sof[1:3], "big")
+                    width = int.from_bytes(sof[3:5], "big")
+                    return (width, height) if width and height else None
+                f.seek(length - 2, os.SEEK_CUR)
+    except OSError:
+        return None
+
+
+def reduced_decode_factor(
+    width: int,
+    height: int,
+    resize: bool = False,
+    max_side: int = 640,
+    token_budget: int = VISION_TOKEN_BUDGET,
+    crop: Optional[Tuple[float, float, float, float]] = None,
+) -> int:
+    """
+    Faktor reduksi decode terbesar (8, 4, 2, atau 1) yang hasilnya masih
+    >= ukuran target preprocessing, sehingga resize tetap hanya memperkecil.
+    Sisi dibandingkan setelah diurutkan karena orientasi EXIF bisa menukar
+    lebar dan tinggi saat decode.
+    """
+    box = _crop_box(width, height, crop)
+    if box is not None:
+        width, height = box[2] - box[0], box[3] - box[1]
+    target = sorted(_target_size(width, height, resize, max_side, token_budget))
+    sides = sorted((width, height))
+    for factor in (8, 4, 2):
+        if sides[0] // factor >= target[0] and sides[1] // factor >= target[1]:
+            return factor
+    return 1
+
+
+def load_image_for_vision(image_path: str, resize: bool = False, max_side: int = 640,
+                          crop: Optional[Tuple[float, float, float, float]] = None):
+    """
+    Decode gambar untuk vision, memakai IMREAD_REDUCED_COLOR_2/4/8 untuk
+    JPEG bila REDUCED_DECODE aktif. Return (img, source_scale) dengan
+    source_scale = resolusi asli / resolusi hasil decode, atau (None, 1.0).
+    """
+    import cv2
+
+    dims = None
+    if REDUCED_DECODE and image_path.lower().endswith(JPEG_EXTENSIONS):
+        dims = jpeg_dimensions(image_path)
+    factor = reduced_decode_factor(*dims, resize=resize, max_side=max_side, crop=crop) if dims else 1
+    flag = {2: cv2.IMREAD_REDUCED_COLOR_2, 4: cv2.IMREAD_REDUCED_COLOR_4,
+            8: cv2.IMREAD_REDUCED_COLOR_8}.get(factor, cv2.IMREAD_COLOR)
+    with span("image_decode", scale=factor):
+        img = cv2.imread(image_path, flag)
+    if img is None:
+        return None, 1.0
+    if factor == 1:
+        return img, 1.0
+    return img, max(dims) / max(img.shape[:2])
+
+
+@dataclass
+class PreparedImage:
+    """Gambar yang sudah di-decode, di-resize dan di-encode untuk payload vision."""
+
+    image_path: str
+    resize: bool
+    max_side: int
+    encoded: bytes
+    info: dict
+
+    def matches(self, image_path: str, resize: bool, max_side: int) -> bool:
+        return (self.image_path, self.resize, self.max_side) == (image_path, resize, max_side)
+
+
+def preprocess_image(image_path: str, resize: bool = False, max_side: int = 640) -> Optional[PreparedImage]:
+    """
+    Decode (tereduksi bila bisa) → crop/resize sesuai anggaran token → encode.
+    Aman dipanggil dari thread lain, misal prefetch batch (ImageFolderSource).
+    info memuat ukuran asli/akhir, vision_tokens_est, vision_decode_scale
+    dan vision_preprocess_seconds. Return None bila gagal.
+    """
     try:
-        img = cv2.imread(image_path)
+        preprocess_start = time.perf_counter()
+        crop = _parse_crop(VISION_CROP)
+        img, source_scale = load_image_for_vision(image_path, resize=resize, max_side=max_side, crop=crop)
         if img is None:
             print(f"[ERROR] Cannot read image: {image_path}")
             return None
-        if resize:
-            h, w = img.shape[:2]
-            scale = min(max_side / max(h, w), 1.0)
-            if scale < 1.0:
-                new_w, new_h = int(w * scale), int(h * scale)
-                img = cv2.resize(img, (new_w, new_h), interpolation=cv2.INTER_AREA)
-        ok, buf = cv2.imencode(".png", img)
-        if not ok:
+        with span("image_resize"):
+            img, info = prepare_image_for_vision(
+                img, resize=resize, max_side=max_side, crop=crop, source_scale=source_scale
+            )
+        with span("image_encode", format=VISION_ENCODE):
+            encoded = encode_image(img)
+        if encoded is None:
             print(f"[ERROR] Failed to encode image: {image_path}")
             return None
-        img_b64 = base64.b64encode(buf.tobytes()).decode("utf-8")
+        info["vision_decode_scale"] = round(source_scale, 2)
+        info["vision_preprocess_seconds"] = time.perf_counter() - preprocess_start
     except Exception as e:
         print(f"[ERROR] Gagal membaca/encode gambar: {e}")
         return None
+    return PreparedImage(image_path=image_path, resize=resize, max_side=max_side, encoded=encoded, info=info)
+
+
+def encode_image(img, fmt: str = VISION_ENCODE) -> Optional[bytes]:
+    """Encode gambar untuk payload Ollama (PNG lossless atau JPEG yang lebih kecil/cepat)."""
+    import cv2
+
+    if fmt in ("jpg", "jpeg"):
+        ok, buf = cv2.imencode(".jpg", img, [int(cv2.IMWRITE_JPEG_QUALITY), JPEG_QUALITY])
+    else:
+        ok, buf = cv2.imencode(".png", img)
+    return buf.tobytes() if ok else None
+
+
+def scene_signature(image_path: str):
+    """
+    Thumbnail grayscale kecil (float32) untuk membandingkan adegan antar-capture.
+    Decode memakai IMREAD_REDUCED_GRAYSCALE_8 supaya murah. None bila gagal.
+    """
+    import cv2
+    import numpy as np
+
+    img = cv2.imread(image_path, cv2.IMREAD_REDUCED_GRAYSCALE_8) if image_path else None
+    if img is None:
+        return None
+    return cv2.resize(img, SCENE_THUMB_SIZE, interpolation=cv2.INTER_AREA).astype(np.float32) / 255.0
+
+
+def scene_difference(previous, current) -> float:
+    """Selisih rata-rata absolut (0-1) antara dua scene_signature."""
+    import numpy as np
+
+    return float(np.mean(np.abs(previous - current)))
 
-    prompt = "You are a visually impaired assistant. Describe the image briefly without being wordy. Mention if there is any danger for visually impaired people. Use simple, short sentences."
-    
-    payload = {
-        "model": MODEL_NAME,
-        "messages": [
-            {"role": "user", "content": prompt},
-            {"role": "user", "images": [img_b64]}
-        ],
-        "stream": False  # supaya respons langsung sekali, bukan streaming
-    }
 
+def _post_ollama(payload: dict, timeout: Optional[float] = None, info: Optional[dict] = None) -> Optional[dict]:
+    """
+    Kirim payload ke endpoint chat Ollama (dipilih dan dicoba ulang oleh
+    ollamaEndpoints bila ada beberapa server). Return JSON respons atau None.
+    info (opsional) diisi vision_endpoint dan vision_attempts.
+    """
     print("[STEP] Mengirim gambar ke Ollama (Qwen2.5-VL)...")
-    try:
-        resp = requests.post(OLLAMA_URL, json=payload)
-        resp.raise_for_status()
-    except Exception as e:
-        print(f"[ERROR] Gagal memanggil Ollama. "
-              f"Pastikan `ollama serve` aktif dan model '{MODEL_NAME}' tersedia. Detail: {e}")
+    return ollamaEndpoints.get_pool(OLLAMA_URL).post_chat(payload, timeout=timeout, info=info)
+
+
+def ollama_timings(data: dict, client_seconds: float) -> dict:
+    """
+    Rincian waktu sisi server dari respons /api/chat Ollama (durasi dalam
+    nanodetik → detik) beserta token/detik:
+        ollama_total_seconds        : total_duration (termasuk antre di server)
+        ollama_load_seconds         : load model (besar bila model belum di memori)
+        ollama_prompt_eval_seconds  : evaluasi prompt + token gambar
+        ollama_eval_seconds         : decoding token jawaban
+        ollama_other_seconds        : sisa total_duration di luar tiga di atas
+        ollama_prompt_tokens_per_sec, ollama_eval_tokens_per_sec
+    client_seconds adalah waktu klien dari encode base64 sampai JSON
+    terparse; selisihnya dengan total_duration (encode, HTTP, parse,
+    jaringan) dicatat sebagai vision_client_overhead_seconds.
+    Field yang tidak ada di respons (Ollama lama) dilewati.
+    """
+    info = {"vision_client_seconds": client_seconds}
+    seconds = {}
+    for field, key in (
+        ("total_duration", "ollama_total_seconds"),
+        ("load_duration", "ollama_load_seconds"),
+        ("prompt_eval_duration", "ollama_prompt_eval_seconds"),
+        ("eval_duration", "ollama_eval_seconds"),
+    ):
+        if isinstance(data.get(field), (int, float)):
+            seconds[field] = data[field] / 1e9
+            info[key] = seconds[field]
+    for field, key in (("prompt_eval_count", "ollama_prompt_eval_count"), ("eval_count", "ollama_eval_count")):
+        if isinstance(data.get(field), int):
+            info[key] = data[field]
+
+    total = seconds.get("total_duration")
+    if total is not None:
+        parts = sum(seconds.get(f, 0.0) for f in ("load_duration", "prompt_eval_duration", "eval_duration"))
+        info["ollama_other_seconds"] = max(total - parts, 0.0)
+        info["vision_client_overhead_seconds"] = max(client_seconds - total, 0.0)
+    if seconds.get("prompt_eval_duration") and "ollama_prompt_eval_count" in info:
+        info["ollama_prompt_tokens_per_sec"] = info["ollama_prompt_eval_count"] / seconds["prompt_eval_duration"]
+    if seconds.get("eval_duration") and "ollama_eval_count" in info:
+        info["ollama_eval_tokens_per_sec"] = info["ollama_eval_count"] / seconds["eval_duration"]
+    return info
+
+
+@profiled("run_ollama_with_image")
+def run_ollama_with_image(
+    image_path,
+    output_name=None,
+    resize: bool = False,
+    max_side: int = 640,
+    run_id: Optional[str] = None,
+    prompt: Optional[str] = None,
+    model: Optional[str] = None,
+    options: Optional[dict] = None,
+    timeout: Optional[float] = None,
+    timings: Optional[dict] = None,
+    prepared: Optional[PreparedImage] = None,
+):
+    """
+    Kirim gambar ke model Qwen2.5-VL:3b.
+    Hasil teks disimpan ke OUTPUT_DIR sebagai .txt.
+    Return: path file .txt atau None.
+    Parameter:
+        resize   : jika True, lakukan resize agar sisi terpanjang <= max_side.
+        max_side : batas sisi terpanjang saat resize aktif.
+        run_id   : kunci indeks artefak (dibuat baru bila None).
+        prompt   : prompt pengganti (default VISION_PROMPT).
+        model    : nama model Ollama (default MODEL_NAME).
+        options  : opsi generate Ollama, misal {"num_predict": 48}.
+        timeout  : batas tunggu HTTP (detik); None = tunggu sampai selesai.
+        timings  : dict opsional yang diisi info preprocessing (ukuran akhir,
+                   vision_tokens_est, vision_preprocess_seconds) dan rincian
+                   waktu server Ollama (lihat ollama_timings; tidak diisi
+                   bila respons diambil dari cache).
+        prepared : hasil preprocess_image yang sudah disiapkan lebih dulu
+                   (prefetch); dipakai bila path/resize/max_side cocok.
+    Gambar diperkecil sesuai VISION_TOKEN_BUDGET (lihat prepare_image_for_vision).
+    Respons di-cache per isi gambar + prompt + model + opsi (lihat visionCache.py).
+    """
+    if not os.path.exists(image_path):
+        print(f"[ERROR] File gambar tidak ada: {image_path}")
         return None
 
-    try:
-        data = resp.json()
-    except Exception as e:
-        print(f"[ERROR] Gagal parse JSON dari Ollama: {e}\nRespons mentah: {resp.text}")
+    # Crop/resize sesuai anggaran token lalu encode (base64 dibuat hanya bila memanggil Ollama)
+    if prepared is not None and prepared.matches(image_path, resize, max_side):
+        info = dict(prepared.info, vision_prefetched=1)
+    else:
+        prepared = preprocess_image(image_path, resize=resize, max_side=max_side)
+        if prepared is None:
+            return None
+        info = dict(prepared.info, vision_prefetched=0)
+    encoded = prepared.encoded
+    print(f"[INFO] Gambar {info['vision_width']}x{info['vision_height']} "
+          f"(~{info['vision_tokens_est']} token visual, decode 1/{info['vision_decode_scale']:g}).")
+    if timings is not None:
+        timings.update(info)
+
+    model = model or MODEL_NAME
+    prompt = prompt or VISION_PROMPT
+    cache_key = None
+    data = None
+    if visionCache.CACHE_MODE != visionCache.MODE_OFF:
+        cache_key = visionCache.cache_key(encoded, prompt, model, options)
+        with span("vision_cache_lookup"):
+            data = visionCache.lookup(cache_key)
+        if timings is not None:
+            timings["vision_cache_hit"] = int(data is not None)
+    cached = data is not None
+    if cached:
+        print("[INFO] Respons vision diambil dari cache (tanpa memanggil Ollama).")
+    elif visionCache.CACHE_MODE == visionCache.MODE_REPLAY:
+        print(f"[ERROR] Mode replay: respons vision untuk {image_path} tidak ada di cache.")
         return None
+    else:
+        client_start = time.perf_counter()
+        with span("base64_encode", bytes=len(encoded)):
+            img_b64 = base64.b64encode(encoded).decode("utf-8")
+        payload = {
+            "model": model,
+            "messages": [
+                {"role": "user", "content": prompt},
+                {"role": "user", "images": [img_b64]}
+            ],
+            "stream": False  # supaya respons langsung sekali, bukan streaming
+        }
+        if options:
+            payload["options"] = options
+        data = _post_ollama(payload, timeout, info=timings)
+        if data is None:
+            return None
+        server = ollama_timings(data, time.perf_counter() - client_start)
+        if "ollama_total_seconds" in server:
+            print(f"[INFO] Ollama: total {server['ollama_total_seconds']:.2f} s "
+                  f"(load {server.get('ollama_load_seconds', 0.0):.2f}, "
+                  f"prompt {server.get('ollama_prompt_eval_seconds', 0.0):.2f}, "
+                  f"decode {server.get('ollama_eval_seconds', 0.0):.2f}), "
+                  f"overhead klien {server['vision_client_overhead_seconds']:.2f} s.")
+        if timings is not None:
+            timings.update(server)
 
     # Ambil konten jawaban dari field message.content
     content = data.get("message", {}).get("content", "")
     if not content:
         print(f"[ERROR] Konten kosong atau struktur respons tak terduga.\nRespons: {data}")
         return None
+    if cache_key is not None and not cached:
+        with span("vision_cache_store"):
+            visionCache.store(cache_key, data, prompt, model, options)
 
-    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+    run_id = run_id or new_run_id()
     if output_name:
         safe_name = Path(output_name).stem or "output"
         candidate = f"{safe_name}.txt"
         output_path = os.path.join(OUTPUT_DIR, candidate)
         if os.path.exists(output_path):
             # hindari overwrite, tambahkan timestamp jika sudah ada
-            output_path = os.path.join(OUTPUT_DIR, f"{safe_name}_{ts}.txt")
+            output_path = os.path.join(OUTPUT_DIR, f"{safe_name}_{run_id}.txt")
     else:
-        output_path = os.path.join(OUTPUT_DIR, f"output_{ts}.txt")
+        output_path = os.path.join(OUTPUT_DIR, f"output_{run_id}.txt")
 
     # Selaraskan nama file EN agar mudah dicocokkan
     output_path_en = os.path.join(OUTPUT_DIR_EN, Path(output_path).name)
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    os.makedirs(OUTPUT_DIR_EN, exist_ok=True)
 
     try:
-        with open(output_path_en, "w", encoding="utf-8") as f_en:
+        with span("text_write", lang="en"), open(output_path_en, "w", encoding="utf-8") as f_en:
             f_en.write(content)
         print(f"[INFO] Hasil interpretasi (EN) disimpan: {output_path_en}")
+        get_store().record(run_id, KIND_TEXT_EN, output_path_en)
     except Exception as e:
         print(f"[ERROR] Gagal menulis file output EN: {e}")
 
     try:
-        with open(output_path, "w", encoding="utf-8") as f:
+        with span("text_write", lang="id"), open(output_path, "w", encoding="utf-8") as f:
             f.write(content)
         print(f"[INFO] Hasil interpretasi disimpan: {output_path}")
+        get_store().record(run_id, KIND_TEXT_ID, output_path)
         return output_path
     except Exception as e:
         print(f"[ERROR] Gagal menulis file output: {e}")
@@ -155,20 +596,21 @@ def generate_text_from_camera(return_timings: bool = False):
 
     Return default: (text, txt_path) atau (None, None) jika gagal.
     Bila return_timings=True, return (text, txt_path, timings) di mana
-    timings memuat durasi per langkah (detik).
+    timings memuat durasi per langkah (detik), perkiraan token visual dan
+    rincian waktu server Ollama (ollama_timings).
     """
+    run_id = new_run_id()
     capture_start = datetime.now()
-    img_path = capture_image()
+    timings = {}
+    img_path = capture_image(run_id=run_id, timings=timings)
     capture_end = datetime.now()
-    timings = {
-        "capture_seconds": (capture_end - capture_start).total_seconds(),
-    }
+    timings["capture_seconds"] = (capture_end - capture_start).total_seconds()
 
     if not img_path:
         return (None, None, timings) if return_timings else (None, None)
 
     vision_start = datetime.now()
-    txt_path = run_ollama_with_image(img_path, resize=False)
+    txt_path = run_ollama_with_image(img_path, resize=False, run_id=run_id, timings=timings)
     vision_end = datetime.now()
     timings["vision_seconds"] = (vision_end - vision_start).total_seconds()
 
@@ -194,6 +636,12 @@ def generate_text_from_image_path(
     return_timings: bool = False,
     resize: bool = True,
     max_side: int = 640,
+    run_id: Optional[str] = None,
+    prompt: Optional[str] = None,
+    model: Optional[str] = None,
+    options: Optional[dict] = None,
+    timeout: Optional[float] = None,
+    prepared: Optional[PreparedImage] = None,
 ):
     """
     Jalankan model vision menggunakan file gambar yang sudah ada.
@@ -204,18 +652,33 @@ def generate_text_from_image_path(
         return_timings: bila True, kembalikan juga durasi proses vision.
         resize        : True untuk resize sisi terpanjang <= max_side (dipakai batch).
         max_side      : batas sisi terpanjang saat resize aktif.
+        run_id        : kunci indeks artefak (dibuat baru bila None).
+        prompt, model, options, timeout, prepared : diteruskan ke run_ollama_with_image.
 
     Return:
         - default: (text, txt_path) atau (None, None) bila gagal.
         - jika return_timings=True: (text, txt_path, timings)
-          di mana timings["vision_seconds"] berisi durasi step visi.
+          di mana timings["vision_seconds"] berisi durasi step visi,
+          timings["vision_tokens_est"] perkiraan token visual gambar, dan
+          ollama_*_seconds / *_tokens_per_sec rincian waktu server Ollama.
     """
+    timings = {}
     vision_start = datetime.now()
     txt_path = run_ollama_with_image(
-        image_path, output_name=output_name, resize=resize, max_side=max_side
+        image_path,
+        output_name=output_name,
+        resize=resize,
+        max_side=max_side,
+        run_id=run_id,
+        prompt=prompt,
+        model=model,
+        options=options,
+        timeout=timeout,
+        timings=timings,
+        prepared=prepared,
     )
     vision_end = datetime.now()
-    timings = {"vision_seconds": (vision_end - vision_start).total_seconds()}
+    timings["vision_seconds"] = (vision_end - vision_start).total_seconds()
 
     if not txt_path:
         return (None, None, timings) if return_timings else (None, None)
@@ -233,12 +696,103 @@ def generate_text_from_image_path(
     return text, txt_path
 
 
+def hazard_run_id(run_id: str) -> str:
+    """run_id turunan untuk artefak fase bahaya (teks/wav) agar tidak menimpa fase 2."""
+    return f"{run_id}{HAZARD_SUFFIX}"
+
+
+def generate_hazard_from_image_path(
+    image_path: str,
+    output_name: Optional[str] = None,
+    resize: bool = True,
+    max_side: int = 640,
+    run_id: Optional[str] = None,
+    timeout: Optional[float] = None,
+    prepared: Optional[PreparedImage] = None,
+):
+    """
+    Fase 1 mode dua fase: query pendek khusus bahaya dengan jumlah token
+    dibatasi (HAZARD_OPTIONS), supaya peringatan bisa segera diucapkan.
+    Artefak disimpan dengan sufiks HAZARD_SUFFIX.
+    Return (text, txt_path) atau (None, None) bila gagal.
+    """
+    run_id = run_id or new_run_id()
+    return generate_text_from_image_path(
+        image_path,
+        output_name=f"{Path(output_name).stem}{HAZARD_SUFFIX}" if output_name else None,
+        resize=resize,
+        max_side=max_side,
+        run_id=hazard_run_id(run_id),
+        prompt=HAZARD_PROMPT,
+        options=HAZARD_OPTIONS,
+        timeout=timeout,
+        prepared=prepared,
+    )
+
+
+def generate_text_two_phase(
+    image_path: str,
+    on_hazard: Callable[[str], None],
+    output_name: Optional[str] = None,
+    return_timings: bool = False,
+    resize: bool = True,
+    max_side: int = 640,
+    run_id: Optional[str] = None,
+):
+    """
+    Mode dua fase (versi sinkron, tanpa orkestrator):
+    1. query bahaya singkat → on_hazard(text) dijalankan di thread terpisah
+       (misal terjemah + TTS + play) sehingga tidak menunggu fase 2.
+    2. deskripsi lengkap dibuat selagi fase 1 diucapkan.
+
+    Return sama seperti generate_text_from_image_path (deskripsi lengkap).
+    timings memuat "hazard_vision_seconds" di samping "vision_seconds".
+    Fungsi menunggu on_hazard selesai sebelum return, supaya deskripsi
+    lengkap tidak diputar bertumpuk dengan peringatan bahaya.
+    Gambar di-decode/encode sekali dan dipakai kedua fase.
+    """
+    run_id = run_id or new_run_id()
+    hazard_start = datetime.now()
+    prepared = preprocess_image(image_path, resize=resize, max_side=max_side) if os.path.exists(image_path) else None
+    hazard_text, _ = generate_hazard_from_image_path(
+        image_path, output_name=output_name, resize=resize, max_side=max_side, run_id=run_id,
+        prepared=prepared,
+    )
+    hazard_seconds = (datetime.now() - hazard_start).total_seconds()
+
+    hazard_thread = None
+    if hazard_text:
+        print(f"[INFO] Fase bahaya selesai ({hazard_seconds:.2f} s): {hazard_text}")
+        hazard_thread = threading.Thread(target=on_hazard, args=(hazard_text,), name="hazard-phase")
+        hazard_thread.start()
+    else:
+        print("[WARN] Fase bahaya gagal, lanjut ke deskripsi lengkap.")
+
+    text, txt_path, timings = generate_text_from_image_path(
+        image_path,
+        output_name=output_name,
+        return_timings=True,
+        resize=resize,
+        max_side=max_side,
+        run_id=run_id,
+        prepared=prepared,
+    )
+    timings["hazard_vision_seconds"] = hazard_seconds
+    if hazard_thread is not None:
+        hazard_thread.join()
+    if return_timings:
+        return text, txt_path, timings
+    return text, txt_path
+
+
 def clean_files():
     """
     Menghapus semua file dalam captures/, outputs/, dan outputs-EN/
     """
     removed = 0
     for folder in (CAPTURE_DIR, OUTPUT_DIR, OUTPUT_DIR_EN):
+        if not os.path.isdir(folder):
+            continue
         for name in os.listdir(folder):
             fpath = os.path.join(folder, name)
             try:
@@ -253,10 +807,11 @@ def main():
     """
     Mode debug mandiri:
     - 'test'  : capture + kirim ke Qwen2.5-VL
+    - 'dua'   : capture + mode dua fase (bahaya dulu, lalu deskripsi)
     - 'clean' : hapus semua file di captures/ dan outputs/
     - 'q'     : keluar
     """
-    print("Perintah: test | clean | q (quit)")
+    print("Perintah: test | dua | clean | q (quit)")
     try:
         while True:
             cmd = input("Masukkan perintah: ").strip().lower()
@@ -266,6 +821,18 @@ def main():
                     print("\n=== HASIL TEKS ===")
                     print(text)
                     print("==================\n")
+            elif cmd == "dua":
+                img_path = capture_image()
+                if img_path:
+                    text, _ = generate_text_two_phase(
+                        img_path,
+                        on_hazard=lambda hazard: print(f"\n=== BAHAYA ===\n{hazard}\n=============="),
+                        resize=False,
+                    )
+                    if text:
+                        print("\n=== HASIL TEKS ===")
+                        print(text)
+                        print("==================\n")
             elif cmd == "clean":
                 clean_files()
             elif cmd in ("q", "quit", "exit"):
@@ -274,7 +841,7 @@ def main():
             elif cmd == "":
                 continue
             else:
-                print("Perintah tidak dikenali. Gunakan: test | clean | q")
+                print("Perintah tidak dikenali. Gunakan: test | dua | clean | q")
     except KeyboardInterrupt:
         print("\n[DONE] Dihentikan oleh pengguna.")
 
@@ -0,0 +1,456 @@
+"""
+Layanan HTTP lokal agar satu edge box bisa melayani beberapa perangkat.
+
+Setiap permintaan dijalankan sebagai job PipelineOrchestrator, sama seperti
+main.py: capture → vision → anggaran teks → terjemahan → TTS, termasuk mode
+dua fase (VISION_TWO_PHASE), sampler sumber daya dan trace. Audio hanya
+disimpan (FileOnlySink) lalu dikirim ke klien.
+
+Anggaran deadline dan fallback (deadlinePolicy) default mati di layanan ini:
+tracker mulai saat permintaan diterima, jadi permintaan yang antre di belakang
+permintaan lain menghabiskan anggaran vision-nya sambil menunggu, lalu jatuh
+ke deskripsi cache yang dipakai bersama satu proses (klien B mendengar adegan
+klien A). Aktifkan hanya untuk satu klien: PIPELINE_HTTP_DEADLINES=1.
+
+Endpoint:
+    POST /describe?audio=wav|pcm|none   body = bytes gambar (Content-Type image/*)
+    POST /capture?audio=wav|pcm|none    ambil gambar dari kamera lokal
+    GET  /metrics                       kedalaman antrean + latensi per tahap (JSON)
+    GET  /health                        {"ok": true}
+
+Respons:
+    audio=none : JSON {run_id, text_en, text_id, translated, timings}
+    audio=wav  : body WAV (audio/wav)
+    audio=pcm  : body PCM mentah (audio/L16; rate=..; channels=..)
+    Untuk wav/pcm, teks dikirim di header X-Text-EN / X-Text-ID (URL-encoded)
+    beserta X-Run-Id dan X-Translated.
+
+Backpressure:
+- Maksimal PIPELINE_HTTP_MAX_PENDING permintaan diterima sekaligus
+  (sedang antre + sedang diproses). Lebih dari itu dibalas 429 dengan
+  header Retry-After tanpa menyentuh model.
+- Tiap tahap punya batas konkurensi sendiri (jumlah thread executor tahap),
+  default 1 karena vision (Ollama), Argos dan Piper sama-sama memakai CPU/GPU
+  yang sama.
+  Bila OLLAMA_ENDPOINTS berisi beberapa server, batas vision default
+  mengikuti kapasitas pool (ollamaEndpoints) dan /metrics memuat statistik
+  per endpoint.
+
+Jalankan:
+    python httpService.py
+    python httpService.py --host 0.0.0.0 --port 8765 --max-pending 8
+
+Contoh klien:
+    curl --data-binary @foto.jpg -H "Content-Type: image/jpeg" \\
+         "http://127.0.0.1:8765/describe?audio=wav" -o hasil.wav
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import threading
+import time
+import wave
+from collections import deque
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Deque, Optional
+from urllib.parse import parse_qs, quote, urlparse
+
+import ollamaEndpoints
+from artifactStore import KIND_CAPTURE, get_store, new_run_id
+from generateText import OLLAMA_URL
+from latencyLogger import append_latency
+from pipelineOrchestrator import (
+    STAGE_CAPTURE,
+    STAGE_TRANSLATION,
+    STAGE_TTS,
+    STAGE_VISION,
+    FileOnlySink,
+    PipelineJob,
+    PipelineOrchestrator,
+)
+
+HOST = os.getenv("PIPELINE_HTTP_HOST", "127.0.0.1")
+PORT = int(os.getenv("PIPELINE_HTTP_PORT", "8765"))
+MAX_PENDING = int(os.getenv("PIPELINE_HTTP_MAX_PENDING", "4"))
+MAX_UPLOAD_BYTES = int(float(os.getenv("PIPELINE_HTTP_MAX_UPLOAD_MB", "10")) * 1024 * 1024)
+STAGE_LIMITS = {
+    STAGE_CAPTURE: 1,
+    STAGE_VISION: int(os.getenv("PIPELINE_HTTP_VISION_CONCURRENCY", "0")),  # 0 = kapasitas pool endpoint
+    STAGE_TRANSLATION: int(os.getenv("PIPELINE_HTTP_TRANSLATION_CONCURRENCY", "1")),
+    STAGE_TTS: int(os.getenv("PIPELINE_HTTP_TTS_CONCURRENCY", "1")),
+}
+DEADLINES = os.getenv("PIPELINE_HTTP_DEADLINES", "").strip().lower() in ("1", "true", "yes")
+RETRY_AFTER_SEC = 5
+METRICS_WINDOW = 200       # jumlah durasi terakhir per tahap untuk persentil
+CHUNK_SIZE = 64 * 1024
+AUDIO_MODES = ("wav", "pcm", "none")
+# job.error orkestrator → status HTTP dan tahap yang gagal
+JOB_ERROR_STATUS = {
+    "capture_failed": HTTPStatus.SERVICE_UNAVAILABLE,
+    "vision_or_llm_failed": HTTPStatus.BAD_GATEWAY,
+    "tts_failed": HTTPStatus.INTERNAL_SERVER_ERROR,
+}
+JOB_ERROR_STAGES = {
+    "capture_failed": STAGE_CAPTURE,
+    "vision_or_llm_failed": STAGE_VISION,
+    "tts_failed": STAGE_TTS,
+}
+IMAGE_EXTENSIONS = {
+    "image/jpeg": ".jpg",
+    "image/jpg": ".jpg",
+    "image/png": ".png",
+    "image/bmp": ".bmp",
+    "image/webp": ".webp",
+}
+
+
+class ServiceError(Exception):
+    """Kegagalan yang dibalas ke klien dengan status HTTP tertentu."""
+
+    def __init__(self, status: HTTPStatus, error: str):
+        super().__init__(error)
+        self.status = status
+        self.error = error
+
+
+class StageStats:
+    """
+    Statistik satu tahap dari job yang sudah selesai: jumlah, error, durasi
+    terakhir (tanpa waktu antre) dan waktu antre di executor tahap.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._count = 0
+        self._errors = 0
+        self._durations: Deque[float] = deque(maxlen=METRICS_WINDOW)
+        self._waits: Deque[float] = deque(maxlen=METRICS_WINDOW)
+
+    def record(self, duration: Optional[float], wait: Optional[float], ok: bool) -> None:
+        with self._lock:
+            self._count += 1
+            self._errors += 0 if ok else 1
+            if duration is not None:
+                self._durations.append(duration)
+            if wait is not None:
+                self._waits.append(wait)
+
+    def snapshot(self, status: dict) -> dict:
+        with self._lock:
+            durations = sorted(self._durations)
+            waits = list(self._waits)
+            info = {
+                "limit": status.get("workers"),
+                "active": status.get("active", 0),
+                "waiting": status.get("waiting", 0),
+                "count": self._count,
+                "errors": self._errors,
+            }
+        if durations:
+            info.update({
+                "mean_seconds": statistics.fmean(durations),
+                "p50_seconds": durations[len(durations) // 2],
+                "p95_seconds": durations[min(int(len(durations) * 0.95), len(durations) - 1)],
+                "max_seconds": durations[-1],
+            })
+        if waits:
+            info["mean_wait_seconds"] = statistics.fmean(waits)
+        return info
+
+
+class PipelineService:
+    """
+    Menjalankan permintaan lewat PipelineOrchestrator (mode dua fase, sampler
+    sumber daya, trace; deadline hanya bila DEADLINES) dengan admission
+    control (max_pending). Batas konkurensi per tahap = jumlah thread executor
+    tahap orkestrator. Orkestrator berjalan di event loop thread sendiri;
+    thread handler HTTP menunggu hasil job-nya.
+    """
+
+    def __init__(self, voice=None, with_tts: bool = True, max_pending: int = MAX_PENDING, stage_limits=None,
+                 deadlines: bool = DEADLINES, two_phase: Optional[bool] = None):
+        from generateText import TWO_PHASE_MODE
+
+        self.with_tts = with_tts
+        self.max_pending = max(max_pending, 1)
+        limits = dict(STAGE_LIMITS, **(stage_limits or {}))
+        if limits[STAGE_VISION] <= 0:
+            limits[STAGE_VISION] = ollamaEndpoints.get_pool(OLLAMA_URL).capacity
+        self.orchestrator = PipelineOrchestrator(
+            sink=FileOnlySink(),
+            with_tts=with_tts,
+            max_in_flight=self.max_pending,
+            label=None,
+            voice=voice,
+            deadlines=deadlines,
+            two_phase=TWO_PHASE_MODE if two_phase is None else two_phase,
+            vision_workers=limits[STAGE_VISION],
+            stage_workers=limits,
+            warm_up=True,
+        )
+        self.stages = {name: StageStats(name) for name in limits}
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._accepted = 0
+        self._rejected = 0
+        self._completed = 0
+        self._failed = 0
+        self._loop = asyncio.new_event_loop()
+        self._loop_thread = threading.Thread(target=self._loop.run_forever, name="http-pipeline", daemon=True)
+        self._loop_thread.start()
+
+    def close(self) -> None:
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop_thread.join(timeout=5.0)
+        self.orchestrator.close()
+
+    # --- admission control ---
+
+    def admit(self) -> bool:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._rejected += 1
+                return False
+            self._pending += 1
+            self._accepted += 1
+            return True
+
+    def release(self, ok: bool) -> None:
+        with self._lock:
+            self._pending -= 1
+            if ok:
+                self._completed += 1
+            else:
+                self._failed += 1
+
+    # --- pipeline ---
+
+    def save_upload(self, data: bytes, content_type: str, run_id: str) -> str:
+        from generateText import CAPTURE_DIR
+
+        ext = IMAGE_EXTENSIONS.get(content_type.split(";")[0].strip().lower(), ".jpg")
+        os.makedirs(CAPTURE_DIR, exist_ok=True)
+        image_path = os.path.join(CAPTURE_DIR, f"upload_{run_id}{ext}")
+        with open(image_path, "wb") as f:
+            f.write(data)
+        get_store().record(run_id, KIND_CAPTURE, image_path)
+        return image_path
+
+    def _record(self, job: PipelineJob) -> None:
+        failed_stage = JOB_ERROR_STAGES.get(job.error)
+        for name, stats in self.stages.items():
+            if job.stage_durations.get(name) is not None or name == failed_stage:
+                stats.record(job.stage_durations.get(name), job.stage_waits.get(name), ok=name != failed_stage)
+
+    def describe(self, image_path: Optional[str], run_id: str, audio: str = "wav") -> dict:
+        """
+        Jalankan satu job orkestrator: capture (bila image_path None) → vision →
+        terjemahan → TTS (dilewati untuk audio=none). Return dict hasil;
+        gagal → ServiceError.
+        """
+        job = self.orchestrator.new_job(image_path=image_path, resize=False)
+        job.run_id = run_id
+        job.with_tts = self.with_tts and audio != "none"
+        job = asyncio.run_coroutine_threadsafe(self.orchestrator.process(job), self._loop).result()
+        self._record(job)
+        if job.status != "ok":
+            status = JOB_ERROR_STATUS.get(job.error, HTTPStatus.INTERNAL_SERVER_ERROR)
+            raise ServiceError(status, job.error or job.status)
+
+        waits = {f"{name}_wait_seconds": value for name, value in job.stage_waits.items()}
+        if job.latency_path:
+            append_latency(job.latency_path, waits)
+        durations = {f"{name}_seconds": value for name, value in job.stage_durations.items() if value is not None}
+        return {
+            "run_id": run_id,
+            "text_en": job.text,
+            "text_id": job.spoken_text if job.translated else "",
+            "translated": job.translated,
+            "wav_path": job.wav_path or None,
+            "timings": dict(durations, **job.extra, **waits),
+        }
+
+    def metrics(self) -> dict:
+        with self._lock:
+            queue = {
+                "pending": self._pending,
+                "max_pending": self.max_pending,
+                "accepted": self._accepted,
+                "rejected": self._rejected,
+                "completed": self._completed,
+                "failed": self._failed,
+            }
+        status = self.orchestrator.stage_status()
+        return {
+            "uptime_seconds": time.time() - self.started_at,
+            "queue": queue,
+            "stages": {name: stats.snapshot(status.get(name, {})) for name, stats in self.stages.items()},
+            "endpoints": ollamaEndpoints.get_pool(OLLAMA_URL).stats(),
+        }
+
+
+class _PipelineRequestHandler(BaseHTTPRequestHandler):
+    server_version = "SkripsiPipeline/1.0"
+
+    @property
+    def service(self) -> PipelineService:
+        return self.server.service  # type: ignore[attr-defined]
+
+    def log_message(self, fmt, *args):
+        print(f"[HTTP] {self.address_string()} {fmt % args}")
+
+    def _send_json(self, status: HTTPStatus, payload: dict, headers: Optional[dict] = None):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_audio(self, result: dict, audio: str):
+        with wave.open(result["wav_path"], "rb") as wav_in:
+            rate, channels = wav_in.getframerate(), wav_in.getnchannels()
+            frames = wav_in.readframes(wav_in.getnframes()) if audio == "pcm" else None
+        if frames is None:
+            with open(result["wav_path"], "rb") as f:
+                body, content_type = f.read(), "audio/wav"
+        else:
+            body, content_type = frames, f"audio/L16; rate={rate}; channels={channels}"
+
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("X-Run-Id", result["run_id"])
+        self.send_header("X-Translated", "1" if result["translated"] else "0")
+        self.send_header("X-Text-EN", quote(result["text_en"]))
+        self.send_header("X-Text-ID", quote(result["text_id"]))
+        self.end_headers()
+        view = memoryview(body)
+        for offset in range(0, len(body), CHUNK_SIZE):
+            self.wfile.write(view[offset:offset + CHUNK_SIZE])
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path == "/metrics":
+            self._send_json(HTTPStatus.OK, self.service.metrics())
+        elif path == "/health":
+            self._send_json(HTTPStatus.OK, {"ok": True})
+        else:
+            self._send_json(HTTPStatus.NOT_FOUND, {"ok": False, "error": "endpoint tidak dikenal"})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path not in ("/describe", "/capture"):
+            self._send_json(HTTPStatus.NOT_FOUND, {"ok": False, "error": "endpoint tidak dikenal"})
+            return
+        audio = parse_qs(url.query).get("audio", ["wav"])[0]
+        if audio not in AUDIO_MODES:
+            self._send_json(HTTPStatus.BAD_REQUEST, {"ok": False, "error": f"audio harus salah satu {AUDIO_MODES}"})
+            return
+        if not self.service.with_tts:
+            audio = "none"
+
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            self._send_json(HTTPStatus.BAD_REQUEST, {"ok": False, "error": "Content-Length tidak valid"})
+            return
+        if url.path == "/describe" and length == 0:
+            self._send_json(HTTPStatus.BAD_REQUEST, {"ok": False, "error": "body gambar kosong"})
+            return
+        if length > MAX_UPLOAD_BYTES:
+            self._send_json(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"ok": False, "error": "gambar terlalu besar"})
+            return
+
+        # tolak sebelum membaca body supaya antrean penuh tidak memakan memori
+        if not self.service.admit():
+            self.close_connection = True
+            self._send_json(
+                HTTPStatus.TOO_MANY_REQUESTS,
+                {"ok": False, "error": "antrean penuh", "pending": self.service.max_pending},
+                headers={"Retry-After": str(RETRY_AFTER_SEC)},
+            )
+            return
+
+        ok = False
+        try:
+            run_id = new_run_id()
+            image_path = None
+            if url.path == "/describe":
+                data = self.rfile.read(length)
+                image_path = self.service.save_upload(data, self.headers.get("Content-Type", ""), run_id)
+            result = self.service.describe(image_path, run_id, audio=audio)
+            ok = True
+        except ServiceError as exc:
+            self._send_json(exc.status, {"ok": False, "error": exc.error})
+            return
+        except Exception as exc:
+            print(f"[ERROR] Permintaan HTTP gagal: {exc}")
+            self._send_json(HTTPStatus.INTERNAL_SERVER_ERROR, {"ok": False, "error": str(exc)})
+            return
+        finally:
+            self.service.release(ok)
+
+        if audio == "none":
+            result.pop("wav_path", None)
+            self._send_json(HTTPStatus.OK, dict(result, ok=True))
+        else:
+            self._send_audio(result, audio)
+
+
+def serve(host: str = HOST, port: int = PORT, max_pending: int = MAX_PENDING, with_tts: bool = True):
+    """
+    Load model Piper sekali (bila TTS aktif), lalu layani permintaan sampai Ctrl+C.
+    """
+    voice = None
+    if with_tts:
+        from generateTTS import load_voice
+
+        voice = load_voice()
+    service = PipelineService(voice=voice, with_tts=with_tts, max_pending=max_pending)
+
+    server = ThreadingHTTPServer((host, port), _PipelineRequestHandler)
+    server.daemon_threads = True
+    server.service = service  # type: ignore[attr-defined]
+
+    print(f"[INFO] Layanan HTTP siap di http://{host}:{port} (maks {service.max_pending} permintaan).")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n[INFO] Layanan HTTP dihentikan oleh pengguna.")
+    finally:
+        server.server_close()
+        service.close()
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Layanan HTTP pipeline deskripsi visual.")
+    parser.add_argument("--host", default=HOST, help="Alamat bind (default 127.0.0.1).")
+    parser.add_argument("--port", type=int, default=PORT, help="Port HTTP.")
+    parser.add_argument(
+        "--max-pending",
+        type=int,
+        default=MAX_PENDING,
+        help="Jumlah maksimum permintaan yang diterima sekaligus (selebihnya 429).",
+    )
+    parser.add_argument("--no-tts", action="store_true", help="Hanya kembalikan teks (tanpa Piper).")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    serve(args.host, args.port, max_pending=args.max_pending, with_tts=not args.no_tts)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,19 @@
 import os
 from datetime import datetime
 
-LATENCY_DIR = os.path.join(os.getcwd(), "outputs-time")
-os.makedirs(LATENCY_DIR, exist_ok=True)
+import stageProfiler
+from artifactStore import get_store, new_run_id
+
+LATENCY_DIR = os.path.join(os.getcwd(), "outputs-time")  # dibuat saat laporan pertama ditulis
+
+
+def _extra_rows(extra) -> list:
+    rows = []
+    for key, value in (extra or {}).items():
+        if value is None:
+            continue
+        rows.append(f"{key}={value:.3f}" if isinstance(value, float) else f"{key}={value}")
+    return rows
 
 
 def log_latency(
@@ -10,15 +21,21 @@ def log_latency(
     speech_start_time: datetime,
     context: str = "",
     stage_durations=None,
+    run_id: str = None,
+    extra=None,
 ) -> str:
     """
     Simpan durasi dari awal capture hingga audio mulai diputar, serta
     (opsional) durasi per tahap pipeline.
+    run_id menautkan laporan ke artefak lain pada run yang sama.
+    extra berisi metrik tambahan {key: nilai} yang ditulis apa adanya
+    (misal ringkasan resourceSampler).
     Return path file laporan.
     """
     latency = speech_start_time - start_time
-    timestamp = speech_start_time.strftime("%Y%m%d_%H%M%S")
-    file_path = os.path.join(LATENCY_DIR, f"latency_{timestamp}.txt")
+    file_id = run_id or new_run_id()
+    file_path = os.path.join(LATENCY_DIR, f"latency_{file_id}.txt")
+    os.makedirs(LATENCY_DIR, exist_ok=True)
 
     rows = [
         f"start_time={start_time.isoformat()}",
@@ -32,15 +49,38 @@ def log_latency(
                 continue
             rows.append(f"{key}_seconds={value:.3f}")
 
+    rows += _extra_rows(extra)
+
     if context:
         rows.append(f"context={context}")
 
+    if run_id:
+        rows.append(f"run_id={run_id}")
+
+    rows += stageProfiler.write_results(file_path, run_id)
+
     try:
         with open(file_path, "w", encoding="utf-8") as f:
             f.write("\n".join(rows))
         print(f"[PIPELINE] Data latensi disimpan: {file_path}")
+        if run_id:
+            get_store().record_latency(run_id, file_path, latency.total_seconds())
     except Exception as exc:
         print(f"[WARN] Gagal menyimpan data latensi: {exc}")
 
     return file_path
 
+
+def append_latency(latency_path: str, extra) -> None:
+    """
+    Tambahkan metrik yang baru diketahui setelah laporan ditulis (misal
+    utterance_gap_seconds saat playback dimulai) ke laporan yang sama.
+    """
+    rows = _extra_rows(extra)
+    if not latency_path or not rows:
+        return
+    try:
+        with open(latency_path, "a", encoding="utf-8") as f:
+            f.write("\n" + "\n".join(rows))
+    except Exception as exc:
+        print(f"[WARN] Gagal menambahkan data latensi: {exc}")
@@ -0,0 +1,342 @@
+"""
+Pembagian beban permintaan vision ke beberapa server Ollama.
+
+Daftar endpoint diambil dari OLLAMA_ENDPOINTS (dipisah koma, bobot opsional
+setelah "="). Bila kosong, hanya OLLAMA_URL di generateText yang dipakai,
+jadi perilaku satu server tidak berubah:
+
+    OLLAMA_ENDPOINTS="http://127.0.0.1:11434,http://192.168.1.21:11434=1,http://192.168.1.30:11434=3"
+
+Routing:
+- weighted least-outstanding: permintaan dikirim ke endpoint sehat dengan
+  (permintaan berjalan + 1) / bobot terkecil; bobot menyatakan kapasitas
+  relatif (misal workstation = 3, Jetson = 1).
+- endpoint yang gagal OLLAMA_ENDPOINT_MAX_FAILURES kali berturut-turut
+  (koneksi ditolak, HTTP 5xx/404) ditandai down selama
+  OLLAMA_ENDPOINT_COOLDOWN_SEC; health check GET /api/tags di thread latar
+  (setiap OLLAMA_HEALTH_INTERVAL_SEC, hanya bila > 1 endpoint) menaikkannya
+  kembali lebih cepat atau menurunkannya sebelum ada permintaan yang gagal.
+- permintaan yang gagal dicoba ulang di endpoint lain (maksimal satu kali
+  per endpoint). Timeout tidak dicoba ulang karena batas waktunya berasal
+  dari anggaran deadline pemanggil; HTTP 400 juga tidak (payload salah).
+  Semua percobaan berbagi satu batas waktu: retry hanya mendapat sisa
+  timeout dan dilewati bila sisanya < OLLAMA_MIN_RETRY_SEC.
+
+Statistik per endpoint (jumlah, gagal, latensi mean/p50/p95) tersedia lewat
+get_pool().stats() dan dicetak di laporan batch.
+
+Konfigurasi:
+    OLLAMA_ENDPOINTS              : daftar URL[=bobot] (default kosong = OLLAMA_URL)
+    OLLAMA_ENDPOINT_MAX_FAILURES  : kegagalan berturut-turut sebelum down (default 2)
+    OLLAMA_ENDPOINT_COOLDOWN_SEC  : lama endpoint dianggap down (default 15)
+    OLLAMA_HEALTH_INTERVAL_SEC    : interval health check (default 5, 0 = nonaktif)
+    OLLAMA_MIN_RETRY_SEC          : sisa timeout minimum untuk mencoba ulang (default 2)
+
+Contoh:
+    python ollamaEndpoints.py      # health check + statistik endpoint terkonfigurasi
+"""
+
+import math
+import os
+import statistics
+import threading
+import time
+from collections import deque
+from typing import Deque, List, Optional, Tuple
+
+from spanTracer import span
+
+ENDPOINTS = os.getenv("OLLAMA_ENDPOINTS", "")
+MAX_FAILURES = int(os.getenv("OLLAMA_ENDPOINT_MAX_FAILURES", "2"))
+COOLDOWN_SEC = float(os.getenv("OLLAMA_ENDPOINT_COOLDOWN_SEC", "15"))
+HEALTH_INTERVAL_SEC = float(os.getenv("OLLAMA_HEALTH_INTERVAL_SEC", "5"))
+MIN_RETRY_SEC = float(os.getenv("OLLAMA_MIN_RETRY_SEC", "2"))
+HEALTH_TIMEOUT_SEC = 2.0
+LATENCY_WINDOW = 500  # jumlah latensi terakhir per endpoint untuk persentil
+CHAT_PATH = "/api/chat"
+
+
+def parse_endpoints(spec: str) -> List[Tuple[str, float]]:
+    """
+    "url[=bobot],url[=bobot]" → [(base_url, bobot)]. URL boleh berupa base
+    (http://host:11434) atau lengkap dengan /api/chat.
+    """
+    endpoints = []
+    for item in spec.replace("\n", ",").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        url, _, weight = item.partition("=")
+        try:
+            weight = float(weight) if weight.strip() else 1.0
+        except ValueError:
+            raise ValueError(f"Bobot endpoint tidak valid: {item}")
+        if weight <= 0:
+            raise ValueError(f"Bobot endpoint harus > 0: {item}")
+        url = url.strip().rstrip("/")
+        if url.endswith(CHAT_PATH):
+            url = url[: -len(CHAT_PATH)]
+        endpoints.append((url, weight))
+    return endpoints
+
+
+class Endpoint:
+    """Satu server Ollama beserta status kesehatan dan statistiknya (dijaga kunci pool)."""
+
+    def __init__(self, url: str, weight: float = 1.0):
+        self.url = url
+        self.weight = weight
+        self.outstanding = 0
+        self.consecutive_failures = 0
+        self.down_until = 0.0
+        self.requests = 0
+        self.ok = 0
+        self.failed = 0
+        self.marked_down = 0
+        self.latencies: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self.latency_total = 0.0
+
+    @property
+    def chat_url(self) -> str:
+        return f"{self.url}{CHAT_PATH}"
+
+    def healthy(self, now: float) -> bool:
+        return self.down_until <= now
+
+    def load(self) -> float:
+        return (self.outstanding + 1) / self.weight
+
+    def snapshot(self, now: float) -> dict:
+        latencies = list(self.latencies)
+        return {
+            "endpoint": self.url,
+            "weight": self.weight,
+            "healthy": int(self.healthy(now)),
+            "outstanding": self.outstanding,
+            "requests": self.requests,
+            "ok": self.ok,
+            "failed": self.failed,
+            "marked_down": self.marked_down,
+            "latency_mean": self.latency_total / self.ok if self.ok else 0.0,
+            "latency_p50": statistics.median(latencies) if latencies else 0.0,
+            "latency_p95": (statistics.quantiles(latencies, n=20)[-1]
+                            if len(latencies) >= 2 else (latencies[0] if latencies else 0.0)),
+        }
+
+
+class EndpointPool:
+    """Kumpulan endpoint dengan routing, retry dan health check."""
+
+    def __init__(self, endpoints: List[Tuple[str, float]], health_interval: float = HEALTH_INTERVAL_SEC):
+        if not endpoints:
+            raise ValueError("Minimal satu endpoint Ollama diperlukan.")
+        self.endpoints = [Endpoint(url, weight) for url, weight in endpoints]
+        self.health_interval = health_interval
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._health_thread: Optional[threading.Thread] = None
+
+    @property
+    def capacity(self) -> int:
+        """Jumlah permintaan bersamaan yang wajar (dipakai untuk jumlah worker vision)."""
+        return max(len(self.endpoints), int(math.ceil(sum(e.weight for e in self.endpoints))))
+
+    # --- routing ---
+
+    def acquire(self, exclude=(), first_attempt: bool = True) -> Optional[Endpoint]:
+        """
+        Pilih endpoint sehat dengan beban berbobot terkecil lalu tambah
+        outstanding-nya. Bila semua down, percobaan pertama tetap dikirim ke
+        endpoint yang paling cepat pulih.
+        """
+        with self._lock:
+            now = time.monotonic()
+            candidates = [e for e in self.endpoints if e not in exclude]
+            healthy = [e for e in candidates if e.healthy(now)]
+            if healthy:
+                endpoint = min(healthy, key=lambda e: (e.load(), e.requests))
+            elif candidates and first_attempt:
+                endpoint = min(candidates, key=lambda e: e.down_until)
+            else:
+                return None
+            endpoint.outstanding += 1
+            endpoint.requests += 1
+            return endpoint
+
+    def release(self, endpoint: Endpoint, seconds: float, ok: bool, count_failure: bool = True) -> None:
+        with self._lock:
+            endpoint.outstanding -= 1
+            if ok:
+                endpoint.ok += 1
+                endpoint.consecutive_failures = 0
+                endpoint.latencies.append(seconds)
+                endpoint.latency_total += seconds
+                return
+            endpoint.failed += 1
+            if count_failure:
+                endpoint.consecutive_failures += 1
+                if endpoint.consecutive_failures >= MAX_FAILURES:
+                    self._mark_down(endpoint)
+
+    def _mark_down(self, endpoint: Endpoint) -> None:
+        """Dipanggil dengan _lock dipegang."""
+        now = time.monotonic()
+        if endpoint.healthy(now):
+            endpoint.marked_down += 1
+            if len(self.endpoints) > 1:
+                print(f"[WARN] Endpoint Ollama {endpoint.url} ditandai down selama {COOLDOWN_SEC:g} s.")
+        endpoint.down_until = now + COOLDOWN_SEC
+
+    def post_chat(self, payload: dict, timeout: Optional[float] = None, info: Optional[dict] = None) -> Optional[dict]:
+        """
+        Kirim payload /api/chat dengan routing + retry. timeout berlaku untuk
+        seluruh percobaan, bukan per percobaan. Return JSON respons atau None.
+        info (opsional) diisi vision_endpoint dan vision_attempts.
+        """
+        import requests
+
+        model = payload["model"]
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        tried = []
+        while len(tried) < len(self.endpoints):
+            attempt_timeout = timeout
+            if deadline is not None and tried:
+                attempt_timeout = deadline - time.monotonic()
+                if attempt_timeout < MIN_RETRY_SEC:
+                    print(f"[WARN] Sisa waktu {max(attempt_timeout, 0.0):.1f} detik tidak cukup "
+                          f"untuk mencoba ulang di endpoint Ollama lain.")
+                    break
+            endpoint = self.acquire(exclude=tried, first_attempt=not tried)
+            if endpoint is None:
+                break
+            tried.append(endpoint)
+            if info is not None:
+                info["vision_endpoint"] = endpoint.url
+                info["vision_attempts"] = len(tried)
+            start = time.perf_counter()
+            try:
+                with span("http_wait", model=model, endpoint=endpoint.url):
+                    resp = requests.post(endpoint.chat_url, json=payload, timeout=attempt_timeout)
+                    resp.raise_for_status()
+                with span("json_parse"):
+                    data = resp.json()
+            except requests.Timeout:
+                limit = f"dalam {attempt_timeout:.1f} detik" if attempt_timeout is not None else "(timeout koneksi)"
+                print(f"[ERROR] Ollama tidak merespons {limit} (model '{model}', {endpoint.url}).")
+                self.release(endpoint, time.perf_counter() - start, ok=False, count_failure=False)
+                return None
+            except requests.HTTPError as e:
+                status = e.response.status_code if e.response is not None else 0
+                print(f"[ERROR] Ollama {endpoint.url} membalas HTTP {status} untuk model '{model}': {e}")
+                self.release(endpoint, time.perf_counter() - start, ok=False, count_failure=status != 400)
+                if status == 400:
+                    return None
+            except ValueError as e:
+                print(f"[ERROR] Gagal parse JSON dari Ollama {endpoint.url}: {e}\nRespons mentah: {resp.text}")
+                self.release(endpoint, time.perf_counter() - start, ok=False)
+            except Exception as e:
+                print(f"[ERROR] Gagal memanggil Ollama di {endpoint.url}. "
+                      f"Pastikan `ollama serve` aktif dan model '{model}' tersedia. Detail: {e}")
+                self.release(endpoint, time.perf_counter() - start, ok=False)
+            else:
+                self.release(endpoint, time.perf_counter() - start, ok=True)
+                return data
+            if len(tried) < len(self.endpoints):
+                print("[INFO] Mencoba ulang di endpoint Ollama lain...")
+        return None
+
+    # --- health check ---
+
+    def check(self, endpoint: Endpoint) -> bool:
+        """GET /api/tags; naikkan atau turunkan endpoint sesuai hasilnya."""
+        import requests
+
+        try:
+            with span("ollama_health", endpoint=endpoint.url):
+                requests.get(f"{endpoint.url}/api/tags", timeout=HEALTH_TIMEOUT_SEC).raise_for_status()
+            ok = True
+        except Exception:
+            ok = False
+        with self._lock:
+            if ok:
+                if not endpoint.healthy(time.monotonic()):
+                    print(f"[INFO] Endpoint Ollama {endpoint.url} kembali sehat.")
+                endpoint.down_until = 0.0
+                endpoint.consecutive_failures = 0
+            else:
+                self._mark_down(endpoint)
+        return ok
+
+    def check_all(self) -> List[bool]:
+        return [self.check(endpoint) for endpoint in self.endpoints]
+
+    def _health_loop(self) -> None:
+        while not self._stop.wait(self.health_interval):
+            self.check_all()
+
+    def start_health_checks(self) -> None:
+        if self.health_interval <= 0 or len(self.endpoints) < 2 or self._health_thread is not None:
+            return
+        self._health_thread = threading.Thread(target=self._health_loop, name="ollama-health", daemon=True)
+        self._health_thread.start()
+
+    def close(self) -> None:
+        self._stop.set()
+
+    # --- statistik ---
+
+    def stats(self) -> List[dict]:
+        with self._lock:
+            now = time.monotonic()
+            return [endpoint.snapshot(now) for endpoint in self.endpoints]
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            for e in self.endpoints:
+                e.requests = e.ok = e.failed = e.marked_down = 0
+                e.latency_total = 0.0
+                e.latencies.clear()
+
+
+_pool: Optional[EndpointPool] = None
+_pool_key = None
+_pool_lock = threading.Lock()
+
+
+def get_pool(default_url: str) -> EndpointPool:
+    """
+    Pool bersama untuk proses ini. Dibangun ulang bila ENDPOINTS atau
+    default_url (OLLAMA_URL) berubah, misal saat batch/uji beban mengganti URL.
+    """
+    global _pool, _pool_key
+    key = (ENDPOINTS, default_url)
+    with _pool_lock:
+        if _pool is None or _pool_key != key:
+            if _pool is not None:
+                _pool.close()
+            _pool = EndpointPool(parse_endpoints(ENDPOINTS or default_url))
+            _pool_key = key
+            _pool.start_health_checks()
+        return _pool
+
+
+def print_stats(stats: List[dict]) -> None:
+    print(f"{'endpoint':32s} {'bobot':>5s} {'sehat':>5s} {'req':>5s} {'ok':>5s} {'gagal':>5s} "
+          f"{'down':>4s} {'mean':>7s} {'p50':>7s} {'p95':>7s}")
+    for s in stats:
+        print(f"{s['endpoint'][:32]:32s} {s['weight']:5g} {s['healthy']:5d} {s['requests']:5d} {s['ok']:5d} "
+              f"{s['failed']:5d} {s['marked_down']:4d} {s['latency_mean']:7.2f} {s['latency_p50']:7.2f} "
+              f"{s['latency_p95']:7.2f}")
+
+
+def main():
+    from generateText import OLLAMA_URL
+
+    pool = get_pool(OLLAMA_URL)
+    for endpoint, ok in zip(pool.endpoints, pool.check_all()):
+        print(f"[{'OK' if ok else 'DOWN'}] {endpoint.url} (bobot {endpoint.weight:g})")
+    print_stats(pool.stats())
+
+
+if __name__ == "__main__":
+    main()
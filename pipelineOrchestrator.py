@@ -0,0 +1,991 @@
+"""
+Orkestrator pipeline asinkron: capture → vision → translate → TTS → play.
+
+Dipakai bersama oleh main.py (tombol GPIO), testing-pipeline/run_pipeline_windows.py
+(kamera laptop), testing-pipeline/run_batch_testing_data.py (folder gambar) dan
+httpService.py (permintaan HTTP).
+
+- Source menghasilkan PipelineJob (GPIO, loop kamera, folder gambar).
+- Setiap tahap punya executor (thread) sendiri sehingga tahap CPU-bound
+  tidak memblokir event loop dan job berbeda bisa tumpang tindih
+  (misal TTS gambar ke-N berjalan bersamaan dengan vision gambar ke-N+1).
+- Durasi tiap tahap diukur di dalam thread worker dengan time.perf_counter
+  dan dicatat ke latencyLogger dengan key yang sama seperti sebelumnya.
+- Sink memutar hasil audio (aplay, winsound, atau tidak sama sekali).
+- Mode dua fase (two_phase=True): query bahaya singkat diterjemahkan,
+  disintesis dan diputar lebih dulu, sementara deskripsi lengkap dibuat
+  di executor vision. Waktu sampai audio bahaya dicatat sebagai
+  time_to_hazard_audio_seconds.
+- Narasi kontinu (narration=True + ContinuousNarrationSource): capture dan
+  vision berikutnya dimulai begitu teks job sebelumnya siap, jadi inferensi
+  berjalan selagi audio diputar. Deskripsi yang adegannya sudah berubah
+  (dibanding capture terbaru) dibuang, dan jeda antar-ucapan dicatat sebagai
+  utterance_gap_seconds.
+- Dengan PIPELINE_TRACE=1 setiap tahap menjadi span (spanTracer) dan
+  timeline ditulis ke outputs-time/trace_<run_id>.json setelah job selesai.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import AsyncIterator, Callable, Dict, Iterable, Optional, Set
+
+from artifactStore import KIND_CAPTURE, get_store, new_run_id
+from audioCues import CUE_FAILED, CUE_PROCESSING, CUE_STILL_PROCESSING
+from audioPostprocess import postprocess_wav
+from deadlinePolicy import DeadlineTracker, previous_view_notice, vision_with_fallbacks
+from generateText import (
+    SCENE_CHANGE_THRESHOLD,
+    capture_image,
+    generate_hazard_from_image_path,
+    generate_text_from_image_path,
+    hazard_run_id,
+    preprocess_image,
+    scene_difference,
+    scene_signature,
+)
+from generateTTS import load_voice, tts_from_text
+from latencyLogger import append_latency, log_latency
+from playAudio import DEFAULT_DEVICE, play_wav, play_wav_winsound
+from resourceSampler import get_sampler
+import spanTracer
+from spanTracer import span
+from stageProfiler import append_results, bind_run
+from textBudget import apply_budget
+from translateText import persist_translated_text, translate_text_to_indonesian
+from translateText import warm_up as warm_up_translation
+from videoKeyframes import Keyframe, KeyframeStats, iter_keyframes
+
+# Nama tahap sekaligus key stage_durations di laporan latensi
+STAGE_CAPTURE = "capture"
+STAGE_VISION = "vision_generate"
+STAGE_TRANSLATION = "translation"
+STAGE_TTS = "tts"
+STAGE_PLAYBACK = "playback"
+
+# Key durasi fase bahaya (mode dua fase), dicatat lewat `extra` dengan akhiran _seconds
+HAZARD_VISION = "hazard_vision"
+HAZARD_TRANSLATION = "hazard_translation"
+HAZARD_TTS = "hazard_tts"
+HAZARD_PLAYBACK = "hazard_playback"
+
+
+@dataclass
+class PipelineJob:
+    """
+    Satu eksekusi pipeline beserta hasil dan durasi per tahap.
+    """
+
+    job_id: int
+    run_id: str = field(default_factory=new_run_id)
+    pressed_at: float = field(default_factory=time.monotonic)  # waktu tombol ditekan (monotonic)
+    image_path: Optional[str] = None   # None = ambil dari kamera
+    output_name: Optional[str] = None
+    resize: bool = False               # kamera: resolusi penuh, batch: resize
+    with_tts: bool = True              # False: job ini berhenti setelah terjemahan (misal HTTP audio=none)
+    start_time: Optional[datetime] = None
+    speech_start_time: Optional[datetime] = None
+    text: str = ""
+    txt_path: str = ""
+    spoken_text: str = ""
+    translated: bool = False
+    wav_path: str = ""
+    latency_path: str = ""
+    status: str = "pending"
+    error: str = ""
+    stage_durations: Dict[str, Optional[float]] = field(default_factory=dict)
+    stage_waits: Dict[str, float] = field(default_factory=dict)  # waktu antre di executor tahap
+    extra: Dict[str, object] = field(default_factory=dict)  # metrik tambahan untuk laporan latensi
+    abandoned: Set[str] = field(default_factory=set)  # key tahap yang ditinggalkan karena deadline
+    deadline: Optional[DeadlineTracker] = None
+    text_ready: Optional[asyncio.Event] = None  # narasi kontinu: di-set saat teks siap diucapkan
+    scene: object = field(default=None, repr=False)  # scene_signature capture (narasi kontinu)
+    prepared: object = field(default=None, repr=False)  # PreparedImage hasil prefetch (batch)
+
+    def as_row(self) -> dict:
+        """Baris laporan CSV (format batch_results_*.csv)."""
+        return {
+            "image": Path(self.image_path).name if self.image_path else "",
+            "status": self.status,
+            "error": self.error,
+            "txt_path": self.txt_path,
+            "translated": self.translated,
+            "spoken_text": self.spoken_text,
+            "wav_path": self.wav_path,
+            "run_id": self.run_id,
+            "vision_seconds": self.stage_durations.get(STAGE_VISION, ""),
+            "vision_preprocess_seconds": self.extra.get("vision_preprocess_seconds", ""),
+            "vision_decode_scale": self.extra.get("vision_decode_scale", ""),
+            "vision_prefetched": self.extra.get("vision_prefetched", ""),
+            "vision_prefetch_wait_seconds": self.extra.get("vision_prefetch_wait_seconds", ""),
+            "vision_tokens_est": self.extra.get("vision_tokens_est", ""),
+            "vision_endpoint": self.extra.get("vision_endpoint", ""),
+            "vision_cache_hit": self.extra.get("vision_cache_hit", ""),
+            "ollama_load_seconds": self.extra.get("ollama_load_seconds", ""),
+            "ollama_prompt_eval_seconds": self.extra.get("ollama_prompt_eval_seconds", ""),
+            "ollama_prompt_eval_count": self.extra.get("ollama_prompt_eval_count", ""),
+            "ollama_eval_seconds": self.extra.get("ollama_eval_seconds", ""),
+            "ollama_eval_count": self.extra.get("ollama_eval_count", ""),
+            "ollama_total_seconds": self.extra.get("ollama_total_seconds", ""),
+            "ollama_prompt_tokens_per_sec": self.extra.get("ollama_prompt_tokens_per_sec", ""),
+            "ollama_eval_tokens_per_sec": self.extra.get("ollama_eval_tokens_per_sec", ""),
+            "vision_client_overhead_seconds": self.extra.get("vision_client_overhead_seconds", ""),
+            "translation_seconds": self.stage_durations.get(STAGE_TRANSLATION, ""),
+            "tts_seconds": self.stage_durations.get(STAGE_TTS, ""),
+            "audio_postprocess_seconds": self.extra.get("audio_postprocess_seconds", ""),
+        }
+
+
+class Stage:
+    """
+    Satu tahap pipeline dengan executor sendiri.
+    Durasi diukur di dalam thread worker sehingga waktu antre tidak ikut terhitung.
+
+    Panggilan yang ditinggalkan karena deadline (abandon()) tetap berjalan
+    sampai selesai di worker; durasinya tidak lagi ditulis ke job, dan job
+    berikutnya yang antre di belakangnya mencatat lama antrean tersebut sebagai
+    <key>_queued_behind_abandoned_seconds.
+    """
+
+    def __init__(self, name: str, workers: int = 1):
+        self.name = name
+        self.workers = workers
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"stage-{name}")
+        self._queued = 0
+        self._running = 0
+        self._lock = threading.Lock()
+        self._in_worker: Set[tuple] = set()    # (run_id, key) yang sedang dieksekusi
+        self._stragglers: Set[tuple] = set()   # (run_id, key) yang ditinggalkan tetapi masih berjalan
+
+    @property
+    def running(self) -> bool:
+        """True selama ada pekerjaan yang sedang dieksekusi di worker tahap ini (bukan sekadar antre)."""
+        return self._running > 0
+
+    def status(self) -> dict:
+        with self._lock:
+            return {"workers": self.workers, "active": self._running, "waiting": self._queued}
+
+    def _counted(self, func: Callable, *args, **kwargs):
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+        try:
+            return func(*args, **kwargs)
+        finally:
+            with self._lock:
+                self._running -= 1
+
+    async def submit(self, func: Callable, *args, **kwargs):
+        return await asyncio.wrap_future(self.start(func, *args, **kwargs))
+
+    def start(self, func: Callable, *args, **kwargs) -> Future:
+        """Jadwalkan func di executor tahap tanpa menunggu (misal pemanasan model)."""
+        with self._lock:
+            self._queued += 1
+        future = self._executor.submit(self._counted, func, *args, **kwargs)
+        future.add_done_callback(self._dequeue_cancelled)
+        return future
+
+    def _dequeue_cancelled(self, future: Future) -> None:
+        if future.cancelled():  # dibatalkan (misal wait_for timeout) sebelum sempat dieksekusi
+            with self._lock:
+                self._queued -= 1
+
+    async def run(self, job: PipelineJob, func: Callable, *args, **kwargs):
+        return await self.run_as(self.name, job, func, *args, **kwargs)
+
+    async def run_as(self, key: str, job: PipelineJob, func: Callable, *args, **kwargs):
+        """Seperti run(), tetapi durasi dicatat dengan key lain (misal fase bahaya)."""
+        submitted = time.perf_counter()
+        behind_abandoned = bool(self._stragglers)
+
+        def _timed():
+            bind_run(job.run_id)
+            spanTracer.bind_run(job.run_id)
+            t0 = time.perf_counter()
+            job.stage_waits[key] = t0 - submitted
+            if behind_abandoned:
+                waited = t0 - submitted
+                job.extra[f"{key}_queued_behind_abandoned_seconds"] = waited
+                print(f"[DEADLINE] {key} job {job.job_id} antre {waited:.2f}s di belakang panggilan yang ditinggalkan.")
+            with self._lock:
+                self._in_worker.add((job.run_id, key))
+            try:
+                with span(key, run_id=job.run_id, job_id=job.job_id):
+                    return func(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - t0
+                with self._lock:
+                    self._in_worker.discard((job.run_id, key))
+                    straggler = (job.run_id, key) in self._stragglers
+                    self._stragglers.discard((job.run_id, key))
+                if straggler:
+                    print(f"[DEADLINE] {key} job {job.job_id} yang ditinggalkan selesai setelah {elapsed:.2f}s.")
+                if key not in job.abandoned:
+                    job.stage_durations[key] = elapsed
+                bind_run(None)  # submit() berikutnya di thread ini bukan milik job ini
+                spanTracer.bind_run(None)
+
+        return await self.submit(_timed)
+
+    def abandon(self, job: PipelineJob, key: str) -> None:
+        """
+        Tandai tahap `key` job ini ditinggalkan (misal asyncio.wait_for timeout):
+        durasi yang sudah dicatat pemanggil tidak ditimpa saat panggilan selesai.
+        """
+        job.abandoned.add(key)
+        with self._lock:
+            if (job.run_id, key) in self._in_worker:
+                self._stragglers.add((job.run_id, key))
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+
+# === SINK ===
+
+class AplaySink:
+    """Putar WAV lewat ALSA (Jetson)."""
+
+    def __init__(self, device: str = DEFAULT_DEVICE):
+        self.device = device
+
+    def play(self, wav_path: str):
+        play_wav(wav_path, device=self.device)
+
+
+class WinsoundSink:
+    """Putar WAV lewat speaker laptop Windows."""
+
+    def play(self, wav_path: str):
+        play_wav_winsound(wav_path)
+
+
+class FileOnlySink:
+    """Hanya simpan .wav, tanpa playback (batch testing)."""
+
+    def play(self, wav_path: str):
+        pass
+
+
+# === SOURCE ===
+
+class GPIOButtonSource:
+    """
+    Satu job per tekanan tombol. Tekanan saat pipeline masih berjalan diabaikan.
+    """
+
+    def __init__(self, pin: int, debounce_sec: float = 0.15):
+        self.pin = pin
+        self.debounce_sec = debounce_sec
+
+    async def jobs(self, orchestrator: "PipelineOrchestrator") -> AsyncIterator[PipelineJob]:
+        import Jetson.GPIO as GPIO
+
+        loop = asyncio.get_running_loop()
+        presses: asyncio.Queue = asyncio.Queue()
+        last_press_time = 0.0
+
+        def _button_callback(channel):
+            # dipanggil dari thread Jetson.GPIO, debounce berdasarkan waktu
+            nonlocal last_press_time
+            now = time.monotonic()
+            if now - last_press_time < self.debounce_sec:
+                return
+            last_press_time = now
+            loop.call_soon_threadsafe(presses.put_nowait, now)
+
+        GPIO.setmode(GPIO.BOARD)
+        GPIO.setup(self.pin, GPIO.IN, pull_up_down=GPIO.PUD_UP)
+        GPIO.add_event_detect(
+            self.pin,
+            GPIO.FALLING,
+            callback=_button_callback,
+            bouncetime=1  # kecil, debounce utama di logika waktu
+        )
+        try:
+            while True:
+                pressed_at = await presses.get()
+                if orchestrator.busy:
+                    print("[INFO] Tombol ditekan, tapi pipeline masih berjalan. Abaikan.")
+                    orchestrator.play_cue(CUE_STILL_PROCESSING)
+                    continue
+                print("[EVENT] Tombol ditekan! Pipeline akan dijalankan...")
+                yield orchestrator.new_job(pressed_at=pressed_at)
+        finally:
+            GPIO.cleanup()
+
+
+class CameraLoopSource:
+    """
+    Capture dari kamera sekali, atau berulang dengan jeda `delay` detik
+    setelah job sebelumnya selesai (termasuk playback).
+    """
+
+    def __init__(self, loop: bool = False, delay: float = 3.0):
+        self.loop = loop
+        self.delay = delay
+
+    async def jobs(self, orchestrator: "PipelineOrchestrator") -> AsyncIterator[PipelineJob]:
+        while True:
+            yield orchestrator.new_job()
+            if not self.loop:
+                return
+            await orchestrator.wait_idle()
+            await asyncio.sleep(max(self.delay, 0.5))
+
+
+class ContinuousNarrationSource:
+    """
+    Narasi kontinu dari kamera: job berikutnya dibuat begitu teks job
+    sebelumnya siap (setelah terjemahan), tidak menunggu playback selesai.
+    Pakai bersama PipelineOrchestrator(narration=True, max_in_flight=2)
+    supaya vision job berikutnya tumpang tindih dengan TTS/playback.
+    """
+
+    def __init__(self, max_jobs: Optional[int] = None):
+        self.max_jobs = max_jobs
+
+    async def jobs(self, orchestrator: "PipelineOrchestrator") -> AsyncIterator[PipelineJob]:
+        count = 0
+        while self.max_jobs is None or count < self.max_jobs:
+            job = orchestrator.new_job()
+            job.text_ready = asyncio.Event()
+            yield job
+            count += 1
+            await job.text_ready.wait()
+
+
+class ImageFolderSource:
+    """
+    Satu job per file gambar (tanpa kamera). Backpressure diatur oleh
+    max_in_flight pada orkestrator.
+
+    Dengan prefetch > 0, decode/resize/encode (preprocess_image) untuk
+    `prefetch` gambar berikutnya dikerjakan di thread pool terpisah selagi
+    gambar sebelumnya masih di tahap vision, sehingga tahap vision hanya
+    berisi inferensi. Waktu preprocessing tetap tercatat sebagai
+    vision_preprocess_seconds dan waktu menunggu hasil prefetch sebagai
+    vision_prefetch_wait_seconds.
+    """
+
+    def __init__(self, images: Iterable[Path], resize: bool = True, prefetch: int = 0):
+        self.images = list(images)
+        self.resize = resize
+        self.prefetch = max(prefetch, 0)
+
+    async def jobs(self, orchestrator: "PipelineOrchestrator") -> AsyncIterator[PipelineJob]:
+        total = len(self.images)
+        if not self.prefetch:
+            for idx, image_path in enumerate(self.images, 1):
+                print(f"[INFO] ({idx}/{total}) {image_path.name}")
+                yield orchestrator.new_job(
+                    image_path=str(image_path), output_name=image_path.stem, resize=self.resize
+                )
+            return
+
+        pool = ThreadPoolExecutor(
+            max_workers=min(self.prefetch, os.cpu_count() or 1), thread_name_prefix="prefetch"
+        )
+        upcoming = iter(enumerate(self.images, 1))
+        pending = deque()
+
+        def fill():
+            while len(pending) < self.prefetch + 1:
+                item = next(upcoming, None)
+                if item is None:
+                    return
+                idx, image_path = item
+                future = pool.submit(preprocess_image, str(image_path), self.resize)
+                pending.append((idx, image_path, future))
+
+        try:
+            fill()
+            while pending:
+                idx, image_path, future = pending.popleft()
+                wait_start = time.perf_counter()
+                prepared = await asyncio.wrap_future(future)
+                wait_seconds = time.perf_counter() - wait_start
+                fill()
+                print(f"[INFO] ({idx}/{total}) {image_path.name}")
+                job = orchestrator.new_job(
+                    image_path=str(image_path), output_name=image_path.stem, resize=self.resize
+                )
+                job.prepared = prepared
+                job.extra["vision_prefetch_wait_seconds"] = wait_seconds
+                yield job
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+class VideoKeyframeSource:
+    """
+    Satu job per keyframe dari file video (lihat videoKeyframes.py).
+    Decode dan penilaian perubahan adegan berjalan di thread terpisah agar
+    event loop tidak terblokir. Keyframe disimpan sebagai JPEG di frame_dir
+    karena tahap vision membaca dari path. Statistik frame (total, dilewati,
+    keyframe) tersedia di `stats` setelah source habis.
+    """
+
+    def __init__(self, video_path: Path, frame_dir: Path, resize: bool = True):
+        self.video_path = Path(video_path)
+        self.frame_dir = Path(frame_dir)
+        self.resize = resize
+        self.stats = KeyframeStats()
+
+    def _save(self, key: Keyframe, run_id: str) -> Optional[str]:
+        import cv2
+
+        path = self.frame_dir / f"{self.video_path.stem}_{key.index:06d}.jpg"
+        try:
+            self.frame_dir.mkdir(parents=True, exist_ok=True)
+            if not cv2.imwrite(str(path), key.frame):
+                raise OSError("cv2.imwrite gagal")
+        except Exception as exc:
+            print(f"[ERROR] Gagal menyimpan keyframe {key.index}: {exc}")
+            return None
+        get_store().record(run_id, KIND_CAPTURE, str(path))
+        return str(path)
+
+    async def jobs(self, orchestrator: "PipelineOrchestrator") -> AsyncIterator[PipelineJob]:
+        loop = asyncio.get_running_loop()
+        keyframes = iter_keyframes(str(self.video_path), self.stats)
+        while True:
+            key = await loop.run_in_executor(None, next, keyframes, None)
+            if key is None:
+                return
+            print(f"[INFO] Keyframe {key.index} ({key.timestamp:.2f} s, skor {key.score:.3f})")
+            job = orchestrator.new_job(output_name=f"{self.video_path.stem}_{key.index:06d}", resize=self.resize)
+            job.image_path = await loop.run_in_executor(None, self._save, key, job.run_id)
+            if job.image_path is None:
+                continue
+            job.extra.update(
+                video_timestamp_seconds=key.timestamp,
+                video_frame_index=key.index,
+                keyframe_score=key.score,
+            )
+            yield job
+
+
+# === ORKESTRATOR ===
+
+class PipelineOrchestrator:
+    """
+    Menjalankan job dari sebuah source melalui tahap-tahap pipeline.
+
+    Parameter:
+        sink          : objek dengan method play(wav_path).
+        with_tts      : False untuk berhenti setelah terjemahan.
+        tts_required  : bila True, kegagalan TTS menggagalkan job.
+        audio_folder  : folder output .wav (None = default generateTTS).
+        max_in_flight : jumlah job yang boleh berjalan bersamaan.
+        label         : teks banner log (None = tanpa banner).
+        on_result     : callback(job) setelah job selesai (sukses/gagal).
+        deadlines     : aktifkan anggaran latensi + fallback (deadlinePolicy).
+        cues          : CuePlayer yang sudah di-preload (audioCues), opsional.
+        two_phase     : ucapkan hasil query bahaya singkat sebelum deskripsi lengkap.
+        narration     : narasi kontinu; buang deskripsi basi dan catat jeda antar-ucapan.
+        trace_per_job : dengan PIPELINE_TRACE=1, tulis trace setiap job selesai
+                        (False: pemanggil memanggil spanTracer.flush sendiri, misal batch).
+        vision_workers: thread tahap vision; > 1 hanya berguna bila ada beberapa
+                        server Ollama (ollamaEndpoints), misal batch.
+        stage_workers : {nama tahap: jumlah thread} untuk tahap lain (default 1).
+        warm_up       : muat Argos (dan Piper bila voice belum ada) di latar
+                        sejak awal; terjemahan yang masih menunggu pemanasan
+                        tidak dihitung terhadap anggaran deadline.
+    """
+
+    def __init__(
+        self,
+        sink=None,
+        with_tts: bool = True,
+        tts_required: bool = True,
+        audio_folder: Optional[str] = None,
+        max_in_flight: int = 1,
+        label: Optional[str] = "PIPELINE",
+        on_result: Optional[Callable[[PipelineJob], None]] = None,
+        voice=None,
+        deadlines: bool = False,
+        cues=None,
+        two_phase: bool = False,
+        narration: bool = False,
+        trace_per_job: bool = True,
+        vision_workers: int = 1,
+        warm_up: bool = False,
+        stage_workers: Optional[Dict[str, int]] = None,
+    ):
+        self.sink = sink or FileOnlySink()
+        self.with_tts = with_tts
+        self.tts_required = tts_required
+        self.audio_folder = audio_folder
+        self.max_in_flight = max(max_in_flight, 1)
+        self.label = label
+        self.on_result = on_result
+        self.voice = voice  # cache model Piper supaya tidak load berulang kali
+        self.deadlines = deadlines
+        self.cues = cues
+        self.two_phase = two_phase
+        self.narration = narration
+        self.trace_per_job = trace_per_job
+
+        workers = dict({STAGE_VISION: vision_workers}, **(stage_workers or {}))
+        self._capture = Stage(STAGE_CAPTURE, workers=max(workers.get(STAGE_CAPTURE, 1), 1))
+        self._vision = Stage(STAGE_VISION, workers=max(workers[STAGE_VISION], 1))
+        self._translation = Stage(STAGE_TRANSLATION, workers=max(workers.get(STAGE_TRANSLATION, 1), 1))
+        self._tts = Stage(STAGE_TTS, workers=max(workers.get(STAGE_TTS, 1), 1))
+        self._playback = Stage(STAGE_PLAYBACK, workers=max(workers.get(STAGE_PLAYBACK, 1), 1))
+
+        self._next_job_id = 0
+        self._in_flight = 0
+        self._accepted = 0  # job yang sudah diyield source tapi belum masuk process()
+        self._idle: Optional[asyncio.Event] = None
+        self._latest_scene = None  # (job_id, scene_signature) capture terbaru
+        self._last_utterance_end: Optional[float] = None  # monotonic
+        self._translation_warm_up: Optional[Future] = None
+        self._voice_warm_up: Optional[Future] = None
+        if warm_up:
+            self.warm_up()
+
+    # --- status ---
+
+    @property
+    def busy(self) -> bool:
+        return self._in_flight + self._accepted >= self.max_in_flight
+
+    @property
+    def active(self) -> bool:
+        """True selama ada job yang sedang diproses."""
+        return self._in_flight > 0
+
+    @property
+    def local_busy(self) -> bool:
+        """
+        True selama tahap yang membebani perangkat ini sedang berjalan (capture,
+        terjemahan, TTS, playback). Menunggu jawaban vision tidak dihitung, jadi
+        dalam narasi kontinu ada jeda antara playback dan panggilan vision berikutnya.
+        """
+        return any(stage.running for stage in (self._capture, self._translation, self._tts, self._playback))
+
+    def stage_status(self) -> Dict[str, dict]:
+        """{nama tahap: {workers, active, waiting}} saat ini (misal untuk /metrics)."""
+        stages = (self._capture, self._vision, self._translation, self._tts, self._playback)
+        return {stage.name: stage.status() for stage in stages}
+
+    def _idle_event(self) -> asyncio.Event:
+        if self._idle is None:
+            self._idle = asyncio.Event()
+            self._idle.set()
+        return self._idle
+
+    async def wait_idle(self):
+        await self._idle_event().wait()
+
+    def play_cue(self, name: str) -> Optional[float]:
+        """Putar cue bila tersedia. Return waktu monotonic audio diserahkan ke pemutar."""
+        if self.cues is None:
+            return None
+        return self.cues.play(name)
+
+    def new_job(self, **kwargs) -> PipelineJob:
+        self._next_job_id += 1
+        return PipelineJob(job_id=self._next_job_id, **kwargs)
+
+    def warm_up(self) -> None:
+        """
+        Jadwalkan cold load di thread tahapnya masing-masing: import + load
+        Argos di executor terjemahan, dan load Piper di executor TTS bila
+        voice belum ada (cue mati). Job pertama otomatis mengantre di belakangnya.
+        """
+        self._translation_warm_up = self._translation.start(warm_up_translation)
+        if self.with_tts and self.voice is None:
+            self._voice_warm_up = self._tts.start(load_voice)
+
+    # --- eksekusi ---
+
+    def _banner(self, suffix: str):
+        if not self.label:
+            return
+        line = f"================= {self.label} {suffix} ================="
+        print(f"\n{line}" if suffix == "DIMULAI" else f"{line}\n")
+
+    def _fail(self, job: PipelineJob, error: str, message: str) -> PipelineJob:
+        job.status = "fail"
+        job.error = error
+        print(f"[PIPELINE] {message}")
+        self.play_cue(CUE_FAILED)
+        if job.deadline is not None and job.deadline.misses:
+            # run gagal karena deadline tetap dicatat agar miss/fallback terlihat
+            now = datetime.now()
+            job.extra.update(job.deadline.finish((now - job.start_time).total_seconds()))
+            job.latency_path = log_latency(
+                job.start_time, now, context=f"gagal:{error}", run_id=job.run_id, extra=job.extra
+            )
+        self._banner("GAGAL")
+        return job
+
+    async def process(self, job: PipelineJob) -> PipelineJob:
+        """
+        Jalankan satu job melewati semua tahap. Tidak melempar exception;
+        error tak terduga dicatat di job.status = "error".
+        """
+        self._in_flight += 1
+        self._idle_event().clear()
+        try:
+            await self._process(job)
+        except Exception as exc:  # tangkap error tak terduga agar source tetap jalan
+            job.status = "error"
+            job.error = str(exc)
+            print(f"[ERROR] Pipeline job #{job.job_id} gagal: {exc}")
+        finally:
+            self._signal_text_ready(job)
+            self._in_flight -= 1
+            if self._in_flight == 0:
+                self._idle_event().set()
+
+        if self.on_result is not None:
+            self.on_result(job)
+        if self.trace_per_job:
+            spanTracer.flush(name=job.run_id, run_id=job.run_id)
+        return job
+
+    async def _process(self, job: PipelineJob) -> PipelineJob:
+        first_sound = self.play_cue(CUE_PROCESSING)
+        if first_sound is not None:
+            job.extra["press_to_first_sound_seconds"] = first_sound - job.pressed_at
+        self._banner("DIMULAI")
+        job.start_time = datetime.now()
+        job.deadline = DeadlineTracker() if self.deadlines else None
+        sampler = get_sampler()
+        sampler_token = sampler.begin()
+        try:
+            return await self._run_stages(job, sampler, sampler_token)
+        finally:
+            sampler.end(sampler_token)  # no-op bila sudah diakhiri sebelum log latensi
+
+    # --- narasi kontinu ---
+
+    @staticmethod
+    def _signal_text_ready(job: PipelineJob) -> None:
+        if job.text_ready is not None:
+            job.text_ready.set()
+
+    async def _record_scene(self, job: PipelineJob) -> None:
+        """Simpan ciri adegan capture ini; capture dengan job_id terbesar menjadi acuan."""
+        job.scene = await self._capture.submit(scene_signature, job.image_path)
+        if job.scene is None:
+            return
+        if self._latest_scene is None or job.job_id > self._latest_scene[0]:
+            self._latest_scene = (job.job_id, job.scene)
+
+    def _is_stale(self, job: PipelineJob) -> bool:
+        """True bila capture yang lebih baru menunjukkan adegan sudah berubah."""
+        if not self.narration or job.scene is None or self._latest_scene is None:
+            return False
+        latest_id, latest_scene = self._latest_scene
+        if latest_id <= job.job_id:
+            return False
+        difference = scene_difference(job.scene, latest_scene)
+        job.extra["scene_difference"] = difference
+        return difference > SCENE_CHANGE_THRESHOLD
+
+    def _play_utterance(self, job: PipelineJob) -> bool:
+        """
+        Dijalankan di executor playback, tepat sebelum audio diputar: buang
+        deskripsi basi (narasi kontinu) dan catat jeda sejak ucapan sebelumnya.
+        Return False bila tidak diputar.
+        """
+        if self._is_stale(job):
+            job.extra["narration_stale"] = 1
+            return False
+        started = time.monotonic()
+        if self.narration and self._last_utterance_end is not None:
+            job.extra["utterance_gap_seconds"] = started - self._last_utterance_end
+        try:
+            self.sink.play(job.wav_path)
+        finally:
+            self._last_utterance_end = time.monotonic()
+        return True
+
+    async def _run_vision(self, job: PipelineJob, tracker):
+        """
+        Tahap vision; dengan tracker deadline memakai vision_with_fallbacks.
+        Info preprocessing (ukuran gambar, vision_tokens_est, vision_preprocess_seconds)
+        masuk ke job.extra; bila gambar sudah di-prefetch, preprocessing tidak
+        ikut terhitung di vision_generate_seconds.
+        """
+        if tracker is not None:
+            timings = {}
+            text, txt_path = await self._vision.run(
+                job,
+                vision_with_fallbacks,
+                tracker,
+                job.image_path,
+                output_name=job.output_name,
+                resize=job.resize,
+                run_id=job.run_id,
+                timings=timings,
+                prepared=job.prepared,
+            )
+        else:
+            text, txt_path, timings = await self._vision.run(
+                job,
+                generate_text_from_image_path,
+                job.image_path,
+                output_name=job.output_name,
+                return_timings=True,
+                resize=job.resize,
+                run_id=job.run_id,
+                prepared=job.prepared,
+            )
+        job.prepared = None  # byte gambar ter-encode tidak diperlukan lagi
+        timings.pop("vision_seconds", None)  # sudah tercatat sebagai vision_generate_seconds
+        job.extra.update(timings)
+        return text, txt_path
+
+    async def _ensure_voice(self):
+        if self.voice is None and self._voice_warm_up is not None:
+            future, self._voice_warm_up = self._voice_warm_up, None
+            try:
+                self.voice = await asyncio.wrap_future(future)
+            except Exception as exc:
+                print(f"[WARN] Pemanasan Piper gagal, dimuat ulang: {exc}")
+        if self.voice is None:
+            self.voice = await self._tts.submit(load_voice)
+        return self.voice
+
+    def _tts_kwargs(self, run_id: str) -> dict:
+        tts_kwargs = {"voice": self.voice, "run_id": run_id}
+        if self.audio_folder:
+            tts_kwargs["audio_folder"] = self.audio_folder
+        return tts_kwargs
+
+    async def _start_hazard_phase(self, job: PipelineJob, tracker) -> Optional[asyncio.Task]:
+        """
+        Fase 1 mode dua fase: jalankan query bahaya di executor vision, lalu
+        ucapkan hasilnya di task terpisah agar fase 2 bisa langsung dimulai.
+        """
+        text, _ = await self._vision.run_as(
+            HAZARD_VISION,
+            job,
+            generate_hazard_from_image_path,
+            job.image_path,
+            output_name=job.output_name,
+            resize=job.resize,
+            run_id=job.run_id,
+            timeout=tracker.budget(STAGE_VISION) if tracker else None,
+            prepared=job.prepared,
+        )
+        if not text:
+            print("[PIPELINE] Fase bahaya gagal, lanjut ke deskripsi lengkap.")
+            return None
+        print(f"[PIPELINE] Fase bahaya: {text}")
+        return asyncio.create_task(self._speak_hazard(job, text))
+
+    async def _speak_hazard(self, job: PipelineJob, text: str) -> None:
+        """Terjemah → TTS → play untuk teks bahaya. Kegagalan hanya dicatat."""
+        try:
+            spoken, _translated = await self._translation.run_as(
+                HAZARD_TRANSLATION, job, translate_text_to_indonesian, text
+            )
+            if not self.with_tts or not job.with_tts:
+                return
+            await self._ensure_voice()
+            wav_path = await self._tts.run_as(
+                HAZARD_TTS, job, tts_from_text, spoken, **self._tts_kwargs(hazard_run_id(job.run_id))
+            )
+            if not wav_path:
+                return
+            saved = (await self._tts.submit(postprocess_wav, wav_path)).get("audio_saved_seconds")
+            if saved is not None:
+                job.extra["hazard_audio_saved_seconds"] = saved
+            job.extra["time_to_hazard_audio_seconds"] = (datetime.now() - job.start_time).total_seconds()
+            await self._playback.run_as(HAZARD_PLAYBACK, job, self.sink.play, wav_path)
+        except Exception as exc:
+            print(f"[WARN] Fase bahaya gagal diucapkan: {exc}")
+
+    async def _finish_hazard_phase(self, job: PipelineJob, hazard_task: Optional[asyncio.Task]) -> None:
+        """Tunggu fase bahaya selesai diucapkan lalu salin durasinya ke `extra`."""
+        if hazard_task is None:
+            return
+        await hazard_task
+        for key in (HAZARD_VISION, HAZARD_TRANSLATION, HAZARD_TTS):
+            if key in job.stage_durations:
+                job.extra[f"{key}_seconds"] = job.stage_durations[key]
+
+    async def _run_stages(self, job: PipelineJob, sampler, sampler_token) -> PipelineJob:
+        # 1. Capture (dilewati bila job sudah membawa file gambar)
+        if job.image_path is None:
+            job.image_path = await self._capture.run(job, capture_image, run_id=job.run_id, timings=job.extra)
+            if not job.image_path:
+                job.image_path = None
+                return self._fail(job, "capture_failed", "Gagal di tahap capture kamera. Stop.")
+        else:
+            job.stage_durations[STAGE_CAPTURE] = None
+        if self.narration:
+            await self._record_scene(job)
+
+        # 2. Vision-language → teks (EN), dengan fallback bila anggaran terlampaui.
+        #    Mode dua fase: peringatan bahaya diucapkan selagi deskripsi dibuat.
+        tracker = job.deadline if job.deadline is not None and job.deadline.enabled else None
+        hazard_task = await self._start_hazard_phase(job, tracker) if self.two_phase else None
+        try:
+            return await self._run_description(job, tracker, hazard_task, sampler, sampler_token)
+        finally:
+            if hazard_task is not None and not hazard_task.done():
+                await hazard_task
+
+    async def _run_description(self, job: PipelineJob, tracker, hazard_task, sampler, sampler_token) -> PipelineJob:
+        progress = self.cues.start_progress() if self.cues is not None and hazard_task is None else None
+        try:
+            text, txt_path = await self._run_vision(job, tracker)
+        finally:
+            if progress is not None:
+                progress.set()
+        job.txt_path = txt_path or ""
+        if not text:
+            return self._fail(job, "vision_or_llm_failed", "Gagal di tahap vision/LLM. Stop.")
+        job.text = text
+
+        # 2b. Anggaran teks: buang kalimat duplikat/boilerplate sebelum diterjemahkan dan diucapkan
+        with span("text_budget", run_id=job.run_id):
+            budget = apply_budget(text)
+        job.extra.update(budget.metrics())
+        if budget.chars_saved:
+            print(f"[PIPELINE] Anggaran teks: {budget.original_chars} → {len(budget.text)} karakter "
+                  f"({budget.sentences_in} → {budget.sentences_out} kalimat).")
+        text = job.text = budget.text  # teks yang diterjemahkan/diucapkan; versi mentah ada di txt_path
+
+        # 3. Terjemahkan ke Bahasa Indonesia (fallback ke teks asli jika gagal/terlambat)
+        translation_budget = tracker.budget(STAGE_TRANSLATION) if tracker else None
+        cold_load = self._translation_warm_up is not None and not self._translation_warm_up.done()
+        if cold_load:
+            # Argos masih dimuat: panggilan cold load tidak diberi batas waktu
+            translation_budget = None
+            job.extra["translation_cold_load"] = 1
+        try:
+            job.spoken_text, job.translated = await asyncio.wait_for(
+                self._translation.run(job, translate_text_to_indonesian, text),
+                timeout=translation_budget,
+            )
+        except asyncio.TimeoutError:
+            self._translation.abandon(job, STAGE_TRANSLATION)
+            job.stage_durations[STAGE_TRANSLATION] = translation_budget
+            job.spoken_text, job.translated = text, False
+            tracker.miss(STAGE_TRANSLATION)
+        translation_end = datetime.now()
+        if job.translated:
+            print("[PIPELINE] Teks berhasil diterjemahkan ke Bahasa Indonesia.")
+            await self._translation.submit(persist_translated_text, txt_path, job.spoken_text)
+        else:
+            print("[PIPELINE] Memakai teks asli (pasangan en->id Argos belum siap).")
+        if tracker is not None:
+            if not cold_load:
+                tracker.check(STAGE_TRANSLATION, job.stage_durations.get(STAGE_TRANSLATION))
+            if not job.translated:
+                tracker.fallback("english")
+            if tracker.previous_view:
+                job.spoken_text = previous_view_notice(job.spoken_text, job.translated)
+        self._signal_text_ready(job)  # narasi kontinu: capture berikutnya boleh dimulai
+
+        # 4. TTS ke .wav
+        if self.with_tts and job.with_tts:
+            await self._ensure_voice()
+            job.wav_path = await self._tts.run(
+                job, tts_from_text, job.spoken_text, **self._tts_kwargs(job.run_id)
+            ) or ""
+            if job.wav_path:
+                # trim hening + persingkat jeda sebelum diputar (audioPostprocess)
+                job.extra.update(await self._tts.submit(postprocess_wav, job.wav_path))
+            job.speech_start_time = datetime.now()
+            if not job.wav_path and self.tts_required:
+                return self._fail(job, "tts_failed", "Gagal di tahap TTS. Stop.")
+        else:
+            job.stage_durations[STAGE_TTS] = None
+            job.speech_start_time = translation_end
+
+        # 5. Catat latensi (beserta ringkasan sumber daya dan deadline) lalu play audio.
+        #    Deskripsi lengkap baru diputar setelah peringatan bahaya selesai.
+        await self._finish_hazard_phase(job, hazard_task)
+        job.extra.update(sampler.end(sampler_token))
+        if tracker is not None:
+            tracker.check(STAGE_TTS, job.stage_durations.get(STAGE_TTS))
+            job.extra.update(tracker.finish((job.speech_start_time - job.start_time).total_seconds()))
+        job.latency_path = log_latency(
+            job.start_time,
+            job.speech_start_time,
+            context=job.wav_path or job.txt_path,
+            stage_durations={
+                key: job.stage_durations.get(key)
+                for key in (STAGE_CAPTURE, STAGE_VISION, STAGE_TRANSLATION, STAGE_TTS)
+            },
+            run_id=job.run_id,
+            extra=job.extra,
+        )
+        job.status = "ok"
+        if job.wav_path:
+            if "press_to_first_sound_seconds" not in job.extra:
+                job.extra["press_to_first_sound_seconds"] = time.monotonic() - job.pressed_at
+            played = await self._playback.run(job, self._play_utterance, job)
+            append_results(job.latency_path, job.run_id)
+            if self.narration:
+                append_latency(job.latency_path, {
+                    key: job.extra.get(key)
+                    for key in ("utterance_gap_seconds", "scene_difference", "narration_stale")
+                })
+            if not played:
+                job.status = "stale"
+                print(f"[PIPELINE] Adegan sudah berubah (selisih {job.extra['scene_difference']:.2f}), "
+                      "deskripsi lama tidak diucapkan.")
+                self._banner("DIBUANG")
+                return job
+
+        self._banner("SELESAI")
+        return job
+
+    async def run(self, source) -> None:
+        """
+        Ambil job dari source sampai habis (atau dihentikan), jalankan dengan
+        batas max_in_flight, lalu tunggu semua job selesai.
+        """
+        self._idle = None  # Event baru untuk event loop yang sedang berjalan
+        slots = asyncio.Semaphore(self.max_in_flight)
+        tasks = set()
+
+        async def _guarded(job: PipelineJob):
+            # process() langsung menaikkan _in_flight, jadi job tidak pernah
+            # lepas dari hitungan busy di antara dua baris ini
+            self._accepted -= 1
+            try:
+                await self.process(job)
+            finally:
+                slots.release()
+
+        async for job in source.jobs(self):
+            # dihitung busy sejak diyield: tekanan berikutnya yang datang sebelum
+            # task job ini berjalan tetap dapat cue "masih memproses"
+            self._accepted += 1
+            await slots.acquire()
+            task = asyncio.create_task(_guarded(job))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+        if tasks:
+            await asyncio.gather(*tasks)
+
+    def run_once(self) -> PipelineJob:
+        """
+        Versi sinkron: satu job dari kamera.
+        """
+        self._idle = None
+        return asyncio.run(self.process(self.new_job()))
+
+    def close(self):
+        for stage in (self._capture, self._vision, self._translation, self._tts, self._playback):
+            stage.shutdown()
@@ -1,15 +1,29 @@
 import os
 import subprocess
 
+from artifactStore import KIND_WAV, get_store
+from spanTracer import instant, span
+from stageProfiler import profiled
+
+try:
+    import winsound
+except ImportError:
+    winsound = None
+
 AUDIO_DIR = "audios"
 DEFAULT_DEVICE = "default"
 
 
 def get_latest_wav(directory=AUDIO_DIR):
     """
-    Mencari file WAV terbaru berdasarkan waktu modifikasi file.
+    Mencari file WAV terbaru. Dicari lewat indeks artefak; listing folder +
+    waktu modifikasi hanya dipakai untuk file lama yang belum tercatat.
     Return: path file .wav penuh atau None.
     """
+    indexed = get_store().latest((KIND_WAV,), folder=directory)
+    if indexed and os.path.exists(indexed):
+        return indexed
+
     if not os.path.isdir(directory):
         print(f"[ERROR] Folder audio tidak ditemukan: {directory}")
         return None
@@ -30,6 +44,7 @@ def get_latest_wav(directory=AUDIO_DIR):
     return os.path.join(directory, latest_name)
 
 
+@profiled("play_wav")
 def play_wav(file_path, device=DEFAULT_DEVICE):
     """
     Putar file WAV menggunakan aplay ke device ALSA yang diberikan.
@@ -40,11 +55,34 @@ def play_wav(file_path, device=DEFAULT_DEVICE):
 
     print(f"[INFO] Memutar: {file_path}")
     try:
-        subprocess.run(["aplay", "-D", device, file_path], check=False)
+        with span("aplay_spawn", device=device):
+            proc = subprocess.Popen(["aplay", "-D", device, file_path])
+        instant("playback_started")
+        with span("aplay_wait"):
+            proc.wait()
     except Exception as e:
         print(f"[ERROR] Gagal memutar audio: {e}")
 
 
+@profiled("play_wav")
+def play_wav_winsound(file_path):
+    """
+    Putar file WAV menggunakan winsound (tersedia bawaan Windows).
+    """
+    if not file_path or not os.path.exists(file_path):
+        print(f"[ERROR] File audio tidak ditemukan: {file_path}")
+        return
+
+    if winsound is None:
+        print("[WARN] winsound tidak tersedia. Audio tidak diputar.")
+        return
+
+    print(f"[INFO] Memutar audio di speaker laptop: {file_path}")
+    instant("playback_started")
+    with span("winsound_play"):
+        winsound.PlaySound(file_path, winsound.SND_FILENAME)
+
+
 def main():
     """
     Mode debug mandiri:
@@ -0,0 +1,223 @@
+"""
+Sampler sumber daya sistem selama pipeline berjalan (Linux /proc dan /sys).
+
+Yang diukur per sampel:
+- cpu_percent      : pemakaian CPU sistem dari selisih /proc/stat
+- mem_available_mb : MemAvailable dari /proc/meminfo
+- swap_used_mb     : SwapTotal - SwapFree dari /proc/meminfo
+- rss_mb           : VmRSS proses ini dari /proc/<pid>/status
+- temp_c           : suhu tertinggi dari /sys/class/thermal/thermal_zone*/temp
+
+Thread sampler hanya mengambil sampel selama ada run aktif (begin/end);
+saat idle thread menunggu Event tanpa membaca file apa pun.
+Ringkasan min/mean/max per run ditambahkan ke laporan latencyLogger.
+
+Atur laju sampling dengan PIPELINE_SAMPLER_HZ (default 2, 0 = nonaktif).
+Bekerja di Linux mana pun; file yang tidak ada (misal tanpa sensor suhu)
+cukup dilewati. Coba langsung:
+
+    python resourceSampler.py 5      # sampling selama 5 detik lalu cetak ringkasan
+"""
+
+import glob
+import os
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+SAMPLE_HZ = float(os.getenv("PIPELINE_SAMPLER_HZ", "2"))
+THERMAL_GLOB = "/sys/class/thermal/thermal_zone*/temp"
+
+
+def _read_cpu_times() -> Optional[Tuple[int, int]]:
+    """Return (idle, total) jiffies dari baris 'cpu' di /proc/stat."""
+    try:
+        with open("/proc/stat", "r") as f:
+            fields = f.readline().split()[1:]
+    except OSError:
+        return None
+    values = [int(v) for v in fields]
+    idle = values[3] + (values[4] if len(values) > 4 else 0)  # idle + iowait
+    return idle, sum(values)
+
+
+def _read_kv_file(path: str, keys: Tuple[str, ...]) -> Dict[str, float]:
+    """Baca file format 'Key:   123 kB' dan return nilai (kB) untuk keys."""
+    out: Dict[str, float] = {}
+    try:
+        with open(path, "r") as f:
+            for line in f:
+                name, _, rest = line.partition(":")
+                if name in keys:
+                    out[name] = float(rest.split()[0])
+    except (OSError, ValueError, IndexError):
+        pass
+    return out
+
+
+def _read_max_temp(zone_paths: List[str]) -> Optional[float]:
+    temps = []
+    for path in zone_paths:
+        try:
+            with open(path, "r") as f:
+                temps.append(int(f.read().strip()) / 1000.0)
+        except (OSError, ValueError):
+            continue
+    return max(temps) if temps else None
+
+
+class ResourceSampler:
+    """
+    Sampler latar belakang yang hanya aktif selama ada run berjalan.
+    Aman untuk run yang tumpang tindih: tiap run mendapat token sendiri.
+    """
+
+    def __init__(self, hz: float = SAMPLE_HZ, pid: Optional[int] = None):
+        self.enabled = hz > 0
+        self.interval = 1.0 / hz if hz > 0 else 0.0
+        self.pid = pid or os.getpid()
+        self._status_path = f"/proc/{self.pid}/status"
+        self._thermal_paths = sorted(glob.glob(THERMAL_GLOB))
+        self._lock = threading.Lock()
+        self._sample_lock = threading.Lock()
+        self._active: Dict[int, float] = {}
+        self._next_token = 0
+        self._samples: List[Tuple[float, dict]] = []
+        self._prev_cpu: Optional[Tuple[int, int]] = None
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # --- sampling ---
+
+    def _sample(self) -> None:
+        with self._sample_lock:
+            sample = self._read_sample()
+        with self._lock:
+            self._samples.append((time.monotonic(), sample))
+
+    def _read_sample(self) -> Dict[str, float]:
+        sample: Dict[str, float] = {}
+
+        cpu = _read_cpu_times()
+        if cpu is not None:
+            if self._prev_cpu is not None:
+                d_idle = cpu[0] - self._prev_cpu[0]
+                d_total = cpu[1] - self._prev_cpu[1]
+                if d_total > 0:
+                    sample["cpu_percent"] = 100.0 * (1.0 - d_idle / d_total)
+            self._prev_cpu = cpu
+
+        mem = _read_kv_file("/proc/meminfo", ("MemAvailable", "SwapTotal", "SwapFree"))
+        if "MemAvailable" in mem:
+            sample["mem_available_mb"] = mem["MemAvailable"] / 1024
+        if "SwapTotal" in mem and "SwapFree" in mem:
+            sample["swap_used_mb"] = (mem["SwapTotal"] - mem["SwapFree"]) / 1024
+
+        status = _read_kv_file(self._status_path, ("VmRSS",))
+        if "VmRSS" in status:
+            sample["rss_mb"] = status["VmRSS"] / 1024
+
+        temp = _read_max_temp(self._thermal_paths)
+        if temp is not None:
+            sample["temp_c"] = temp
+        return sample
+
+    def _worker(self) -> None:
+        while True:
+            self._wake.wait()
+            with self._lock:
+                active = bool(self._active)
+            if not active:
+                self._wake.clear()
+                with self._lock:
+                    if self._active:  # begin() terjadi di antara cek dan clear
+                        self._wake.set()
+                continue
+            self._sample()
+            time.sleep(self.interval)
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._worker, name="resource-sampler", daemon=True)
+            self._thread.start()
+
+    # --- API run ---
+
+    def begin(self) -> Optional[int]:
+        """
+        Tandai awal sebuah run. Return token untuk end(), atau None bila nonaktif.
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            first = not self._active
+            self._next_token += 1
+            token = self._next_token
+            self._active[token] = time.monotonic()
+        if first:
+            # sampel CPU terakhir berasal dari sebelum jeda idle: delta pertama dibuang
+            with self._sample_lock:
+                self._prev_cpu = None
+        self._ensure_thread()
+        self._wake.set()
+        return token
+
+    def end(self, token: Optional[int]) -> Dict[str, float]:
+        """
+        Tandai akhir run dan return ringkasan {metrik_min/_mean/_max: nilai}.
+        """
+        if token is None:
+            return {}
+        with self._lock:
+            if token not in self._active:
+                return {}
+        self._sample()  # pastikan run singkat tetap punya sampel penutup
+        with self._lock:
+            started = self._active.pop(token, None)
+            if started is None:
+                return {}
+            values: Dict[str, List[float]] = {}
+            for ts, sample in self._samples:
+                if ts < started:
+                    continue
+                for key, value in sample.items():
+                    values.setdefault(key, []).append(value)
+            # buang sampel yang sudah tidak dibutuhkan run mana pun
+            oldest = min(self._active.values(), default=None)
+            if oldest is None:
+                self._samples.clear()
+            else:
+                self._samples = [item for item in self._samples if item[0] >= oldest]
+
+        summary: Dict[str, float] = {}
+        for key, series in values.items():
+            summary[f"{key}_min"] = min(series)
+            summary[f"{key}_mean"] = sum(series) / len(series)
+            summary[f"{key}_max"] = max(series)
+        if values:
+            summary["resource_samples"] = max(len(series) for series in values.values())
+        return summary
+
+
+_sampler: Optional[ResourceSampler] = None
+
+
+def get_sampler() -> ResourceSampler:
+    global _sampler
+    if _sampler is None:
+        _sampler = ResourceSampler()
+    return _sampler
+
+
+def main():
+    duration = float(sys.argv[1]) if len(sys.argv) > 1 else 3.0
+    sampler = ResourceSampler(hz=max(SAMPLE_HZ, 1.0))
+    token = sampler.begin()
+    time.sleep(duration)
+    for key, value in sampler.end(token).items():
+        print(f"{key}={value:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+"""
+Manajer retensi untuk folder artefak di perangkat (captures/, audios/, outputs*/).
+
+- Setiap folder punya anggaran ukuran (max_bytes) dan umur (max_age_days).
+- Compaction: capture PNG lama di-encode ulang ke JPEG, WAV lama dikonversi
+  ke Ogg/Opus (butuh `ffmpeg` di PATH; tanpa ffmpeg WAV dibiarkan).
+- Eviction: file yang melewati umur maksimum dihapus, lalu file terlama
+  dihapus sampai total ukuran folder di bawah anggaran. File yang cocok
+  dengan pola `keep` (misal hasil evaluasi batch_results_*.csv dan
+  video_track_* di outputs/) tidak pernah disentuh dan tidak dihitung.
+- Berjalan di thread latar belakang dengan prioritas rendah (nice 19) dan
+  selalu menunggu selama pipeline sibuk (busy_check); tidak pernah jalan
+  di tengah pemrosesan tombol.
+
+Contoh:
+    python retentionManager.py --report
+    python retentionManager.py --run-once
+"""
+
+import argparse
+import fnmatch
+import os
+import shutil
+import subprocess
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
+
+from artifactStore import KIND_AUDIO_COMPACT, get_store
+
+COMPACT_JPEG = "jpeg"
+COMPACT_AUDIO = "audio"
+
+JPEG_QUALITY = 85
+OPUS_BITRATE = "24k"
+CYCLE_INTERVAL_SEC = 600.0   # jeda antar siklus retensi di latar belakang
+BUSY_POLL_SEC = 0.5          # interval cek ulang saat pipeline sibuk
+LOW_PRIORITY_NICE = 19
+
+MB = 1024 * 1024
+
+
+@dataclass
+class RetentionPolicy:
+    """
+    Anggaran satu folder. Nilai None berarti batas tersebut tidak dipakai.
+    """
+
+    name: str
+    directory: str
+    max_bytes: Optional[int] = None
+    max_age_days: Optional[float] = None
+    compact: Optional[str] = None             # COMPACT_JPEG / COMPACT_AUDIO
+    compact_after_hours: float = 1.0
+    keep: Tuple[str, ...] = ()                # pola nama file (glob) yang tidak pernah disentuh
+
+
+def default_policies(root: str = None) -> List[RetentionPolicy]:
+    root = root or os.getcwd()
+    return [
+        RetentionPolicy("captures", os.path.join(root, "captures"), 500 * MB, 14, COMPACT_JPEG),
+        RetentionPolicy("audios", os.path.join(root, "audios"), 500 * MB, 14, COMPACT_AUDIO),
+        RetentionPolicy("outputs", os.path.join(root, "outputs"), 50 * MB, 90,
+                        keep=("batch_results_*", "video_track_*")),
+        RetentionPolicy("outputs-EN", os.path.join(root, "outputs-EN"), 50 * MB, 90),
+        RetentionPolicy("outputs-time", os.path.join(root, "outputs-time"), 50 * MB, 90),
+    ]
+
+
+def _list_files(directory: str, keep: Tuple[str, ...] = ()) -> List[os.DirEntry]:
+    """File di folder, tanpa file yang cocok dengan salah satu pola keep."""
+    if not os.path.isdir(directory):
+        return []
+    with os.scandir(directory) as it:
+        return [
+            entry for entry in it
+            if entry.is_file(follow_symlinks=False) and not any(fnmatch.fnmatch(entry.name, p) for p in keep)
+        ]
+
+
+def disk_usage_report(policies: List[RetentionPolicy] = None) -> dict:
+    """
+    Ringkasan pemakaian disk per folder dan sisa ruang filesystem.
+    """
+    policies = policies or default_policies()
+    report = {"folders": {}}
+    now = time.time()
+    for policy in policies:
+        entries = _list_files(policy.directory, policy.keep)
+        stats = [entry.stat() for entry in entries]
+        total = sum(st.st_size for st in stats)
+        oldest = min((st.st_mtime for st in stats), default=None)
+        report["folders"][policy.name] = {
+            "files": len(entries),
+            "bytes": total,
+            "max_bytes": policy.max_bytes,
+            "oldest_age_days": (now - oldest) / 86400 if oldest else None,
+        }
+
+    probe = next((p.directory for p in policies if os.path.isdir(p.directory)), os.getcwd())
+    usage = shutil.disk_usage(probe)
+    report["filesystem"] = {"total": usage.total, "used": usage.used, "free": usage.free}
+    return report
+
+
+def print_report(report: dict) -> None:
+    print("=== PEMAKAIAN DISK ===")
+    for name, info in report["folders"].items():
+        budget = f"{info['max_bytes'] / MB:.0f} MB" if info["max_bytes"] else "-"
+        age = f"{info['oldest_age_days']:.1f} hari" if info["oldest_age_days"] is not None else "-"
+        print(f"{name:<14}: {info['files']:>5} file, {info['bytes'] / MB:8.1f} MB (anggaran {budget}, terlama {age})")
+    fs = report["filesystem"]
+    print(f"Filesystem    : {fs['free'] / MB:.0f} MB bebas dari {fs['total'] / MB:.0f} MB")
+
+
+class RetentionManager:
+    """
+    Menjalankan compaction + eviction per folder.
+
+    Parameter:
+        policies   : daftar RetentionPolicy (default: default_policies()).
+        busy_check : callable yang return True selama pipeline sedang berjalan;
+                     manager menunggu sebelum menyentuh file berikutnya.
+        interval   : jeda antar siklus saat berjalan di latar belakang (detik).
+    """
+
+    def __init__(
+        self,
+        policies: List[RetentionPolicy] = None,
+        busy_check: Callable[[], bool] = None,
+        interval: float = CYCLE_INTERVAL_SEC,
+    ):
+        self.policies = policies or default_policies()
+        self.busy_check = busy_check or (lambda: False)
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._ffmpeg = shutil.which("ffmpeg")
+
+    # --- siklus ---
+
+    def _wait_until_idle(self) -> bool:
+        """Return False bila manager dihentikan selama menunggu."""
+        while self.busy_check():
+            if self._stop.wait(BUSY_POLL_SEC):
+                return False
+        return not self._stop.is_set()
+
+    def run_once(self) -> dict:
+        """
+        Satu siklus retensi untuk semua folder. Return ringkasan aksi.
+        """
+        summary = {"compacted": 0, "evicted": 0, "bytes_freed": 0}
+        for policy in self.policies:
+            if not self._wait_until_idle():
+                break
+            self._compact(policy, summary)
+            self._evict(policy, summary)
+        return summary
+
+    def _compact(self, policy: RetentionPolicy, summary: dict) -> None:
+        if policy.compact is None:
+            return
+        cutoff = time.time() - policy.compact_after_hours * 3600
+        for entry in _list_files(policy.directory, policy.keep):
+            if entry.stat().st_mtime > cutoff:
+                continue
+            if not self._wait_until_idle():
+                return
+            before = entry.stat().st_size
+            if policy.compact == COMPACT_JPEG and entry.name.lower().endswith(".png"):
+                new_path = self._compact_image(entry.path)
+            elif policy.compact == COMPACT_AUDIO and entry.name.lower().endswith(".wav"):
+                new_path = self._compact_audio(entry.path)
+            else:
+                continue
+            if new_path:
+                summary["compacted"] += 1
+                summary["bytes_freed"] += before - os.path.getsize(new_path)
+
+    def _replace(self, old_path: str, new_path: str, kind: Optional[str] = None) -> None:
+        # samakan mtime supaya urutan umur file tetap
+        st = os.stat(old_path)
+        os.utime(new_path, (st.st_atime, st.st_mtime))
+        os.remove(old_path)
+        get_store().update_path(old_path, new_path, kind=kind)
+
+    def _compact_image(self, path: str) -> Optional[str]:
+        import cv2
+
+        new_path = os.path.splitext(path)[0] + ".jpg"
+        try:
+            img = cv2.imread(path)
+            if img is None:
+                return None
+            if not cv2.imwrite(new_path, img, [cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY]):
+                return None
+            self._replace(path, new_path)
+            return new_path
+        except Exception as exc:
+            print(f"[WARN] Gagal kompresi capture {path}: {exc}")
+            return None
+
+    def _compact_audio(self, path: str) -> Optional[str]:
+        if not self._ffmpeg:
+            return None
+        new_path = os.path.splitext(path)[0] + ".ogg"
+        cmd = [
+            self._ffmpeg, "-nostdin", "-loglevel", "error", "-y",
+            "-i", path, "-c:a", "libopus", "-b:a", OPUS_BITRATE, new_path,
+        ]
+        try:
+            result = subprocess.run(cmd, check=False)
+            if result.returncode != 0 or not os.path.exists(new_path):
+                return None
+            # Ogg tidak bisa diputar aplay: jangan lagi tercatat sebagai KIND_WAV
+            self._replace(path, new_path, kind=KIND_AUDIO_COMPACT)
+            return new_path
+        except Exception as exc:
+            print(f"[WARN] Gagal kompresi audio {path}: {exc}")
+            return None
+
+    def _evict(self, policy: RetentionPolicy, summary: dict) -> None:
+        entries = sorted(
+            ((entry.path, entry.stat()) for entry in _list_files(policy.directory, policy.keep)),
+            key=lambda item: item[1].st_mtime,
+        )
+        total = sum(st.st_size for _, st in entries)
+        age_cutoff = time.time() - policy.max_age_days * 86400 if policy.max_age_days else None
+
+        for path, st in entries:
+            too_old = age_cutoff is not None and st.st_mtime < age_cutoff
+            over_budget = policy.max_bytes is not None and total > policy.max_bytes
+            if not too_old and not over_budget:
+                break  # urut dari yang terlama, sisanya lebih baru & muat anggaran
+            if not self._wait_until_idle():
+                return
+            try:
+                os.remove(path)
+            except OSError as exc:
+                print(f"[WARN] Gagal menghapus {path}: {exc}")
+                continue
+            get_store().forget(path)
+            total -= st.st_size
+            summary["evicted"] += 1
+            summary["bytes_freed"] += st.st_size
+
+    # --- latar belakang ---
+
+    def _worker(self) -> None:
+        # nice per-thread (Linux); proses ffmpeg turunan ikut prioritas ini
+        try:
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), LOW_PRIORITY_NICE)
+        except (AttributeError, OSError):
+            pass
+
+        while not self._stop.is_set():
+            try:
+                summary = self.run_once()
+                if summary["compacted"] or summary["evicted"]:
+                    print(
+                        f"[RETENSI] {summary['compacted']} file dikompresi, {summary['evicted']} file dihapus, "
+                        f"{summary['bytes_freed'] / MB:.1f} MB dibebaskan."
+                    )
+            except Exception as exc:
+                print(f"[WARN] Siklus retensi gagal: {exc}")
+            self._stop.wait(self.interval)
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._worker, name="retention", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5.0)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Retensi dan kompresi artefak pipeline.")
+    parser.add_argument("--report", action="store_true", help="Tampilkan pemakaian disk per folder.")
+    parser.add_argument("--run-once", action="store_true", help="Jalankan satu siklus retensi sekarang.")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    manager = RetentionManager()
+    if args.run_once:
+        summary = manager.run_once()
+        print(
+            f"[INFO] {summary['compacted']} file dikompresi, {summary['evicted']} file dihapus, "
+            f"{summary['bytes_freed'] / MB:.1f} MB dibebaskan."
+        )
+    if args.report or not args.run_once:
+        print_report(disk_usage_report(manager.policies))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""
+Tracing span ringan untuk timeline pipeline (format Chrome trace-event).
+
+Aktifkan lewat environment variable:
+
+    PIPELINE_TRACE=1 python main.py
+    PIPELINE_TRACE=1 python testing-pipeline/run_batch_testing_data.py --limit 5
+
+Setiap span dicatat dengan time.perf_counter_ns beserta id dan nama thread,
+sehingga span bersarang (decode → encode → HTTP → parse) dan tahap yang
+berjalan tumpang tindih di executor berbeda terlihat di satu timeline.
+Hasil ditulis sebagai JSON trace-event yang bisa dibuka di chrome://tracing
+atau https://ui.perfetto.dev:
+    outputs-time/trace_<run_id>.json     (per job di main.py / Windows)
+    outputs-time/trace_batch_<ts>.json   (satu file per batch)
+
+Span diberi args.run_id dari argumen span atau dari bind_run() thread yang
+sedang berjalan, sehingga trace per job hanya berisi span job tersebut
+walaupun beberapa job berjalan bersamaan.
+
+Saat nonaktif, `span()` mengembalikan context manager kosong bersama dan
+`traced` mengembalikan fungsi aslinya, jadi overhead-nya praktis nol.
+
+Contoh:
+    from spanTracer import span, traced
+
+    with span("http_wait", model=model):
+        resp = requests.post(...)
+
+    @traced("tts_from_text")
+    def tts_from_text(...): ...
+"""
+
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+ENABLED = os.getenv("PIPELINE_TRACE", "").strip().lower() in ("1", "true", "yes")
+TRACE_DIR = os.getenv("PIPELINE_TRACE_DIR", os.path.join(os.getcwd(), "outputs-time"))
+MAX_EVENTS = int(os.getenv("PIPELINE_TRACE_MAX_EVENTS", "200000"))  # buffer dibuang bila penuh
+
+_NULL_SPAN = contextlib.nullcontext()
+_PID = os.getpid()
+_lock = threading.Lock()
+_events: List[dict] = []
+_thread_names: Dict[int, str] = {}
+_dropped = 0
+_local = threading.local()
+
+
+def _now_us(ns: int) -> float:
+    return ns / 1000.0
+
+
+def bind_run(run_id: Optional[str]) -> None:
+    """Tandai run_id yang sedang dikerjakan thread ini (None = lepas)."""
+    _local.run_id = run_id
+
+
+def _run_id_of(event: dict) -> Optional[str]:
+    return (event.get("args") or {}).get("run_id")
+
+
+def _append(event: dict) -> None:
+    global _dropped
+    run_id = getattr(_local, "run_id", None)
+    if run_id is not None and _run_id_of(event) is None:
+        event.setdefault("args", {})["run_id"] = run_id
+    tid = threading.get_native_id()
+    event["pid"] = _PID
+    event["tid"] = tid
+    with _lock:
+        if tid not in _thread_names:
+            _thread_names[tid] = threading.current_thread().name
+        if len(_events) >= MAX_EVENTS:
+            _dropped += 1
+            return
+        _events.append(event)
+
+
+class _Span:
+    __slots__ = ("name", "args", "start_ns")
+
+    def __init__(self, name: str, args: dict):
+        self.name = name
+        self.args = args
+        self.start_ns = 0
+
+    def __enter__(self):
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end_ns = time.perf_counter_ns()
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        event = {
+            "name": self.name,
+            "cat": "pipeline",
+            "ph": "X",
+            "ts": _now_us(self.start_ns),
+            "dur": _now_us(end_ns - self.start_ns),
+        }
+        if self.args:
+            event["args"] = self.args
+        _append(event)
+        return False
+
+
+def span(name: str, **args):
+    """
+    Context manager satu span. Argumen keyword ikut disimpan di `args`
+    event (misal run_id, ukuran gambar). Span di dalam span lain pada thread
+    yang sama otomatis tampil bersarang di viewer.
+    """
+    if not ENABLED:
+        return _NULL_SPAN
+    return _Span(name, args)
+
+
+def traced(name: Optional[str] = None):
+    """Decorator: seluruh pemanggilan fungsi menjadi satu span."""
+
+    def decorator(func):
+        if not ENABLED:
+            return func
+        span_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with _Span(span_name, {}):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def instant(name: str, **args) -> None:
+    """Penanda satu titik waktu (misal audio mulai diputar)."""
+    if not ENABLED:
+        return
+    event = {"name": name, "cat": "pipeline", "ph": "i", "s": "t", "ts": _now_us(time.perf_counter_ns())}
+    if args:
+        event["args"] = args
+    _append(event)
+
+
+def flush(path: Optional[str] = None, name: Optional[str] = None, run_id: Optional[str] = None) -> Optional[str]:
+    """
+    Tulis event yang terkumpul ke file JSON lalu buang dari buffer.
+    Dengan run_id, hanya event run tersebut (termasuk run_id turunan seperti
+    <run_id>_hazard) dan event tanpa run_id yang diambil; event job lain tetap
+    di buffer untuk flush berikutnya. Default: TRACE_DIR/trace_<name atau
+    timestamp>.json. Return path, atau None bila tracing nonaktif / tidak ada event.
+    """
+    global _dropped
+    if not ENABLED:
+        return None
+    with _lock:
+        if run_id is None:
+            events, kept = list(_events), []
+        else:
+            events, kept = [], []
+            for event in _events:
+                owner = _run_id_of(event)
+                (events if owner is None or owner.startswith(run_id) else kept).append(event)
+        _events[:] = kept
+        dropped = _dropped
+        _dropped = 0
+        names = dict(_thread_names)
+    if not events:
+        return None
+
+    metadata = [
+        {"name": "thread_name", "ph": "M", "pid": _PID, "tid": tid, "args": {"name": thread_name}}
+        for tid, thread_name in names.items()
+    ]
+    if path is None:
+        label = name or datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        path = os.path.join(TRACE_DIR, f"trace_{label}.json")
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({
+                "traceEvents": metadata + events,
+                "displayTimeUnit": "ms",
+                "otherData": {"dropped_events": dropped},
+            }, f)
+    except Exception as exc:
+        print(f"[WARN] Gagal menyimpan trace: {exc}")
+        return None
+    print(f"[INFO] Trace disimpan ({len(events)} span): {path}")
+    return path
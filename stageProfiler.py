@@ -0,0 +1,179 @@
+"""
+Profiling opsional per tahap pipeline (cProfile + puncak memori tracemalloc).
+
+Aktifkan lewat environment variable:
+
+    PIPELINE_PROFILE=1 python main.py
+    PIPELINE_PROFILE=capture_image,tts_from_text python main.py   # hanya tahap tertentu
+    PIPELINE_PROFILE_TOP=25                                       # jumlah fungsi di ringkasan
+
+Saat nonaktif, decorator `profiled` mengembalikan fungsi aslinya tanpa
+pembungkus sehingga tidak ada overhead sama sekali.
+
+Saat aktif, hasil per tahap dikumpulkan per run_id dan ditulis oleh
+latencyLogger di sebelah laporan latensi:
+    outputs-time/latency_<run_id>.txt           (+ baris <tahap>_peak_mem_kb / _profile_seconds)
+    outputs-time/profile_<run_id>_<tahap>.prof  (buka dengan snakeviz / pstats)
+    outputs-time/profile_<run_id>.txt           (ringkasan top fungsi per tahap)
+
+Catatan: tracemalloc dan cProfile bersifat global per proses, jadi
+tahap yang diprofil dijalankan bergantian (dikunci) agar angka tiap
+tahap tidak tercampur ketika orkestrator menjalankan tahap tumpang tindih.
+"""
+
+import cProfile
+import functools
+import io
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from typing import Dict, List, Optional
+
+_PROFILE_ENV = os.getenv("PIPELINE_PROFILE", "").strip()
+TOP_FUNCTIONS = int(os.getenv("PIPELINE_PROFILE_TOP", "15"))
+
+if _PROFILE_ENV.lower() in ("", "0", "false", "no"):
+    ENABLED_STAGES: Optional[set] = set()
+elif _PROFILE_ENV.lower() in ("1", "true", "yes", "all"):
+    ENABLED_STAGES = None  # semua tahap
+else:
+    ENABLED_STAGES = {name.strip() for name in _PROFILE_ENV.split(",") if name.strip()}
+
+_UNASSIGNED = "_"
+_local = threading.local()
+_profile_lock = threading.Lock()
+_results_lock = threading.Lock()
+_results: Dict[str, List[dict]] = {}
+
+
+def is_enabled(stage: str) -> bool:
+    return ENABLED_STAGES is None or stage in ENABLED_STAGES
+
+
+def bind_run(run_id: Optional[str]) -> None:
+    """
+    Tandai run_id yang sedang dikerjakan thread ini, untuk tahap yang
+    tidak menerima argumen run_id (misal translate_text_to_indonesian).
+    """
+    _local.run_id = run_id
+
+
+def profiled(stage: str):
+    """
+    Decorator untuk fungsi tahap pipeline. Argumen keyword `run_id`
+    (atau run_id dari bind_run) dipakai untuk menautkan hasil ke laporan latensi.
+    """
+
+    def decorator(func):
+        if not is_enabled(stage):
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if getattr(_local, "active", False):
+                return func(*args, **kwargs)  # tahap bersarang: ikut diprofil oleh tahap luar
+            run_id = kwargs.get("run_id") or getattr(_local, "run_id", None) or _UNASSIGNED
+            with _profile_lock:
+                _local.active = True
+                started_tracing = not tracemalloc.is_tracing()
+                if started_tracing:
+                    tracemalloc.start()
+                tracemalloc.reset_peak()
+                base_mem, _ = tracemalloc.get_traced_memory()
+                profiler = cProfile.Profile()
+                t0 = time.perf_counter()
+                profiler.enable()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    profiler.disable()
+                    elapsed = time.perf_counter() - t0
+                    _, peak_mem = tracemalloc.get_traced_memory()
+                    if started_tracing:
+                        tracemalloc.stop()
+                    _local.active = False
+                    _store_result(run_id, {
+                        "stage": stage,
+                        "seconds": elapsed,
+                        "peak_mem_kb": max(peak_mem - base_mem, 0) / 1024,
+                        "stats": pstats.Stats(profiler),
+                    })
+
+        return wrapper
+
+    return decorator
+
+
+def _store_result(run_id: str, result: dict) -> None:
+    with _results_lock:
+        _results.setdefault(run_id, []).append(result)
+
+
+def pop_results(run_id: Optional[str]) -> List[dict]:
+    """
+    Ambil (dan hapus) hasil profil untuk run_id beserta run_id turunannya
+    (misal <run_id>_hazard dari fase bahaya mode dua fase). Tanpa run_id,
+    yang diambil hasil tahap yang dipanggil tanpa run_id (misal skrip CLI);
+    hasil itu tidak pernah diklaim oleh run lain.
+    """
+    with _results_lock:
+        if not run_id:
+            return _results.pop(_UNASSIGNED, [])
+        keys = [key for key in _results if key == run_id or key.startswith(f"{run_id}_")]
+        return [result for key in keys for result in _results.pop(key)]
+
+
+def write_results(latency_path: str, run_id: Optional[str]) -> List[str]:
+    """
+    Tulis file .prof dan ringkasan teks di folder yang sama dengan laporan
+    latensi. Return baris tambahan untuk laporan latensi (kosong bila tidak
+    ada hasil). Ringkasan teks ditambahkan (append) bila sudah ada.
+    """
+    results = pop_results(run_id)
+    if not results:
+        return []
+
+    folder = os.path.dirname(latency_path)
+    base = os.path.splitext(os.path.basename(latency_path))[0].replace("latency_", "profile_", 1)
+    rows: List[str] = []
+    summary = io.StringIO()
+
+    for result in results:
+        stage = result["stage"]
+        try:
+            result["stats"].dump_stats(os.path.join(folder, f"{base}_{stage}.prof"))
+        except Exception as exc:
+            print(f"[WARN] Gagal menyimpan profil {stage}: {exc}")
+        rows.append(f"{stage}_profile_seconds={result['seconds']:.3f}")
+        rows.append(f"{stage}_peak_mem_kb={result['peak_mem_kb']:.1f}")
+
+        summary.write(f"===== {stage} ({result['seconds']:.3f} s, puncak {result['peak_mem_kb']:.1f} KB) =====\n")
+        result["stats"].stream = summary
+        result["stats"].sort_stats("cumulative").print_stats(TOP_FUNCTIONS)
+
+    try:
+        with open(os.path.join(folder, f"{base}.txt"), "a", encoding="utf-8") as f:
+            f.write(summary.getvalue())
+    except Exception as exc:
+        print(f"[WARN] Gagal menyimpan ringkasan profil: {exc}")
+
+    return rows
+
+
+def append_results(latency_path: str, run_id: Optional[str]) -> None:
+    """
+    Untuk tahap yang selesai setelah laporan latensi ditulis (playback):
+    tulis hasilnya lalu tambahkan barisnya ke laporan latensi.
+    """
+    if not latency_path:
+        return
+    rows = write_results(latency_path, run_id)
+    if not rows:
+        return
+    try:
+        with open(latency_path, "a", encoding="utf-8") as f:
+            f.write("\n" + "\n".join(rows))
+    except Exception as exc:
+        print(f"[WARN] Gagal menambahkan data profil: {exc}")
@@ -0,0 +1,141 @@
+"""
+Benchmark cold start (waktu import) untuk setiap entry point.
+
+Setiap entry point dijalankan di proses Python baru dengan `-X importtime`,
+lalu dicatat:
+- wall_seconds   : waktu proses dari start sampai selesai (median dari --runs)
+- import_seconds : total waktu import kumulatif level teratas
+- top import     : modul dengan waktu kumulatif terbesar
+
+Hasil ditambahkan ke outputs-time/startup_benchmark.csv supaya bisa
+dibandingkan dari waktu ke waktu (satu baris per entry point per eksekusi).
+
+Jalankan dari root repo:
+
+    python testing-pipeline/benchmark_startup.py
+    python testing-pipeline/benchmark_startup.py --runs 5 --top 10
+    python testing-pipeline/benchmark_startup.py --only generateText,main
+"""
+
+import argparse
+import csv
+import os
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+# (nama, argumen python) — modul diimport saja, skrip dijalankan dengan --help
+ENTRY_POINTS: List[Tuple[str, List[str]]] = [
+    ("main", ["-c", "import main"]),
+    ("pipelineOrchestrator", ["-c", "import pipelineOrchestrator"]),
+    ("generateText", ["-c", "import generateText"]),
+    ("translateText", ["-c", "import translateText"]),
+    ("generateTTS", ["-c", "import generateTTS"]),
+    ("playAudio", ["-c", "import playAudio"]),
+    ("ttsService", ["-c", "import ttsService"]),
+    ("retentionManager --help", ["retentionManager.py", "--help"]),
+    ("evaluate_metrics --help", ["testing-pipeline/evaluate_metrics.py", "--help"]),
+    ("run_batch_testing_data --help", ["testing-pipeline/run_batch_testing_data.py", "--help"]),
+]
+
+REPORT_PATH = PROJECT_ROOT / "outputs-time" / "startup_benchmark.csv"
+
+
+def parse_importtime(stderr: str) -> Dict[str, int]:
+    """
+    Ambil waktu kumulatif (mikrodetik) per modul dari output -X importtime.
+    Format baris: "import time:  self [us] | cumulative | imported package".
+    """
+    cumulative: Dict[str, int] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue  # baris header
+        name = parts[2].rstrip()
+        if name.startswith("  "):
+            continue  # hanya import level teratas agar tidak terhitung ganda
+        cumulative[name.strip()] = int(parts[1])
+    return cumulative
+
+
+def measure(args: List[str]) -> Tuple[float, Dict[str, int], int]:
+    """Jalankan satu entry point. Return (wall_seconds, cumulative_us, returncode)."""
+    t0 = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=PROJECT_ROOT,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    return time.perf_counter() - t0, parse_importtime(proc.stderr), proc.returncode
+
+
+def benchmark(entries: List[Tuple[str, List[str]]], runs: int, top: int) -> List[dict]:
+    rows = []
+    for name, args in entries:
+        walls = []
+        imports: Dict[str, int] = {}
+        returncode = 0
+        for _ in range(max(runs, 1)):
+            wall, imports, returncode = measure(args)
+            walls.append(wall)
+        ranked = sorted(imports.items(), key=lambda item: item[1], reverse=True)
+        rows.append({
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "entry": name,
+            "wall_seconds": statistics.median(walls),
+            "import_seconds": sum(imports.values()) / 1e6,
+            "top_imports": ";".join(f"{mod}={us / 1e6:.3f}" for mod, us in ranked[:top]),
+            "returncode": returncode,
+        })
+        print(f"{name:32s} wall={rows[-1]['wall_seconds']:.3f}s import={rows[-1]['import_seconds']:.3f}s"
+              + ("" if returncode == 0 else f" (exit {returncode})"))
+        for mod, us in ranked[:top]:
+            print(f"    {us / 1e6:8.3f}s  {mod}")
+    return rows
+
+
+def append_report(rows: List[dict], path: Path = REPORT_PATH) -> Path:
+    os.makedirs(path.parent, exist_ok=True)
+    new_file = not path.exists()
+    with path.open("a", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+        if new_file:
+            writer.writeheader()
+        writer.writerows(rows)
+    return path
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Ukur waktu import tiap entry point.")
+    parser.add_argument("--runs", type=int, default=3, help="Jumlah pengulangan per entry point (median).")
+    parser.add_argument("--top", type=int, default=5, help="Jumlah modul terberat yang ditampilkan.")
+    parser.add_argument("--only", default="", help="Daftar entry point dipisah koma (default: semua).")
+    parser.add_argument("--no-save", action="store_true", help="Jangan tambahkan hasil ke CSV.")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    wanted = {name.strip() for name in args.only.split(",") if name.strip()}
+    entries = [entry for entry in ENTRY_POINTS if not wanted or entry[0].split()[0] in wanted]
+    if not entries:
+        print(f"[ERROR] Entry point tidak dikenal: {args.only}")
+        sys.exit(1)
+
+    rows = benchmark(entries, args.runs, args.top)
+    if not args.no_save:
+        print(f"[DONE] Hasil ditambahkan ke {append_report(rows)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -18,9 +18,6 @@ import sys
 from pathlib import Path
 from typing import Dict, List
 
-from nltk.translate.bleu_score import SmoothingFunction, sentence_bleu
-from nltk.translate.meteor_score import meteor_score as nltk_meteor
-
 
 def load_json(path: Path):
     if not path.exists():
@@ -79,6 +76,10 @@ def compute_scores(gts: Dict[str, List[str]], res: Dict[str, List[str]]):
     if not common_keys:
         raise ValueError("Tidak ada id yang overlap antara refs dan preds.")
 
+    # nltk diimport di sini supaya `--help` tidak ikut memuatnya
+    from nltk.translate.bleu_score import SmoothingFunction, sentence_bleu
+    from nltk.translate.meteor_score import meteor_score as nltk_meteor
+
     # BLEU via NLTK (per-image, smoothed)
     sf = SmoothingFunction().method1
     per_image: Dict[str, dict] = {}
@@ -0,0 +1,115 @@
+"""
+Evaluasi anggaran teks (textBudget.py) terhadap refs.json.
+
+Setiap prediksi di preds.json dipangkas dengan apply_budget, lalu kedua
+versi (asli dan terpangkas) dinilai dengan BLEU/METEOR/CIDEr yang sama
+seperti evaluate_metrics.py. Dilaporkan juga karakter dan perkiraan durasi
+bicara yang dihemat, yaitu pekerjaan terjemahan/TTS yang tidak perlu dilakukan.
+
+Jalankan dari root repo:
+
+    python testing-pipeline/evaluate_text_budget.py
+    TEXT_BUDGET_CHARS=180 python testing-pipeline/evaluate_text_budget.py --preds-out testing-pipeline/preds_budget.json
+    python testing-pipeline/evaluate_text_budget.py --chars 0 --seconds 12
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SCRIPT_DIR = Path(__file__).resolve().parent
+for path in (PROJECT_ROOT, SCRIPT_DIR):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+import textBudget  # type: ignore
+from evaluate_metrics import compute_scores, load_json, normalize_preds, normalize_refs  # type: ignore
+
+METRIC_KEYS = ["bleu-1", "bleu-2", "bleu-3", "bleu-4", "meteor", "cider"]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Bandingkan skor caption sebelum/sesudah anggaran teks.")
+    parser.add_argument("--refs", default="testing-pipeline/refs.json", help="Path ke refs.json")
+    parser.add_argument("--preds", default="testing-pipeline/preds.json", help="Path ke preds.json")
+    parser.add_argument("--chars", type=int, default=textBudget.BUDGET_CHARS,
+                        help="Batas karakter (default TEXT_BUDGET_CHARS, 0 = tanpa batas).")
+    parser.add_argument("--seconds", type=float, default=textBudget.BUDGET_SECONDS,
+                        help="Batas perkiraan durasi bicara (default TEXT_BUDGET_SECONDS, 0 = tanpa batas).")
+    parser.add_argument("--preds-out", default="", help="Simpan prediksi terpangkas (format preds.json).")
+    parser.add_argument(
+        "--json-out",
+        default="testing-pipeline/text_budget_results.json",
+        help="Path file output JSON (skor sebelum/sesudah dan penghematan).",
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    refs = normalize_refs(load_json(Path(args.refs)))
+    preds = normalize_preds(load_json(Path(args.preds)))
+
+    budgeted = {}
+    per_image = {}
+    totals = {"chars_in": 0, "chars_out": 0, "dropped_duplicate": 0, "dropped_boilerplate": 0,
+              "dropped_budget": 0, "budget_seconds": 0.0}
+    for key, hyps in preds.items():
+        if not hyps:
+            continue
+        result = textBudget.apply_budget(hyps[0], max_chars=args.chars, max_seconds=args.seconds)
+        budgeted[key] = [result.text]
+        per_image[key] = result.metrics()
+        totals["chars_in"] += result.original_chars
+        totals["chars_out"] += len(result.text)
+        totals["dropped_duplicate"] += len(result.dropped_duplicate)
+        totals["dropped_boilerplate"] += len(result.dropped_boilerplate)
+        totals["dropped_budget"] += len(result.dropped_budget)
+        totals["budget_seconds"] += result.seconds
+
+    try:
+        before = compute_scores(refs, preds)["averages"]
+        after = compute_scores(refs, budgeted)["averages"]
+    except Exception as exc:
+        print(f"[ERROR] Gagal menghitung skor: {exc}")
+        sys.exit(1)
+
+    saved = totals["chars_in"] - totals["chars_out"]
+    count = len(budgeted) or 1
+    print("\n=== ANGGARAN TEKS ===")
+    print(f"Prediksi          : {len(budgeted)}")
+    print(f"Karakter          : {totals['chars_in']} → {totals['chars_out']} "
+          f"(hemat {saved}, {saved / max(totals['chars_in'], 1):.1%})")
+    print(f"Bicara dihemat    : {saved / textBudget.CHARS_PER_SEC:.1f} s total, "
+          f"{saved / textBudget.CHARS_PER_SEC / count:.2f} s per gambar (perkiraan)")
+    print(f"Kalimat dibuang   : duplikat={totals['dropped_duplicate']} "
+          f"boilerplate={totals['dropped_boilerplate']} anggaran={totals['dropped_budget']}")
+    print(f"Biaya anggaran    : {totals['budget_seconds'] / count * 1000:.3f} ms per gambar")
+    print(f"\n{'metrik':8s} {'asli':>8s} {'anggaran':>9s} {'selisih':>8s}")
+    for metric in METRIC_KEYS:
+        print(f"{metric:8s} {before[metric]:8.4f} {after[metric]:9.4f} {after[metric] - before[metric]:+8.4f}")
+
+    if args.preds_out:
+        out = Path(args.preds_out)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        with out.open("w", encoding="utf-8") as f:
+            json.dump({k: [{"prediction": v[0]}] for k, v in budgeted.items()}, f, ensure_ascii=False, indent=2)
+        print(f"[INFO] Prediksi terpangkas ditulis ke: {out}")
+
+    out_path = Path(args.json_out)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    with out_path.open("w", encoding="utf-8") as f:
+        json.dump({
+            "budget": {"chars": args.chars, "seconds": args.seconds, "chars_per_sec": textBudget.CHARS_PER_SEC},
+            "before": before,
+            "after": after,
+            "totals": dict(totals, chars_saved=saved),
+            "per_image": per_image,
+        }, f, ensure_ascii=False, indent=2)
+    print(f"[INFO] JSON results written to: {out_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,378 @@
+"""
+Uji beban konkurensi pipeline vision → translate → TTS terhadap stub Ollama.
+
+N klien simulasi (thread) memanggil fungsi pipeline yang sama seperti
+orkestrator (generate_text_from_image_path, translate_text_to_indonesian,
+tts_from_text) secara bersamaan. Vision dilayani stub_ollama_server.py
+dengan distribusi latensi yang bisa diatur, jadi yang diukur adalah kode
+pipeline sendiri: antrean, kunci, I/O file dan indeks artefak.
+
+Untuk setiap tingkat konkurensi dilaporkan throughput, persentil latensi
+(p50/p90/p95/p99) per tahap dan total, jumlah error per jenis, serta
+kegagalan thread-safety:
+    crosstalk          : teks yang diterima/ditulis bukan milik permintaan itu
+    duplicate_path     : dua permintaan berbagi file .txt/.wav atau run_id
+    artifact_mismatch  : indeks artefak (artifactStore) menunjuk file lain
+    wav_invalid        : file .wav kosong/rusak
+Exit code 2 bila ada kegagalan thread-safety.
+
+Jalankan dari root repo:
+
+    python testing-pipeline/load_test_pipeline.py --no-tts
+    python testing-pipeline/load_test_pipeline.py --concurrency 1,2,4,8,16 --latency lognormal:1.5,0.4
+    python testing-pipeline/load_test_pipeline.py --parallel 2 --error-rate 0.05 --keep-files
+
+Beberapa server (routing ollamaEndpoints): --stubs menjalankan beberapa stub
+dengan bobot --stub-weights, --dead-endpoints menambah endpoint yang menolak
+koneksi untuk menguji health check dan retry:
+    python testing-pipeline/load_test_pipeline.py --no-tts --stubs 3 --stub-weights 1,1,2 --dead-endpoints 1
+
+Hasil: outputs-time-test/load_test_<ts>.csv (per permintaan) dan
+load_test_summary_<ts>.csv (per tingkat konkurensi), ditambah
+load_test_endpoints_<ts>.csv (per endpoint per tingkat). File .txt/.wav
+sementara ditulis ke testing-pipeline/load-test/<ts>/ dan dihapus setelah
+selesai kecuali --keep-files.
+"""
+
+import argparse
+import contextlib
+import csv
+import os
+import shutil
+import socket
+import statistics
+import sys
+import threading
+import time
+import wave
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+TEST_ROOT = Path(__file__).resolve().parent
+for path in (PROJECT_ROOT, TEST_ROOT):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+os.chdir(PROJECT_ROOT)
+
+import artifactStore  # type: ignore
+import generateText as gen_text  # type: ignore
+import ollamaEndpoints  # type: ignore
+import spanTracer  # type: ignore
+import visionCache  # type: ignore
+from artifactStore import KIND_TEXT_EN, KIND_WAV, get_store, new_run_id  # type: ignore
+from generateTTS import load_voice, tts_from_text  # type: ignore
+from stub_ollama_server import DISTRIBUTIONS, StubOllamaServer, parse_latency  # type: ignore
+from translateText import translate_text_to_indonesian  # type: ignore
+
+LOAD_TEST_ROOT = TEST_ROOT / "load-test"
+TEST_LATENCY_DIR = TEST_ROOT / "outputs-time-test"
+
+SAFETY_FAILURES = ("crosstalk", "duplicate_path", "artifact_mismatch", "wav_invalid")
+STAGE_COLUMNS = ("vision_seconds", "ollama_total_seconds", "vision_client_overhead_seconds",
+                 "translation_seconds", "tts_seconds", "total_seconds")
+PERCENTILES = (50, 90, 95, 99)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Uji beban konkurensi pipeline terhadap stub Ollama.")
+    parser.add_argument("--concurrency", default="1,2,4,8",
+                        help="Daftar jumlah klien bersamaan, dipisah koma (default 1,2,4,8).")
+    parser.add_argument("--requests-per-client", type=int, default=4,
+                        help="Permintaan per klien di setiap tingkat (default 4).")
+    parser.add_argument("--latency", default="lognormal:1.0,0.35",
+                        help=f"Distribusi latensi stub ({', '.join(DISTRIBUTIONS)}), misal const:0.8.")
+    parser.add_argument("--parallel", type=int, default=1,
+                        help="Slot inferensi paralel stub, seperti OLLAMA_NUM_PARALLEL (default 1).")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraksi jawaban HTTP 500 dari stub.")
+    parser.add_argument("--stubs", type=int, default=1, help="Jumlah stub Ollama (endpoint) yang dijalankan.")
+    parser.add_argument("--stub-weights", default="",
+                        help="Bobot routing per stub, dipisah koma (default 1 semua).")
+    parser.add_argument("--dead-endpoints", type=int, default=0,
+                        help="Tambahkan endpoint mati (koneksi ditolak) untuk menguji health check/retry.")
+    parser.add_argument("--timeout", type=float, default=None, help="Batas tunggu HTTP vision (detik).")
+    parser.add_argument("--image", default=None,
+                        help="Gambar uji (default: gambar pertama di testing-data).")
+    parser.add_argument("--no-tts", action="store_true", help="Lewati TTS (misal Piper belum terpasang).")
+    parser.add_argument("--keep-files", action="store_true", help="Jangan hapus file .txt/.wav hasil uji.")
+    parser.add_argument("--seed", type=int, default=None, help="Seed distribusi latensi/error stub.")
+    return parser.parse_args()
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Persentil dengan interpolasi linear (values tidak perlu terurut)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100.0
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def _read(path: Optional[str]) -> str:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+    except (OSError, TypeError):
+        return ""
+
+
+def _wav_ok(path: str) -> bool:
+    try:
+        with wave.open(path, "rb") as wav_file:
+            return wav_file.getnframes() > 0
+    except Exception:
+        return False
+
+
+class LoadTester:
+    """Menjalankan permintaan pipeline dari banyak thread dan memeriksa hasilnya."""
+
+    def __init__(self, image_path: Path, work_dir: Path, with_tts: bool, timeout: Optional[float]):
+        self.image_path = str(image_path)
+        self.audio_dir = str(work_dir / "audios")
+        self.with_tts = with_tts
+        self.timeout = timeout
+        self.voice = load_voice() if with_tts else None
+
+    def request(self, level: int, index: int) -> dict:
+        """Satu permintaan lengkap; semua exception dicatat sebagai error."""
+        tag = f"req-c{level}-{index:04d}"
+        run_id = new_run_id()
+        row = {"concurrency": level, "request": index, "tag": tag, "run_id": run_id,
+               "thread": threading.current_thread().name, "status": "ok", "error": "",
+               "safety": "", "txt_path": "", "wav_path": ""}
+        start = time.perf_counter()
+        try:
+            text, txt_path, timings = gen_text.generate_text_from_image_path(
+                self.image_path,
+                return_timings=True,
+                run_id=run_id,
+                prompt=f"{gen_text.VISION_PROMPT} [{tag}]",
+                timeout=self.timeout,
+            )
+            row["vision_seconds"] = time.perf_counter() - start
+            row["vision_preprocess_seconds"] = timings.get("vision_preprocess_seconds", "")
+            row["txt_path"] = txt_path or ""
+            row["vision_endpoint"] = timings.get("vision_endpoint", "")
+            row["vision_attempts"] = timings.get("vision_attempts", "")
+            row["ollama_total_seconds"] = timings.get("ollama_total_seconds", "")
+            row["vision_client_overhead_seconds"] = timings.get("vision_client_overhead_seconds", "")
+            if not text:
+                row.update(status="error", error="vision_failed")
+                return row
+
+            t0 = time.perf_counter()
+            spoken, translated = translate_text_to_indonesian(text)
+            row["translation_seconds"] = time.perf_counter() - t0
+            row["translated"] = translated
+
+            if self.with_tts:
+                t0 = time.perf_counter()
+                wav_path = tts_from_text(spoken, voice=self.voice, audio_folder=self.audio_dir, run_id=run_id)
+                row["tts_seconds"] = time.perf_counter() - t0
+                row["wav_path"] = wav_path or ""
+                if not wav_path:
+                    row.update(status="error", error="tts_failed")
+                    return row
+        except Exception as exc:
+            row.update(status="error", error=f"exception:{type(exc).__name__}")
+            return row
+        finally:
+            row["total_seconds"] = time.perf_counter() - start
+
+        row["safety"] = self._check(row, text)
+        return row
+
+    def _check(self, row: dict, text: str) -> str:
+        """Pemeriksaan per permintaan (crosstalk, indeks artefak, wav)."""
+        tag = row["tag"]
+        if tag not in text or tag not in _read(row["txt_path"]):
+            return "crosstalk"
+        en_path = os.path.join(gen_text.OUTPUT_DIR_EN, Path(row["txt_path"]).name)
+        run = get_store().get_run(row["run_id"]) or {}
+        if run.get(KIND_TEXT_EN) != en_path or (row["wav_path"] and run.get(KIND_WAV) != row["wav_path"]):
+            return "artifact_mismatch"
+        if row["wav_path"] and not _wav_ok(row["wav_path"]):
+            return "wav_invalid"
+        return ""
+
+    def run_level(self, level: int, requests_per_client: int) -> List[dict]:
+        total = level * requests_per_client
+        with ThreadPoolExecutor(max_workers=level, thread_name_prefix=f"client-c{level}") as pool:
+            rows = list(pool.map(lambda i: self.request(level, i), range(total)))
+        for column in ("txt_path", "wav_path", "run_id"):
+            counts = Counter(r[column] for r in rows if r[column])
+            for r in rows:
+                if r[column] and counts[r[column]] > 1 and not r["safety"]:
+                    r["safety"] = "duplicate_path"
+        return rows
+
+
+def _dead_url() -> str:
+    """URL di port lokal yang sudah ditutup lagi, jadi koneksinya ditolak."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    return f"http://127.0.0.1:{port}"
+
+
+def _merge_server_stats(servers: List[StubOllamaServer]) -> dict:
+    stats = [server.stats() for server in servers]
+    return {
+        "server_requests": sum(s["server_requests"] for s in stats),
+        "server_errors_injected": sum(s["server_errors_injected"] for s in stats),
+        "server_max_in_flight": max(s["server_max_in_flight"] for s in stats),
+        "server_max_queued": max(s["server_max_queued"] for s in stats),
+    }
+
+
+def summarize(level: int, rows: List[dict], wall_seconds: float, server_stats: dict) -> dict:
+    ok = [r for r in rows if r["status"] == "ok"]
+    errors = Counter(r["error"] for r in rows if r["status"] != "ok")
+    safety = Counter(r["safety"] for r in rows if r["safety"])
+    summary = {
+        "concurrency": level,
+        "requests": len(rows),
+        "ok": len(ok),
+        "errors": sum(errors.values()),
+        "error_types": ";".join(f"{k}={v}" for k, v in sorted(errors.items())),
+        "safety_failures": sum(safety.values()),
+        "safety_types": ";".join(f"{k}={v}" for k, v in sorted(safety.items())),
+        "wall_seconds": wall_seconds,
+        "throughput_rps": len(ok) / wall_seconds if wall_seconds else 0.0,
+    }
+    for column in STAGE_COLUMNS:
+        values = [float(r[column]) for r in ok if r.get(column) not in (None, "")]
+        if not values:
+            continue
+        name = column.replace("_seconds", "")
+        summary[f"{name}_mean"] = statistics.mean(values)
+        for pct in PERCENTILES:
+            summary[f"{name}_p{pct}"] = percentile(values, pct)
+    summary.update(server_stats)
+    return summary
+
+
+def print_summary(summaries: List[dict]) -> None:
+    print(f"\n{'klien':>5s} {'ok/req':>8s} {'rps':>7s} {'p50':>7s} {'p90':>7s} {'p99':>7s} "
+          f"{'vision50':>8s} {'antre':>5s} {'error':>5s} {'safety':>6s}")
+    for s in summaries:
+        print(f"{s['concurrency']:5d} {s['ok']:>3d}/{s['requests']:<4d} {s['throughput_rps']:7.2f} "
+              f"{s.get('total_p50', 0):7.2f} {s.get('total_p90', 0):7.2f} {s.get('total_p99', 0):7.2f} "
+              f"{s.get('vision_p50', 0):8.2f} {s.get('server_max_queued', 0):5d} "
+              f"{s['errors']:5d} {s['safety_failures']:6d}")
+    best = max(summaries, key=lambda s: s["throughput_rps"], default=None)
+    if best:
+        print(f"[INFO] Throughput tertinggi {best['throughput_rps']:.2f} req/s pada {best['concurrency']} klien.")
+
+
+def write_csv(path: Path, rows: List[dict]) -> None:
+    fieldnames: List[str] = []
+    for row in rows:
+        fieldnames += [key for key in row if key not in fieldnames]
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames, restval="")
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def main():
+    args = parse_args()
+    try:
+        levels = [int(v) for v in args.concurrency.split(",") if v.strip()]
+        latency = parse_latency(args.latency, seed=args.seed)
+    except ValueError as exc:
+        print(f"[ERROR] {exc}")
+        sys.exit(1)
+    if not levels or min(levels) < 1:
+        print("[ERROR] --concurrency harus berisi bilangan >= 1.")
+        sys.exit(1)
+    try:
+        weights = [float(w) for w in args.stub_weights.split(",") if w.strip()] or [1.0] * max(args.stubs, 1)
+    except ValueError:
+        print(f"[ERROR] --stub-weights tidak valid: {args.stub_weights}")
+        sys.exit(1)
+    if len(weights) != max(args.stubs, 1):
+        print("[ERROR] Jumlah --stub-weights harus sama dengan --stubs.")
+        sys.exit(1)
+
+    image_path = Path(args.image) if args.image else next(iter(sorted((PROJECT_ROOT / "testing-data").glob("*.jpg"))), None)
+    if image_path is None or not image_path.exists():
+        print("[ERROR] Gambar uji tidak ditemukan (pakai --image).")
+        sys.exit(1)
+
+    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+    work_dir = LOAD_TEST_ROOT / ts
+    gen_text.OUTPUT_DIR = str(work_dir / "outputs")
+    gen_text.OUTPUT_DIR_EN = str(work_dir / "outputs-EN")
+    artifactStore.DB_PATH = str(work_dir / "artifacts.sqlite3")
+    spanTracer.TRACE_DIR = str(TEST_LATENCY_DIR)
+    visionCache.set_mode(visionCache.MODE_OFF)  # setiap permintaan harus sampai ke stub
+
+    all_rows: List[dict] = []
+    summaries: List[dict] = []
+    endpoint_rows: List[dict] = []
+    with contextlib.ExitStack() as stack:
+        servers = [
+            stack.enter_context(StubOllamaServer(
+                latency=latency, parallel=args.parallel, error_rate=args.error_rate,
+                seed=None if args.seed is None else args.seed + i,
+            ))
+            for i in range(len(weights))
+        ]
+        endpoints = [f"{server.url}={weight:g}" for server, weight in zip(servers, weights)]
+        endpoints += [_dead_url() for _ in range(max(args.dead_endpoints, 0))]
+        ollamaEndpoints.ENDPOINTS = ",".join(endpoints)
+        pool = ollamaEndpoints.get_pool(gen_text.OLLAMA_URL)
+        for server in servers:
+            print(f"[INFO] Stub Ollama: {server.url} (latensi {args.latency}, paralel {args.parallel})")
+        tester = LoadTester(image_path, work_dir, with_tts=not args.no_tts, timeout=args.timeout)
+
+        print("[INFO] Pemanasan (muat Argos/Piper, tidak dihitung)...")
+        tester.request(0, 0)
+
+        for level in levels:
+            for server in servers:
+                server.reset_stats()
+            pool.reset_stats()
+            print(f"[INFO] {level} klien x {args.requests_per_client} permintaan...")
+            start = time.perf_counter()
+            rows = tester.run_level(level, args.requests_per_client)
+            summary = summarize(level, rows, time.perf_counter() - start, _merge_server_stats(servers))
+            spanTracer.flush(name=f"load_{ts}_c{level}")
+            all_rows += rows
+            summaries.append(summary)
+            endpoint_rows += [dict(concurrency=level, **stats) for stats in pool.stats()]
+        pool.close()
+
+    get_store().close()
+    if not args.keep_files:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    detail_path = TEST_LATENCY_DIR / f"load_test_{ts}.csv"
+    summary_path = TEST_LATENCY_DIR / f"load_test_summary_{ts}.csv"
+    write_csv(detail_path, all_rows)
+    write_csv(summary_path, summaries)
+    print_summary(summaries)
+    if len(endpoint_rows) > len(levels):
+        endpoints_path = TEST_LATENCY_DIR / f"load_test_endpoints_{ts}.csv"
+        write_csv(endpoints_path, endpoint_rows)
+        print(f"[INFO] Statistik endpoint (tingkat terakhir), lengkap di {endpoints_path}:")
+        ollamaEndpoints.print_stats([r for r in endpoint_rows if r["concurrency"] == levels[-1]])
+
+    failures = sum(s["safety_failures"] for s in summaries)
+    print(f"[DONE] Detail: {detail_path}. Ringkasan: {summary_path}")
+    if failures:
+        print(f"[ERROR] {failures} kegagalan thread-safety terdeteksi (lihat kolom safety).")
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,15 +5,27 @@ di folder `testing-data/`. Cocok untuk uji akurasi tanpa perlu kamera/GPIO.
 Contoh:
     python testing-pipeline/run_batch_testing_data.py
     python testing-pipeline/run_batch_testing_data.py --no-tts
+    python testing-pipeline/run_batch_testing_data.py --prefetch 0   # tanpa prefetch (pembanding)
+
+Ulang tahap tertentu saja dari hasil vision sebelumnya (tanpa Ollama):
+    python testing-pipeline/run_batch_testing_data.py --from-results outputs/batch_results_xxx.csv
+    python testing-pipeline/run_batch_testing_data.py --from-en-dir testing-pipeline/outputs-EN-test --stages translate
+    python testing-pipeline/run_batch_testing_data.py --from-results outputs/batch_results_xxx.csv --stages tts
+
+Video rekaman (hanya keyframe yang dikirim ke vision, lihat videoKeyframes.py):
+    python testing-pipeline/run_batch_testing_data.py --video rekaman/jalan_kampus.mp4 --no-tts
 """
 
 import argparse
+import asyncio
 import csv
 import os
+import statistics
 import sys
+import time
 from datetime import datetime
-from pathlib import Path
-from typing import List
+from pathlib import Path, PureWindowsPath
+from typing import Dict, List, Optional
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 TEST_ROOT = Path(__file__).resolve().parent
@@ -26,27 +38,45 @@ os.chdir(PROJECT_ROOT)
 import generateText as gen_text  # type: ignore
 import generateTTS as gen_tts  # type: ignore
 import latencyLogger as latency_logger  # type: ignore
-from generateText import generate_text_from_image_path  # type: ignore
-from generateTTS import load_voice, tts_from_text  # type: ignore
-from latencyLogger import log_latency  # type: ignore
-from translateText import translate_text_to_indonesian, persist_translated_text  # type: ignore
+import ollamaEndpoints  # type: ignore
+import spanTracer  # type: ignore
+import visionCache  # type: ignore
+from artifactStore import new_run_id  # type: ignore
+from audioPostprocess import postprocess_wav  # type: ignore
+from pipelineOrchestrator import (  # type: ignore
+    FileOnlySink,
+    ImageFolderSource,
+    PipelineOrchestrator,
+    VideoKeyframeSource,
+)
+from spanTracer import span  # type: ignore
+from textBudget import apply_budget  # type: ignore
+from videoKeyframes import format_timestamp  # type: ignore
+from translateText import translate_text_to_indonesian  # type: ignore
+
+STAGE_VISION = "vision"
+STAGE_TRANSLATE = "translate"
+STAGE_TTS = "tts"
+ALL_STAGES = (STAGE_VISION, STAGE_TRANSLATE, STAGE_TTS)
 
 # Override folder output khusus batch testing (agar terpisah dari pipeline utama)
 TEST_OUTPUT_DIR = TEST_ROOT / "outputs-test"
 TEST_OUTPUT_DIR_EN = TEST_ROOT / "outputs-EN-test"
 TEST_AUDIO_DIR = TEST_ROOT / "audios-test"
 TEST_LATENCY_DIR = TEST_ROOT / "outputs-time-test"
+TEST_KEYFRAME_DIR = TEST_ROOT / "keyframes-test"
 
-for d in (TEST_OUTPUT_DIR, TEST_OUTPUT_DIR_EN, TEST_AUDIO_DIR, TEST_LATENCY_DIR):
-    d.mkdir(parents=True, exist_ok=True)
+# Kolom tambahan job video (job.extra) untuk track deskripsi
+VIDEO_FIELDS = ("video_timestamp_seconds", "video_frame_index", "keyframe_score")
 
-# Terapkan konfigurasi path ke modul terkait
+# Terapkan konfigurasi path ke modul terkait (folder dibuat saat pertama ditulis)
 gen_text.OUTPUT_DIR = str(TEST_OUTPUT_DIR)
 gen_text.OUTPUT_DIR_EN = str(TEST_OUTPUT_DIR_EN)
 
 gen_tts.AUDIO_FOLDER = str(TEST_AUDIO_DIR)
 
 latency_logger.LATENCY_DIR = str(TEST_LATENCY_DIR)
+spanTracer.TRACE_DIR = str(TEST_LATENCY_DIR)
 
 
 def parse_args() -> argparse.Namespace:
@@ -69,9 +99,62 @@ def parse_args() -> argparse.Namespace:
         default=None,
         help="Batas jumlah gambar yang diproses (opsional).",
     )
+    parser.add_argument(
+        "--vision-cache",
+        choices=visionCache.MODES,
+        default=None,
+        help="Mode cache respons vision (default: VISION_CACHE_MODE, yaitu off). "
+        "'readwrite' memakai respons tersimpan bila ada; 'replay' hanya respons "
+        "tersimpan tanpa memanggil Ollama. Dengan cache, vision_seconds bukan latensi inferensi.",
+    )
+    parser.add_argument(
+        "--prefetch",
+        type=int,
+        default=2,
+        help="Jumlah gambar berikutnya yang di-decode/resize/encode di thread latar "
+        "selagi vision berjalan (default 2, 0 = nonaktif).",
+    )
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument(
+        "--video",
+        default=None,
+        help="File video; hanya keyframe (perubahan adegan) yang dideskripsikan.",
+    )
+    source.add_argument(
+        "--from-results",
+        default=None,
+        help="CSV batch_results_*.csv sebelumnya; teks EN dibaca dari outputs-EN-test (tanpa vision).",
+    )
+    source.add_argument(
+        "--from-en-dir",
+        default=None,
+        help="Folder berisi teks EN (*.txt) hasil vision sebelumnya (tanpa vision).",
+    )
+    parser.add_argument(
+        "--stages",
+        default=None,
+        help="Tahap yang dijalankan, dipisah koma: vision,translate,tts "
+        "(default: semua; translate,tts bila memakai --from-results/--from-en-dir).",
+    )
     return parser.parse_args()
 
 
+def parse_stages(spec: Optional[str], from_previous: bool) -> List[str]:
+    if not spec:
+        return [STAGE_TRANSLATE, STAGE_TTS] if from_previous else list(ALL_STAGES)
+    stages = [name.strip().lower() for name in spec.split(",") if name.strip()]
+    unknown = [name for name in stages if name not in ALL_STAGES]
+    if unknown:
+        raise ValueError(f"Tahap tidak dikenal: {', '.join(unknown)} (pilihan: {', '.join(ALL_STAGES)})")
+    if from_previous and STAGE_VISION in stages:
+        raise ValueError("Tahap vision tidak bisa dijalankan dari hasil sebelumnya.")
+    if not from_previous and not {STAGE_VISION, STAGE_TRANSLATE} <= set(stages):
+        raise ValueError("Tanpa --from-results/--from-en-dir, tahap vision dan translate wajib ada.")
+    if not stages:
+        raise ValueError("Tidak ada tahap yang dipilih.")
+    return stages
+
+
 def list_images(folder: Path) -> List[Path]:
     exts = {".jpg", ".jpeg", ".png", ".bmp"}
     files = [p for p in folder.iterdir() if p.suffix.lower() in exts and p.is_file()]
@@ -79,74 +162,246 @@ def list_images(folder: Path) -> List[Path]:
 
 
 class BatchTester:
-    def __init__(self, with_tts: bool):
-        self.with_tts = with_tts
-        self.voice = None
+    """
+    Pembungkus tipis orkestrator untuk batch: tanpa capture dan tanpa playback.
+    Dengan max_in_flight=2, terjemahan/TTS gambar ke-N tumpang tindih dengan
+    vision gambar ke-N+1. Bila OLLAMA_ENDPOINTS berisi beberapa server,
+    worker vision dan max_in_flight ikut kapasitas pool endpoint.
+    """
+
+    def __init__(self, with_tts: bool, max_in_flight: int = 2):
+        self.results: List[tuple] = []
+        vision_workers = ollamaEndpoints.get_pool(gen_text.OLLAMA_URL).capacity
+        max_in_flight = max(max_in_flight, vision_workers + 1)
+        self.orchestrator = PipelineOrchestrator(
+            sink=FileOnlySink(),  # hanya simpan file .wav, tanpa playback
+            with_tts=with_tts,
+            tts_required=False,
+            audio_folder=str(TEST_AUDIO_DIR),
+            max_in_flight=max_in_flight,
+            label=None,
+            on_result=self._collect,
+            trace_per_job=False,  # satu trace untuk seluruh batch
+            vision_workers=vision_workers,
+        )
 
-    def process_image(self, image_path: Path) -> dict:
-        print(f"[BATCH] Memproses {image_path.name} ...")
-        start_time = datetime.now()
+    def _collect(self, job) -> None:
+        row = job.as_row()
+        row.update({key: job.extra[key] for key in VIDEO_FIELDS if key in job.extra})
+        self.results.append((job.job_id, row))
 
-        # 1) Vision → teks (EN)
-        text, txt_path, timings = generate_text_from_image_path(
-            str(image_path), output_name=image_path.stem, return_timings=True
-        )
-        if not text:
-            return {
-                "image": image_path.name,
-                "status": "fail",
-                "error": "vision_or_llm_failed",
-                "txt_path": txt_path or "",
-                "translated": False,
-                "spoken_text": "",
+    def run(self, source) -> List[dict]:
+        try:
+            asyncio.run(self.orchestrator.run(source))
+        finally:
+            self.orchestrator.close()
+        return [row for _, row in sorted(self.results, key=lambda item: item[0])]
+
+
+def _read_text(path: Path) -> str:
+    try:
+        return path.read_text(encoding="utf-8").strip()
+    except (OSError, UnicodeDecodeError):
+        return ""
+
+
+def load_from_results(csv_path: Path) -> List[dict]:
+    """
+    Item dari CSV hasil batch sebelumnya. Teks EN dibaca dari outputs-EN-test
+    (nama file sama dengan txt_path); teks ID dari kolom spoken_text.
+    txt_path bisa berupa path Windows (CSV dari laptop) maupun POSIX (Jetson);
+    PureWindowsPath memisah keduanya.
+    """
+    items = []
+    with csv_path.open("r", encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f):
+            if row.get("status") != "ok":
+                continue
+            txt_path = row.get("txt_path", "")
+            en_text = _read_text(TEST_OUTPUT_DIR_EN / PureWindowsPath(txt_path).name) if txt_path else ""
+            items.append({
+                "image": row.get("image", ""),
+                "txt_path": txt_path,
+                "en_text": en_text,
+                "spoken_text": row.get("spoken_text", ""),
+                "translated": row.get("translated") == "True",
+            })
+    return items
+
+
+def load_from_en_dir(folder: Path) -> List[dict]:
+    """Item dari folder teks EN (*.txt); nama file dipakai sebagai nama gambar."""
+    return [
+        {"image": path.stem, "txt_path": "", "en_text": _read_text(path), "spoken_text": "", "translated": False}
+        for path in sorted(folder.glob("*.txt"), key=lambda p: p.name)
+    ]
+
+
+class StageRerunner:
+    """
+    Jalankan ulang tahap terjemahan dan/atau TTS dari hasil vision sebelumnya,
+    berurutan per item, dengan durasi per tahap di setiap baris laporan.
+    Tahap terjemahan memakai anggaran teks yang sama seperti pipeline.
+    """
+
+    def __init__(self, stages: List[str]):
+        self.stages = stages
+        self.voice = None
+
+    def _translate(self, item: dict, row: dict) -> Optional[str]:
+        if not item["en_text"]:
+            row["error"] = "missing_en_text"
+            return None
+        with span("text_budget", image=item["image"]):
+            budget = apply_budget(item["en_text"])
+        start = time.perf_counter()
+        with span("translation", image=item["image"]):
+            spoken_text, translated = translate_text_to_indonesian(budget.text)
+        row["translation_seconds"] = time.perf_counter() - start
+        row["translated"] = translated
+        return spoken_text
+
+    def _tts(self, text: str, row: dict) -> bool:
+        if self.voice is None:
+            self.voice = gen_tts.load_voice()
+        start = time.perf_counter()
+        with span("tts", image=row["image"]):
+            wav_path = gen_tts.tts_from_text(
+                text, voice=self.voice, audio_folder=str(TEST_AUDIO_DIR), run_id=row["run_id"]
+            )
+        row["tts_seconds"] = time.perf_counter() - start
+        if not wav_path:
+            row["error"] = "tts_failed"
+            return False
+        row["wav_path"] = wav_path
+        row["audio_postprocess_seconds"] = postprocess_wav(wav_path).get("audio_postprocess_seconds", "")
+        return True
+
+    def run(self, items: List[dict]) -> List[dict]:
+        rows = []
+        total = len(items)
+        for idx, item in enumerate(items, 1):
+            print(f"[INFO] ({idx}/{total}) {item['image']}")
+            row = {
+                "image": item["image"],
+                "status": "failed",
+                "error": "",
+                "txt_path": item["txt_path"],
+                "translated": item["translated"],
+                "spoken_text": item["spoken_text"] or item["en_text"],
                 "wav_path": "",
+                "run_id": new_run_id(),
             }
+            rows.append(row)
+            if STAGE_TRANSLATE in self.stages:
+                spoken_text = self._translate(item, row)
+                if spoken_text is None:
+                    continue
+                row["spoken_text"] = spoken_text
+            if STAGE_TTS in self.stages:
+                if not row["spoken_text"]:
+                    row["error"] = "missing_text"
+                    continue
+                if not self._tts(row["spoken_text"], row):
+                    continue
+            row["status"] = "ok"
+        return rows
+
+
+def write_video_track(rows: List[dict], source: VideoKeyframeSource, wall_seconds: float) -> Dict[str, Path]:
+    """
+    Tulis track deskripsi video (CSV + SRT) ke outputs/ dan laporan
+    latensi video (key=value) ke outputs-time-test/.
+    Setiap deskripsi berlaku dari timestamp keyframe-nya sampai keyframe berikutnya.
+    """
+    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+    stem = source.video_path.stem
+    stats = source.stats
+    rows = sorted(rows, key=lambda r: r.get("video_timestamp_seconds", 0.0))
 
-        # 2) Translate ke Indonesia (fallback ke teks asli jika gagal)
-        translation_start = datetime.now()
-        spoken_text, translated = translate_text_to_indonesian(text)
-        translation_end = datetime.now()
-        translation_duration = (translation_end - translation_start).total_seconds()
-        if translated:
-            persist_translated_text(txt_path, spoken_text)
-
-        # 3) Opsional: TTS
-        wav_path = ""
-        if self.with_tts:
-            if self.voice is None:
-                self.voice = load_voice()
-            tts_start = datetime.now()
-            # Hanya simpan file .wav, tanpa playback
-            wav_path = tts_from_text(spoken_text, voice=self.voice, audio_folder=str(TEST_AUDIO_DIR)) or ""
-            tts_end = datetime.now()
-            tts_duration = (tts_end - tts_start).total_seconds()
-        else:
-            tts_duration = None
-
-        # Catat latensi untuk setiap gambar (menggunakan waktu start -> akhir proses)
-        speech_start_time = tts_end if self.with_tts else translation_end
-        stage_durations = {
-            "capture": None,  # tidak ada capture kamera pada batch testing
-            "vision_generate": timings.get("vision_seconds") if timings else None,
-            "translation": translation_duration,
-            "tts": tts_duration,
-        }
-        log_latency(
-            start_time,
-            speech_start_time,
-            context=wav_path or (txt_path or ""),
-            stage_durations=stage_durations,
-        )
+    output_dir = PROJECT_ROOT / "outputs"
+    output_dir.mkdir(parents=True, exist_ok=True)
+    csv_path = output_dir / f"video_track_{stem}_{ts}.csv"
+    fieldnames = ["timestamp", *VIDEO_FIELDS, "status", "spoken_text", "wav_path",
+                  "vision_seconds", "vision_cache_hit", "run_id"]
+    with csv_path.open("w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction="ignore", restval="")
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(dict(row, timestamp=format_timestamp(row.get("video_timestamp_seconds", 0.0))))
+
+    described = [r for r in rows if r["status"] == "ok" and r.get("spoken_text")]
+    srt_path = output_dir / f"video_track_{stem}_{ts}.srt"
+    with srt_path.open("w", encoding="utf-8") as f:
+        for idx, row in enumerate(described, 1):
+            start = row["video_timestamp_seconds"]
+            end = described[idx]["video_timestamp_seconds"] if idx < len(described) else stats.duration_seconds
+            end = max(end, start + 1.0)
+            f.write(f"{idx}\n{format_timestamp(start)} --> {format_timestamp(end)}\n{row['spoken_text']}\n\n")
+
+    vision = [float(r["vision_seconds"]) for r in rows if r.get("vision_seconds") not in (None, "")]
+    report = dict(
+        stats.as_dict(),
+        vision_calls=sum(1 for r in rows if r.get("vision_cache_hit") != 1 and r.get("vision_seconds") not in (None, "")),
+        vision_cache_hits=sum(1 for r in rows if r.get("vision_cache_hit") == 1),
+        descriptions=len(described),
+        vision_seconds_total=sum(vision),
+        vision_seconds_mean=statistics.mean(vision) if vision else 0.0,
+        wall_seconds=wall_seconds,
+        realtime_factor=wall_seconds / stats.duration_seconds if stats.duration_seconds else 0.0,
+    )
+    TEST_LATENCY_DIR.mkdir(parents=True, exist_ok=True)
+    report_path = TEST_LATENCY_DIR / f"video_report_{stem}_{ts}.txt"
+    lines = [f"video={source.video_path}"]
+    lines += [f"{key}={value:.3f}" if isinstance(value, float) else f"{key}={value}" for key, value in report.items()]
+    report_path.write_text("\n".join(lines), encoding="utf-8")
+
+    print(f"[INFO] {stats.total_frames} frame, {stats.frames_skipped} dilewati, "
+          f"{report['vision_calls']} panggilan vision, {len(described)} deskripsi.")
+    return {"csv": csv_path, "srt": srt_path, "report": report_path}
 
-        return {
-            "image": image_path.name,
-            "status": "ok",
-            "error": "",
-            "txt_path": txt_path or "",
-            "translated": translated,
-            "spoken_text": spoken_text,
-            "wav_path": wav_path,
-        }
+
+def run_video(args, stages: List[str]) -> None:
+    video_path = (PROJECT_ROOT / args.video).resolve()
+    if not video_path.exists():
+        print(f"[ERROR] File video tidak ditemukan: {video_path}")
+        sys.exit(1)
+    if args.vision_cache:
+        visionCache.set_mode(args.vision_cache)
+
+    source = VideoKeyframeSource(video_path, TEST_KEYFRAME_DIR / video_path.stem)
+    tester = BatchTester(with_tts=STAGE_TTS in stages)
+    start = time.perf_counter()
+    try:
+        with span("video", video=video_path.name):
+            results = tester.run(source)
+    except OSError as exc:
+        print(f"[ERROR] {exc}")
+        sys.exit(1)
+    paths = write_video_track(results, source, time.perf_counter() - start)
+    spanTracer.flush(name=f"video_{video_path.stem}")
+    print_stage_summary(results)
+    write_endpoint_report(paths["csv"])
+    print(f"[DONE] Track deskripsi: {paths['srt']} / {paths['csv']}. Laporan: {paths['report']}")
+
+
+def print_stage_summary(rows: List[dict]) -> None:
+    """Total dan rata-rata durasi per tahap atas seluruh baris."""
+    for column in ("vision_preprocess_seconds", "vision_prefetch_wait_seconds", "vision_seconds",
+                   "ollama_load_seconds", "ollama_prompt_eval_seconds", "ollama_eval_seconds",
+                   "vision_client_overhead_seconds", "translation_seconds", "tts_seconds",
+                   "audio_postprocess_seconds"):
+        values = [float(r[column]) for r in rows if r.get(column) not in (None, "")]
+        if values:
+            print(f"[INFO] {column:30s} total={sum(values):8.2f}s mean={statistics.mean(values):.3f}s "
+                  f"p50={statistics.median(values):.3f}s (n={len(values)})")
+    for label, count, seconds in (("prompt", "ollama_prompt_eval_count", "ollama_prompt_eval_seconds"),
+                                  ("decode", "ollama_eval_count", "ollama_eval_seconds")):
+        measured = [r for r in rows if r.get(count) not in (None, "") and r.get(seconds)]
+        total_seconds = sum(float(r[seconds]) for r in measured)
+        if total_seconds > 0:
+            tokens = sum(int(r[count]) for r in measured)
+            print(f"[INFO] Ollama {label}: {tokens} token, {tokens / total_seconds:.1f} token/s (n={len(measured)})")
 
 
 def write_report(rows: List[dict], output_dir: Path) -> Path:
@@ -162,54 +417,125 @@ def write_report(rows: List[dict], output_dir: Path) -> Path:
         "translated",
         "spoken_text",
         "wav_path",
+        "run_id",
+        "vision_seconds",
+        "vision_preprocess_seconds",
+        "vision_decode_scale",
+        "vision_prefetched",
+        "vision_prefetch_wait_seconds",
+        "vision_tokens_est",
+        "vision_endpoint",
+        "vision_cache_hit",
+        "ollama_load_seconds",
+        "ollama_prompt_eval_seconds",
+        "ollama_prompt_eval_count",
+        "ollama_eval_seconds",
+        "ollama_eval_count",
+        "ollama_total_seconds",
+        "ollama_prompt_tokens_per_sec",
+        "ollama_eval_tokens_per_sec",
+        "vision_client_overhead_seconds",
+        "translation_seconds",
+        "tts_seconds",
+        "audio_postprocess_seconds",
     ]
 
     with report_path.open("w", encoding="utf-8", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer = csv.DictWriter(f, fieldnames=fieldnames, restval="")
         writer.writeheader()
         writer.writerows(rows)
 
     return report_path
 
 
-def main():
-    args = parse_args()
-
-    data_dir = (PROJECT_ROOT / args.data_dir).resolve()
-    if not data_dir.exists():
-        print(f"[ERROR] Folder data tidak ditemukan: {data_dir}")
+def write_endpoint_report(report_path: Path) -> Optional[Path]:
+    """Statistik per endpoint Ollama di samping batch_results_*.csv; None bila tidak ada permintaan."""
+    stats = ollamaEndpoints.get_pool(gen_text.OLLAMA_URL).stats()
+    if not any(s["requests"] for s in stats):
+        return None
+    ollamaEndpoints.print_stats(stats)
+    path = report_path.with_name(f"{report_path.stem}_endpoints.csv")
+    with path.open("w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(stats[0]))
+        writer.writeheader()
+        writer.writerows(stats)
+    return path
+
+
+def run_stages_from_previous(args, stages: List[str]) -> List[dict]:
+    if args.from_results:
+        source = (PROJECT_ROOT / args.from_results).resolve()
+        loader = load_from_results
+    else:
+        source = (PROJECT_ROOT / args.from_en_dir).resolve()
+        loader = load_from_en_dir
+    if not source.exists():
+        print(f"[ERROR] Sumber hasil sebelumnya tidak ditemukan: {source}")
         sys.exit(1)
 
-    images = list_images(data_dir)
-    if not images:
-        print(f"[ERROR] Tidak ada file gambar di {data_dir}")
+    items = loader(source)
+    if args.limit is not None:
+        items = items[: max(args.limit, 0)]
+    if not items:
+        print(f"[ERROR] Tidak ada item yang bisa diproses dari {source}")
         sys.exit(1)
 
-    if args.limit is not None:
-        images = images[: max(args.limit, 0)]
+    print(f"[INFO] Menjalankan tahap {','.join(stages)} untuk {len(items)} item dari {source}")
+    return StageRerunner(stages).run(items)
 
-    tester = BatchTester(with_tts=not args.no_tts)
-    results = []
 
-    for idx, img in enumerate(images, 1):
-        print(f"[INFO] ({idx}/{len(images)}) {img.name}")
-        try:
-            result = tester.process_image(img)
-        except Exception as exc:  # tangkap error tak terduga agar batch tetap jalan
-            result = {
-                "image": img.name,
-                "status": "error",
-                "error": str(exc),
-                "txt_path": "",
-                "translated": False,
-                "spoken_text": "",
-                "wav_path": "",
-            }
-        results.append(result)
+def main():
+    args = parse_args()
+    from_previous = bool(args.from_results or args.from_en_dir)
+    try:
+        stages = parse_stages(args.stages, from_previous)
+    except ValueError as exc:
+        print(f"[ERROR] {exc}")
+        sys.exit(1)
+    if args.no_tts and STAGE_TTS in stages:
+        stages.remove(STAGE_TTS)
+
+    if args.video:
+        run_video(args, stages)
+        return
+
+    if from_previous:
+        if not stages:
+            print("[ERROR] Tidak ada tahap yang tersisa untuk dijalankan.")
+            sys.exit(1)
+        with span("batch", stages=",".join(stages)):
+            results = run_stages_from_previous(args, stages)
+    else:
+        data_dir = (PROJECT_ROOT / args.data_dir).resolve()
+        if not data_dir.exists():
+            print(f"[ERROR] Folder data tidak ditemukan: {data_dir}")
+            sys.exit(1)
+
+        images = list_images(data_dir)
+        if not images:
+            print(f"[ERROR] Tidak ada file gambar di {data_dir}")
+            sys.exit(1)
+
+        if args.limit is not None:
+            images = images[: max(args.limit, 0)]
+
+        if args.vision_cache:
+            visionCache.set_mode(args.vision_cache)
+        print(f"[INFO] Cache vision: {visionCache.CACHE_MODE} ({visionCache.CACHE_DIR})")
+
+        tester = BatchTester(with_tts=STAGE_TTS in stages)
+        with span("batch", images=len(images)):
+            results = tester.run(ImageFolderSource(images, resize=True, prefetch=args.prefetch))
 
     report_path = write_report(results, PROJECT_ROOT / "outputs")
+    spanTracer.flush(name=f"batch_{report_path.stem.replace('batch_results_', '')}")
+    print_stage_summary(results)
+    endpoint_path = write_endpoint_report(report_path)
+    if endpoint_path:
+        print(f"[INFO] Statistik endpoint Ollama: {endpoint_path}")
     success = sum(1 for r in results if r["status"] == "ok")
-    print(f"[DONE] Selesai. Berhasil: {success}/{len(results)}. Laporan: {report_path}")
+    hits = sum(1 for r in results if r.get("vision_cache_hit") == 1)
+    print(f"[DONE] Selesai. Berhasil: {success}/{len(results)}, cache vision hit: {hits}. Laporan: {report_path}")
 
 
 if __name__ == "__main__":
@@ -9,6 +9,9 @@ Jalankan dari root repo:
 Opsional:
     --loop        : jalankan berulang
     --delay 2.5   : jeda antar-run saat loop (detik)
+    --two-phase   : ucapkan peringatan bahaya singkat dulu, lalu deskripsi lengkap
+    --narrate     : narasi kontinu; capture berikutnya dimulai saat teks siap,
+                    deskripsi basi (adegan berubah) dibuang
 
 Dependensi utama:
 - opencv-python
@@ -18,9 +21,9 @@ Dependensi utama:
 """
 
 import argparse
+import asyncio
 import os
 import sys
-import time
 from pathlib import Path
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
@@ -30,33 +33,13 @@ if str(PROJECT_ROOT) not in sys.path:
 # Pastikan modul menggunakan direktori yang sama dengan pipeline utama
 os.chdir(PROJECT_ROOT)
 
-from datetime import datetime
-
-from generateText import generate_text_from_camera  # type: ignore
-from generateTTS import load_voice, tts_from_text  # type: ignore
-from latencyLogger import log_latency  # type: ignore
-from translateText import translate_text_to_indonesian, persist_translated_text  # type: ignore
-
-try:
-    import winsound
-except ImportError:
-    winsound = None
-
-
-def play_wav_windows(file_path: str) -> None:
-    """
-    Putar file WAV menggunakan winsound (tersedia bawaan Windows).
-    """
-    if not os.path.exists(file_path):
-        print(f"[ERROR] File audio tidak ditemukan: {file_path}")
-        return
-
-    if winsound is None:
-        print("[WARN] winsound tidak tersedia. Audio tidak diputar.")
-        return
-
-    print(f"[INFO] Memutar audio di speaker laptop: {file_path}")
-    winsound.PlaySound(file_path, winsound.SND_FILENAME)
+from generateText import NARRATION_MODE, TWO_PHASE_MODE  # type: ignore
+from pipelineOrchestrator import (  # type: ignore
+    CameraLoopSource,
+    ContinuousNarrationSource,
+    PipelineOrchestrator,
+    WinsoundSink,
+)
 
 
 class LocalPipeline:
@@ -64,55 +47,31 @@ class LocalPipeline:
     Pipeline tanpa GPIO, cocok untuk uji coba di laptop.
     """
 
-    def __init__(self):
-        self.voice = None
+    def __init__(self, two_phase: bool = TWO_PHASE_MODE, narration: bool = False):
+        self.orchestrator = PipelineOrchestrator(
+            sink=WinsoundSink(),
+            max_in_flight=2 if narration else 1,
+            label="PIPELINE WINDOWS",
+            deadlines=True,
+            two_phase=two_phase,
+            narration=narration,
+        )
 
     def run_once(self) -> bool:
         """
         Jalankan pipeline satu kali. Return True bila sukses utuh.
         """
-        print("\n================= PIPELINE WINDOWS DIMULAI =================")
-        start_time = datetime.now()
-
-        text, txt_path, timings = generate_text_from_camera(return_timings=True)
-        if not text:
-            print("[PIPELINE] Gagal mendapatkan teks dari model visi.")
-            print("================= PIPELINE WINDOWS GAGAL =================\n")
-            return False
-
-        translation_start = datetime.now()
-        spoken_text, translated = translate_text_to_indonesian(text)
-        translation_end = datetime.now()
-        translation_duration = (translation_end - translation_start).total_seconds()
-        if translated:
-            print("[PIPELINE] Teks berhasil diterjemahkan ke Bahasa Indonesia.")
-            persist_translated_text(txt_path, spoken_text)
-        else:
-            print("[PIPELINE] Memakai teks asli (en) karena terjemahan belum siap.")
-
-        if self.voice is None:
-            self.voice = load_voice()
-
-        tts_start = datetime.now()
-        wav_path = tts_from_text(spoken_text, voice=self.voice)
-        tts_end = datetime.now()
-        tts_duration = (tts_end - tts_start).total_seconds()
-        if not wav_path:
-            print("[PIPELINE] Tahap TTS gagal.")
-            print("================= PIPELINE WINDOWS GAGAL =================\n")
-            return False
-
-        speech_start_time = tts_end
-        stage_durations = {
-            "capture": timings.get("capture_seconds"),
-            "vision_generate": timings.get("vision_seconds"),
-            "translation": translation_duration,
-            "tts": tts_duration,
-        }
-        log_latency(start_time, speech_start_time, context=wav_path or "", stage_durations=stage_durations)
-        play_wav_windows(wav_path)
-        print("================= PIPELINE WINDOWS SELESAI =================\n")
-        return True
+        return self.orchestrator.run_once().status == "ok"
+
+    def run(self, loop: bool = False, delay: float = 3.0) -> None:
+        """
+        Jalankan sekali, atau berulang dengan jeda `delay` detik bila loop=True.
+        """
+        asyncio.run(self.orchestrator.run(CameraLoopSource(loop=loop, delay=delay)))
+
+    def narrate(self) -> None:
+        """Narasi kontinu sampai dihentikan (orkestrator harus dibuat dengan narration=True)."""
+        asyncio.run(self.orchestrator.run(ContinuousNarrationSource()))
 
 
 def parse_args() -> argparse.Namespace:
@@ -128,21 +87,34 @@ def parse_args() -> argparse.Namespace:
         default=3.0,
         help="Jeda antar eksekusi saat --loop aktif (detik).",
     )
+    parser.add_argument(
+        "--two-phase",
+        action="store_true",
+        default=TWO_PHASE_MODE,
+        help="Ucapkan peringatan bahaya singkat dulu, lalu deskripsi lengkap.",
+    )
+    parser.add_argument(
+        "--narrate",
+        action="store_true",
+        default=NARRATION_MODE,
+        help="Narasi kontinu: vision berikutnya berjalan selagi deskripsi diucapkan (mengabaikan --loop/--delay).",
+    )
     return parser.parse_args()
 
 
 def main():
     args = parse_args()
-    pipeline = LocalPipeline()
+    pipeline = LocalPipeline(two_phase=args.two_phase, narration=args.narrate)
 
     try:
-        while True:
-            pipeline.run_once()
-            if not args.loop:
-                break
-            time.sleep(max(args.delay, 0.5))
+        if args.narrate:
+            pipeline.narrate()
+        else:
+            pipeline.run(loop=args.loop, delay=args.delay)
     except KeyboardInterrupt:
         print("\n[INFO] Dihentikan oleh pengguna.")
+    finally:
+        pipeline.orchestrator.close()
 
 
 if __name__ == "__main__":
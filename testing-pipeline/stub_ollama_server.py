@@ -0,0 +1,281 @@
+"""
+Server tiruan Ollama (/api/chat, /api/tags) untuk uji beban tanpa GPU/model.
+
+Setiap permintaan /api/chat ditahan selama latensi acak sesuai distribusi
+yang dipilih, lalu dijawab dengan JSON berstruktur sama seperti Ollama
+(message.content + *_duration dalam nanodetik). Teks jawaban menyalin tag
+`[req-...]` dari prompt sehingga klien bisa memastikan jawaban yang
+diterimanya memang milik permintaannya sendiri.
+
+Distribusi latensi (--latency, detik):
+    const:0.8            selalu 0.8
+    uniform:0.5,1.5      seragam antara 0.5 dan 1.5
+    normal:1.0,0.2       normal (mean, sd), dipotong di 0
+    lognormal:1.0,0.35   log-normal (median, sigma), ekor panjang seperti inferensi nyata
+    exp:1.0              eksponensial (mean)
+
+--parallel meniru OLLAMA_NUM_PARALLEL: permintaan di atas batas ini antre
+seperti di satu GPU, jadi plafon throughput-nya realistis.
+
+Contoh (manual, untuk run_pipeline_windows.py / batch):
+    python testing-pipeline/stub_ollama_server.py --port 11434 --latency lognormal:2.0,0.3
+"""
+
+import argparse
+import base64
+import json
+import math
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Optional
+
+DISTRIBUTIONS = ("const", "uniform", "normal", "lognormal", "exp")
+_TAG_PATTERN = re.compile(r"\[(req-[\w-]+)\]")
+
+
+def parse_latency(spec: str, seed: Optional[int] = None) -> Callable[[], float]:
+    """Spesifikasi "nama:param1,param2" → fungsi sampel latensi (detik, >= 0)."""
+    name, _, params = spec.partition(":")
+    name = name.strip().lower()
+    try:
+        values = [float(v) for v in params.split(",") if v.strip()]
+    except ValueError:
+        raise ValueError(f"Parameter latensi tidak valid: {spec}")
+    expected = {"const": 1, "uniform": 2, "normal": 2, "lognormal": 2, "exp": 1}
+    if name not in expected:
+        raise ValueError(f"Distribusi latensi tidak dikenal: {name} (pilihan: {', '.join(DISTRIBUTIONS)})")
+    if len(values) != expected[name]:
+        raise ValueError(f"Distribusi {name} butuh {expected[name]} parameter: {spec}")
+
+    rng = random.Random(seed)
+    lock = threading.Lock()  # random.Random tidak aman dipakai bersama tanpa kunci
+
+    def sample() -> float:
+        with lock:
+            if name == "const":
+                value = values[0]
+            elif name == "uniform":
+                value = rng.uniform(values[0], values[1])
+            elif name == "normal":
+                value = rng.gauss(values[0], values[1])
+            elif name == "lognormal":
+                value = rng.lognormvariate(math.log(max(values[0], 1e-6)), values[1])
+            else:
+                value = rng.expovariate(1.0 / values[0]) if values[0] > 0 else 0.0
+        return max(value, 0.0)
+
+    return sample
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "StubOllamaServer"
+
+    def log_message(self, format, *args):  # noqa: A002 - signature BaseHTTPRequestHandler
+        pass  # jangan banjiri konsol saat uji beban
+
+    def _send_json(self, status: int, body: dict) -> None:
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path in ("/", ""):
+            data = b"Ollama is running"
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        elif self.path == "/api/tags":
+            self._send_json(200, {"models": [{"name": self.server.model, "model": self.server.model}]})
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        if self.path != "/api/chat":
+            self._send_json(404, {"error": "not found"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", "0"))
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except Exception as exc:
+            self._send_json(400, {"error": f"invalid json: {exc}"})
+            return
+        self._send_json(*self.server.handle_chat(payload))
+
+
+class StubOllamaServer(ThreadingHTTPServer):
+    """
+    Server tiruan yang berjalan di thread latar. Pakai sebagai context manager:
+
+        with StubOllamaServer(latency=parse_latency("const:0.5")) as server:
+            generateText.OLLAMA_URL = server.chat_url
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: Optional[Callable[[], float]] = None,
+        parallel: int = 1,
+        error_rate: float = 0.0,
+        load_seconds: float = 0.0,
+        model: str = "qwen2.5vl:3b",
+        seed: Optional[int] = None,
+    ):
+        super().__init__((host, port), _Handler)
+        self.latency = latency or parse_latency("const:0.5")
+        self.model = model
+        self.error_rate = error_rate
+        self.load_seconds = load_seconds
+        self.parallel = max(parallel, 1)
+        self._slots = threading.BoundedSemaphore(self.parallel)
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._loaded = False
+        self.requests = 0
+        self.errors_injected = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.max_queued = 0
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def chat_url(self) -> str:
+        return f"{self.url}/api/chat"
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "server_requests": self.requests,
+                "server_errors_injected": self.errors_injected,
+                "server_max_in_flight": self.max_in_flight,
+                "server_max_queued": self.max_queued,
+            }
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.requests = self.errors_injected = self.max_in_flight = self.max_queued = 0
+
+    def handle_chat(self, payload: dict):
+        """Return (status, body) untuk satu permintaan /api/chat."""
+        messages = payload.get("messages") or []
+        images = [img for m in messages for img in (m.get("images") or [])]
+        if not payload.get("model") or not images:
+            return 400, {"error": "model dan minimal satu gambar wajib ada"}
+        try:
+            image_bytes = sum(len(base64.b64decode(img, validate=True)) for img in images)
+        except Exception:
+            return 400, {"error": "gambar bukan base64 yang valid"}
+
+        with self._lock:
+            self.requests += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            self.max_queued = max(self.max_queued, self.in_flight - self.parallel)
+            inject_error = self._rng.random() < self.error_rate
+        try:
+            queued_at = time.perf_counter()
+            with self._slots:
+                started = time.perf_counter()
+                load = 0.0
+                with self._lock:
+                    if not self._loaded:
+                        load, self._loaded = self.load_seconds, True
+                latency = self.latency()
+                time.sleep(load + latency)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+        if inject_error:
+            with self._lock:
+                self.errors_injected += 1
+            return 500, {"error": "stub: injected failure"}
+
+        prompt = " ".join(m.get("content", "") for m in messages)
+        tag = _TAG_PATTERN.search(prompt)
+        content = (
+            f"{'[' + tag.group(1) + '] ' if tag else ''}A corridor with a door on the left. "
+            "A chair is in front of you. Be careful."
+        )
+        eval_count = len(content.split()) + 8
+        prompt_eval_share = 0.6 * latency
+        return 200, {
+            "model": payload["model"],
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "message": {"role": "assistant", "content": content},
+            "done": True,
+            "total_duration": int((time.perf_counter() - queued_at) * 1e9),
+            "load_duration": int(load * 1e9),
+            "prompt_eval_count": 40 + image_bytes // 2048,
+            "prompt_eval_duration": int(prompt_eval_share * 1e9),
+            "eval_count": eval_count,
+            "eval_duration": int((latency - prompt_eval_share) * 1e9),
+            "stub_queue_seconds": started - queued_at,
+        }
+
+    def start(self) -> "StubOllamaServer":
+        self._thread = threading.Thread(target=self.serve_forever, name="stub-ollama", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Server tiruan Ollama untuk uji beban.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--latency", default="lognormal:1.0,0.35",
+                        help=f"Distribusi latensi inferensi ({', '.join(DISTRIBUTIONS)}).")
+    parser.add_argument("--parallel", type=int, default=1, help="Slot inferensi paralel (OLLAMA_NUM_PARALLEL).")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraksi permintaan yang dijawab HTTP 500.")
+    parser.add_argument("--load-seconds", type=float, default=0.0, help="Tambahan waktu load model di permintaan pertama.")
+    parser.add_argument("--seed", type=int, default=None)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    try:
+        latency = parse_latency(args.latency, seed=args.seed)
+    except ValueError as exc:
+        print(f"[ERROR] {exc}")
+        raise SystemExit(1)
+    server = StubOllamaServer(args.host, args.port, latency=latency, parallel=args.parallel,
+                              error_rate=args.error_rate, load_seconds=args.load_seconds, seed=args.seed)
+    print(f"[INFO] Stub Ollama berjalan di {server.url} (latensi {args.latency}, paralel {args.parallel})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"[INFO] {server.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# modul pipeline ada di root repo (bukan paket), sama seperti skrip testing-pipeline/
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
@@ -0,0 +1,36 @@
+from cameraDiscovery import choose_profile
+
+DEVICE = {
+    "index": 0,
+    "backend": "V4L2",
+    "default_mode": {"width": 640, "height": 480, "fps": 30.0},
+    "modes": [
+        {"width": 640, "height": 480, "fps": 30.0},
+        {"width": 1280, "height": 720, "fps": 10.0},
+        {"width": 1920, "height": 1080, "fps": 5.0},
+    ],
+}
+
+
+def test_unconfigured_keeps_driver_default():
+    profile = choose_profile([DEVICE], width=0, height=0)
+    assert (profile["width"], profile["height"]) == (640, 480)
+    assert profile["mode_source"] == "driver_default"
+
+
+def test_configured_mode_is_used_when_supported():
+    profile = choose_profile([DEVICE], width=1280, height=720)
+    assert (profile["width"], profile["height"], profile["fps"]) == (1280, 720, 10.0)
+    assert profile["mode_source"] == "configured"
+
+
+def test_unsupported_configured_mode_falls_back_to_default():
+    profile = choose_profile([DEVICE], width=800, height=600)
+    assert (profile["width"], profile["height"]) == (640, 480)
+
+
+def test_missing_default_mode_uses_fallback_resolution():
+    device = dict(DEVICE, default_mode=None)
+    profile = choose_profile([device], width=0, height=0)
+    assert (profile["width"], profile["height"]) == (640, 480)
+    assert profile["mode_source"] == "fallback"
@@ -0,0 +1,185 @@
+import os
+import time
+
+import pytest
+
+import artifactStore
+import deadlinePolicy
+from deadlinePolicy import (
+    MIN_ATTEMPT_SEC,
+    STAGE_TRANSLATION,
+    STAGE_TTS,
+    STAGE_VISION,
+    DeadlineTracker,
+    vision_with_fallbacks,
+)
+
+DEFAULT_BUDGETS = {STAGE_VISION: 45.0, STAGE_TRANSLATION: 8.0, STAGE_TTS: 10.0}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return time.time()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(deadlinePolicy, "time", fake)
+    return fake
+
+
+def _tracker(**kwargs):
+    return DeadlineTracker(deadline_sec=60.0, budgets=DEFAULT_BUDGETS, **kwargs)
+
+
+def test_vision_budget_keeps_time_for_fallbacks(clock):
+    tracker = _tracker(vision_reserve=deadlinePolicy.fallback_reserve(["short_prompt", "fast_model", "cached"]))
+    # 60 - (8 + 10) cadangan tahap berikut - (2 + 8) cadangan fallback
+    assert tracker.budget(STAGE_VISION) == pytest.approx(32.0)
+    assert tracker.budget(STAGE_TRANSLATION) == pytest.approx(8.0)
+
+
+def test_vision_budget_without_http_fallbacks(clock):
+    tracker = _tracker(vision_reserve=deadlinePolicy.fallback_reserve(["cached"]))
+    assert tracker.budget(STAGE_VISION) == pytest.approx(42.0)
+
+
+def test_budget_shrinks_with_elapsed_time_and_never_negative(clock):
+    tracker = _tracker(vision_reserve=10.0)
+    clock.now += 20.0
+    assert tracker.budget(STAGE_VISION) == pytest.approx(12.0)
+    assert tracker.budget(STAGE_TRANSLATION) == pytest.approx(8.0)
+    clock.now += 60.0
+    assert tracker.budget(STAGE_VISION) == 0.0
+    assert tracker.budget(STAGE_TRANSLATION) == 0.0
+
+
+def test_budget_disabled():
+    assert DeadlineTracker(deadline_sec=0).budget(STAGE_VISION) is None
+
+
+def test_default_tracker_reserves_fallback_time(clock):
+    tracker = DeadlineTracker(deadline_sec=60.0, budgets=DEFAULT_BUDGETS)
+    assert tracker.vision_reserve == deadlinePolicy.fallback_reserve()
+
+
+def test_default_vision_budget_covers_typical_call(clock, monkeypatch):
+    monkeypatch.setattr(deadlinePolicy, "STAGE_BUDGETS", DEFAULT_BUDGETS)
+    assert deadlinePolicy.default_deadline() == pytest.approx(75.0)
+    tracker = DeadlineTracker(deadline_sec=deadlinePolicy.default_deadline(), budgets=DEFAULT_BUDGETS)
+    clock.now += deadlinePolicy.CAPTURE_ALLOWANCE_SEC
+    assert tracker.budget(STAGE_VISION) >= deadlinePolicy.TYPICAL_VISION_SEC
+
+
+def test_unknown_fallback_is_rejected_before_recording(clock):
+    tracker = _tracker()
+    with pytest.raises(ValueError):
+        tracker.fallback("bogus")
+    assert tracker.fallbacks == []
+    tracker.fallback("english")
+    assert tracker.fallbacks == ["english"]
+
+
+def test_unknown_vision_fallback_is_skipped(clock, monkeypatch):
+    calls = []
+    monkeypatch.setattr(deadlinePolicy, "generate_text_from_image_path", _fake_vision(clock, calls, None))
+    monkeypatch.setattr(deadlinePolicy, "VISION_FALLBACKS", ["bogus", "cached"])
+    monkeypatch.setattr(deadlinePolicy, "cached_description", lambda: "old text")
+    tracker = _tracker(vision_reserve=0.0)
+
+    assert vision_with_fallbacks(tracker, "image.png") == ("old text", None)
+    assert tracker.fallbacks == ["cached"]
+
+
+def _fake_vision(clock, calls, succeed_on):
+    """Simulasi generate_text_from_image_path: tiap percobaan timeout kecuali `succeed_on`."""
+
+    def generate(image_path, return_timings=True, timeout=None, prompt=None, model=None, **kwargs):
+        name = "primary" if prompt is None else ("fast_model" if model is not None else "short_prompt")
+        calls.append((name, timeout))
+        if name == succeed_on:
+            clock.now += 1.0
+            return f"text from {name}", f"{name}.txt", {}
+        clock.now += timeout
+        return None, None, {}
+
+    return generate
+
+
+@pytest.mark.parametrize("succeed_on", ["short_prompt", None])
+def test_fallback_order_under_default_budgets(clock, monkeypatch, succeed_on):
+    calls = []
+    monkeypatch.setattr(deadlinePolicy, "generate_text_from_image_path", _fake_vision(clock, calls, succeed_on))
+    monkeypatch.setattr(deadlinePolicy, "VISION_FALLBACKS", ["short_prompt", "fast_model", "cached"])
+    monkeypatch.setattr(deadlinePolicy, "cached_description", lambda: "old text")
+    tracker = DeadlineTracker(
+        deadline_sec=deadlinePolicy.default_deadline(),
+        budgets=DEFAULT_BUDGETS,
+        vision_reserve=deadlinePolicy.fallback_reserve(["short_prompt", "fast_model", "cached"]),
+    )
+    clock.now += deadlinePolicy.CAPTURE_ALLOWANCE_SEC  # capture sudah berjalan
+
+    text, txt_path = vision_with_fallbacks(tracker, "image.png")
+
+    assert calls[0] == ("primary", pytest.approx(45.0))
+    assert calls[1][0] == "short_prompt"
+    assert calls[1][1] >= MIN_ATTEMPT_SEC
+    assert tracker.misses == [STAGE_VISION]
+    if succeed_on:
+        assert (text, txt_path) == ("text from short_prompt", "short_prompt.txt")
+        assert tracker.fallbacks == ["short_prompt"]
+    else:
+        # short_prompt memakai seluruh sisa waktu, fast_model tidak sempat, cached terakhir
+        assert [name for name, _ in calls] == ["primary", "short_prompt"]
+        assert (text, txt_path) == ("old text", None)
+        assert tracker.fallbacks == ["short_prompt", "cached"]
+        assert tracker.previous_view
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(artifactStore, "DB_PATH", str(tmp_path / "artifacts.sqlite3"))
+    monkeypatch.setattr(deadlinePolicy, "_last_description", None)
+    yield artifactStore.get_store()
+    artifactStore.get_store().close()
+
+
+def _write_text(store, folder, run_id, text, age=0.0):
+    os.makedirs(folder, exist_ok=True)
+    path = os.path.join(folder, f"output_{run_id}.txt")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    store.record(run_id, artifactStore.KIND_TEXT_EN, path)
+    if age:
+        store._execute("UPDATE artifacts SET created_at = created_at - ? WHERE run_id = ?", (age, run_id))
+    return path
+
+
+def test_cached_description_only_recent_live_runs(store, tmp_path, monkeypatch):
+    live_dir = str(tmp_path / "outputs-EN")
+    monkeypatch.setattr(deadlinePolicy, "OUTPUT_DIR_EN", live_dir)
+    assert deadlinePolicy.cached_description() is None
+
+    _write_text(store, live_dir, "run_live", "A door ahead.")
+    _write_text(store, live_dir, "run_live_hazard", "Stairs.")
+    _write_text(store, str(tmp_path / "outputs-EN-test"), "run_batch", "Batch output.")
+    assert deadlinePolicy.cached_description() == "A door ahead."
+
+    _write_text(store, live_dir, "run_old", "Yesterday.", age=3600)
+    assert deadlinePolicy.cached_description() == "A door ahead."
+    assert deadlinePolicy.cached_description(max_age=0.0) is None
+
+
+def test_cached_description_prefers_recent_in_process_text(store, monkeypatch, tmp_path):
+    monkeypatch.setattr(deadlinePolicy, "OUTPUT_DIR_EN", str(tmp_path / "outputs-EN"))
+    deadlinePolicy.remember_description("Just now.")
+    assert deadlinePolicy.cached_description() == "Just now."
+    monkeypatch.setattr(deadlinePolicy, "_last_description", ("Long ago.", time.time() - 3600))
+    assert deadlinePolicy.cached_description() is None
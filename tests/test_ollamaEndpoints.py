@@ -0,0 +1,62 @@
+import pytest
+
+requests = pytest.importorskip("requests")
+
+import ollamaEndpoints
+from ollamaEndpoints import EndpointPool
+
+PAYLOAD = {"model": "qwen2.5vl:3b"}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def perf_counter(self):
+        return self.now
+
+
+def make_pool(monkeypatch, clock, responses):
+    """responses: satu (detik berlalu, exception) per percobaan; timeout tiap percobaan dicatat."""
+    timeouts = []
+
+    def fake_post(url, json=None, timeout=None):
+        elapsed, error = responses[len(timeouts)]
+        timeouts.append(timeout)
+        clock.now += elapsed
+        raise error
+
+    monkeypatch.setattr(ollamaEndpoints, "time", clock)
+    monkeypatch.setattr(requests, "post", fake_post)
+    pool = EndpointPool([("http://a:11434", 1.0), ("http://b:11434", 1.0), ("http://c:11434", 1.0)],
+                        health_interval=0)
+    return pool, timeouts
+
+
+def test_retry_gets_only_the_remaining_timeout(monkeypatch):
+    clock = FakeClock()
+    pool, timeouts = make_pool(monkeypatch, clock, [
+        (4.0, requests.ConnectionError("refused")),
+        (3.0, requests.ConnectionError("refused")),
+        (1.0, requests.ConnectionError("refused")),
+    ])
+    assert pool.post_chat(PAYLOAD, timeout=10.0) is None
+    assert timeouts == [10.0, 6.0, 3.0]
+
+
+def test_retry_is_skipped_when_too_little_time_is_left(monkeypatch):
+    clock = FakeClock()
+    pool, timeouts = make_pool(monkeypatch, clock, [(9.0, requests.ConnectionError("refused"))])
+    assert pool.post_chat(PAYLOAD, timeout=10.0) is None
+    assert timeouts == [10.0]
+
+
+def test_timeout_without_limit_does_not_crash(monkeypatch, capsys):
+    clock = FakeClock()
+    pool, timeouts = make_pool(monkeypatch, clock, [(1.0, requests.ConnectTimeout("connect"))])
+    assert pool.post_chat(PAYLOAD, timeout=None) is None
+    assert timeouts == [None]
+    assert "tidak merespons" in capsys.readouterr().out
@@ -0,0 +1,36 @@
+import asyncio
+
+from pipelineOrchestrator import PipelineOrchestrator
+
+
+class _BackToBackSource:
+    """Dua tekanan tombol yang sudah mengantre saat source dibaca."""
+
+    def __init__(self):
+        self.busy_seen = []
+
+    async def jobs(self, orchestrator):
+        for _ in range(2):
+            self.busy_seen.append(orchestrator.busy)
+            if not orchestrator.busy:
+                yield orchestrator.new_job()
+
+
+def test_job_counts_as_busy_once_yielded(monkeypatch):
+    orchestrator = PipelineOrchestrator(with_tts=False, label=None, trace_per_job=False)
+
+    async def _fake_process(job):
+        orchestrator._in_flight += 1
+        await asyncio.sleep(0)
+        orchestrator._in_flight -= 1
+        return job
+
+    monkeypatch.setattr(orchestrator, "process", _fake_process)
+    source = _BackToBackSource()
+    try:
+        asyncio.run(orchestrator.run(source))
+    finally:
+        orchestrator.close()
+
+    assert source.busy_seen == [False, True]
+    assert not orchestrator.busy
@@ -0,0 +1,29 @@
+import asyncio
+import threading
+
+from pipelineOrchestrator import PipelineJob, Stage
+
+
+def test_abandoned_call_keeps_timeout_duration_and_next_job_logs_queue_wait():
+    stage = Stage("translation")
+    release = threading.Event()
+    first, second = PipelineJob(job_id=1), PipelineJob(job_id=2)
+
+    async def scenario():
+        try:
+            await asyncio.wait_for(stage.run(first, release.wait, 5), timeout=0.05)
+        except asyncio.TimeoutError:
+            stage.abandon(first, "translation")
+            first.stage_durations["translation"] = 0.05
+        queued = asyncio.ensure_future(stage.run(second, lambda: "ok"))
+        await asyncio.sleep(0.1)
+        release.set()
+        return await queued
+
+    try:
+        assert asyncio.run(scenario()) == "ok"
+    finally:
+        stage.shutdown()
+    assert first.stage_durations["translation"] == 0.05
+    assert second.extra["translation_queued_behind_abandoned_seconds"] >= 0.1
+    assert "translation" in second.stage_durations
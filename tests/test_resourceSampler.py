@@ -0,0 +1,18 @@
+import itertools
+
+import resourceSampler
+from resourceSampler import ResourceSampler
+
+
+def test_first_cpu_delta_after_idle_is_discarded(monkeypatch):
+    # tiap pembacaan: idle tetap, total +100 jiffy -> CPU 100% selama run
+    totals = itertools.count(1100, 100)
+    monkeypatch.setattr(resourceSampler, "_read_cpu_times", lambda: (1000, next(totals)))
+    sampler = ResourceSampler(hz=0.001)
+    sampler._prev_cpu = (0, 0)  # sisa run sebelum jeda idle panjang
+
+    token = sampler.begin()
+    sampler._sample()
+    summary = sampler.end(token)
+    assert summary["cpu_percent_min"] == 100.0
+    assert summary["cpu_percent_max"] == 100.0
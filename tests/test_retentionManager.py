@@ -0,0 +1,67 @@
+import retentionManager
+from retentionManager import RetentionManager
+
+
+def test_waits_while_busy_and_returns_when_idle(monkeypatch):
+    monkeypatch.setattr(retentionManager, "BUSY_POLL_SEC", 0.001)
+    checks = iter([True, True, False])
+    manager = RetentionManager(policies=[], busy_check=lambda: next(checks))
+    assert manager._wait_until_idle()
+
+
+def test_keeps_waiting_while_busy(monkeypatch):
+    import threading
+
+    monkeypatch.setattr(retentionManager, "BUSY_POLL_SEC", 0.001)
+    manager = RetentionManager(policies=[], busy_check=lambda: True)
+    result = []
+    waiter = threading.Thread(target=lambda: result.append(manager._wait_until_idle()))
+    waiter.start()
+    waiter.join(timeout=0.2)
+    assert waiter.is_alive()  # masih menunggu, tidak pernah jalan paksa
+    manager._stop.set()
+    waiter.join(timeout=1.0)
+    assert result == [False]
+
+
+def test_stop_interrupts_wait():
+    manager = RetentionManager(policies=[], busy_check=lambda: True)
+    manager._stop.set()
+    assert not manager._wait_until_idle()
+
+
+def test_eviction_keeps_evaluation_results(tmp_path, monkeypatch):
+    import os
+    import time
+
+    import artifactStore
+    from retentionManager import RetentionPolicy
+
+    monkeypatch.setattr(artifactStore, "DB_PATH", str(tmp_path / "artifacts.sqlite3"))
+
+    old = time.time() - 200 * 86400
+    for name in ("output_1.txt", "batch_results_20251207_200724.csv", "video_track_walk_1.srt"):
+        path = tmp_path / name
+        path.write_text("x")
+        os.utime(path, (old, old))
+    policy = RetentionPolicy("outputs", str(tmp_path), max_bytes=None, max_age_days=90,
+                             keep=("batch_results_*", "video_track_*"))
+    summary = RetentionManager(policies=[policy]).run_once()
+    assert summary["evicted"] == 1
+    remaining = sorted(p.name for p in tmp_path.iterdir() if not p.name.startswith("artifacts.sqlite3"))
+    assert remaining == ["batch_results_20251207_200724.csv", "video_track_walk_1.srt"]
+
+
+def test_compacted_audio_is_no_longer_indexed_as_wav(tmp_path, monkeypatch):
+    import artifactStore
+    from artifactStore import KIND_AUDIO_COMPACT, KIND_WAV, get_store
+
+    monkeypatch.setattr(artifactStore, "DB_PATH", str(tmp_path / "artifacts.sqlite3"))
+    wav, ogg = tmp_path / "output_1.wav", tmp_path / "output_1.ogg"
+    wav.write_bytes(b"RIFF")
+    ogg.write_bytes(b"OggS")
+    get_store().record("run_1", KIND_WAV, str(wav))
+
+    RetentionManager(policies=[])._replace(str(wav), str(ogg), kind=KIND_AUDIO_COMPACT)
+    assert get_store().latest((KIND_WAV,), folder=str(tmp_path)) is None
+    assert get_store().latest((KIND_AUDIO_COMPACT,), folder=str(tmp_path)) == str(ogg)
@@ -0,0 +1,53 @@
+import csv
+import importlib.util
+import os
+
+import pytest
+
+import generateText
+import generateTTS
+import latencyLogger
+import spanTracer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_CSV = os.path.join(ROOT, "outputs", "batch_results_20251207_200724.csv")
+
+
+@pytest.fixture
+def batch(monkeypatch):
+    # modul batch mengarahkan folder output ke *-test saat diimpor; kembalikan setelah test
+    monkeypatch.setattr(generateText, "OUTPUT_DIR", generateText.OUTPUT_DIR)
+    monkeypatch.setattr(generateText, "OUTPUT_DIR_EN", generateText.OUTPUT_DIR_EN)
+    monkeypatch.setattr(generateTTS, "AUDIO_FOLDER", generateTTS.AUDIO_FOLDER)
+    monkeypatch.setattr(latencyLogger, "LATENCY_DIR", latencyLogger.LATENCY_DIR)
+    monkeypatch.setattr(spanTracer, "TRACE_DIR", spanTracer.TRACE_DIR)
+    path = os.path.join(ROOT, "testing-pipeline", "run_batch_testing_data.py")
+    spec = importlib.util.spec_from_file_location("run_batch_testing_data", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _copy_rows(source: str, target: str, rows: int) -> None:
+    with open(source, "r", encoding="utf-8", newline="") as f:
+        reader = csv.DictReader(f)
+        selected = [row for _, row in zip(range(rows), reader)]
+        fields = reader.fieldnames
+    with open(target, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(selected)
+
+
+def test_windows_txt_path_from_committed_results_loads_en_text(batch, tmp_path):
+    csv_path = tmp_path / "batch_results.csv"
+    _copy_rows(RESULTS_CSV, str(csv_path), rows=1)
+    items = batch.load_from_results(csv_path)
+    assert items[0]["txt_path"].startswith("F:\\")
+    expected = (batch.TEST_OUTPUT_DIR_EN / "(1).txt").read_text(encoding="utf-8").strip()
+    assert items[0]["en_text"] == expected != ""
+
+
+def test_all_committed_results_find_their_en_text(batch):
+    items = batch.load_from_results(batch.Path(RESULTS_CSV))
+    assert items and all(item["en_text"] for item in items)
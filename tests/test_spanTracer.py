@@ -0,0 +1,31 @@
+import json
+import threading
+
+import spanTracer
+
+
+def test_flush_by_run_id_keeps_other_jobs_spans(monkeypatch, tmp_path):
+    monkeypatch.setattr(spanTracer, "ENABLED", True)
+    monkeypatch.setattr(spanTracer, "_events", [])
+
+    def worker(run_id):
+        spanTracer.bind_run(run_id)
+        with spanTracer.span("http_wait"):
+            pass
+        spanTracer.bind_run(None)
+
+    for run_id in ("run_a", "run_b"):
+        thread = threading.Thread(target=worker, args=(run_id,))
+        thread.start()
+        thread.join()
+    with spanTracer.span("vision_generate", run_id="run_a_hazard"):
+        pass
+    with spanTracer.span("ollama_health"):
+        pass
+
+    path = spanTracer.flush(path=str(tmp_path / "a.json"), run_id="run_a")
+    with open(path, encoding="utf-8") as f:
+        events = [e for e in json.load(f)["traceEvents"] if e["ph"] != "M"]
+    owners = sorted((e.get("args") or {}).get("run_id") or "-" for e in events)
+    assert owners == ["-", "run_a", "run_a_hazard"]
+    assert [spanTracer._run_id_of(e) for e in spanTracer._events] == ["run_b"]
@@ -0,0 +1,14 @@
+import stageProfiler
+
+
+def test_pop_results_takes_hazard_entries_and_leaves_unassigned(monkeypatch):
+    monkeypatch.setattr(stageProfiler, "_results", {})
+    run_id = "20251208_084846_123456_a1b2"
+    stageProfiler._store_result(run_id, {"stage": "run_ollama_with_image"})
+    stageProfiler._store_result(f"{run_id}_hazard", {"stage": "run_ollama_with_image"})
+    stageProfiler._store_result("20251208_084900_000000_c3d4", {"stage": "tts_from_text"})
+    stageProfiler._store_result(stageProfiler._UNASSIGNED, {"stage": "capture_image"})
+
+    assert len(stageProfiler.pop_results(run_id)) == 2
+    assert set(stageProfiler._results) == {stageProfiler._UNASSIGNED, "20251208_084900_000000_c3d4"}
+    assert stageProfiler.pop_results(None) == [{"stage": "capture_image"}]
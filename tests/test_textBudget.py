@@ -0,0 +1,99 @@
+import json
+import os
+
+import pytest
+
+import textBudget
+from textBudget import apply_budget, is_hazard, strip_boilerplate_clause
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "testing-pipeline")
+
+
+def _output_en(name: str) -> str:
+    with open(os.path.join(DATA_DIR, "outputs-EN-test", name), "r", encoding="utf-8") as f:
+        return f.read().strip()
+
+
+def _pred(key: str) -> str:
+    with open(os.path.join(DATA_DIR, "preds.json"), "r", encoding="utf-8") as f:
+        return json.load(f)[key][0]["prediction"]
+
+
+def test_budget_chars_off_by_default():
+    assert textBudget.BUDGET_CHARS == 0 or "TEXT_BUDGET_CHARS" in os.environ
+
+
+@pytest.mark.parametrize("sentence", [
+    "There is no immediate danger for visually impaired people, but they should be cautious "
+    "of the glass doors and the floor.",
+    "There are no immediate dangers for visually impaired people, but the wet surface could be slippery.",
+    "Tidak ada bahaya secara langsung untuk tunanetra, tetapi permukaan basah mungkin membuatnya licin.",
+    "Tidak ada bahaya secara langsung untuk tunanetra, tetapi puing-puing tersebar bisa menimbulkan bahaya tersandung.",
+])
+def test_no_danger_with_but_hazard_clause_is_hazard(sentence):
+    assert is_hazard(sentence)
+
+
+@pytest.mark.parametrize("sentence", [
+    "There is no danger for visually impaired people as the steps are well-marked and the handrail is visible.",
+    "There are no visible signs of danger or obstacles for visually impaired people.",
+    "Ada beberapa orang di latar belakang, tetapi mereka tidak terlihat jelas.",
+])
+def test_no_danger_without_hazard_clause(sentence):
+    assert not is_hazard(sentence)
+
+
+def test_safety_sentence_survives_cut_on_real_output():
+    # (1).txt: kalimat keselamatan ada di akhir dan dulu terbuang oleh batas 240 karakter
+    text = _output_en("(1).txt")
+    safety = "but they should be cautious of the glass doors and the floor."
+    assert safety in text
+    result = apply_budget(text, max_chars=240)
+    assert safety in result.text
+    assert result.dropped_budget
+
+
+def test_safety_sentence_survives_cut_on_real_prediction():
+    result = apply_budget(_pred("(1)"), max_chars=240)
+    assert "tetapi mereka harus berhati-hati dari pintu kaca dan lantai." in result.text
+    assert result.dropped_budget
+
+
+@pytest.mark.parametrize("sentence, expected", [
+    ("There is no immediate danger for visually impaired people, but they should be cautious "
+     "and follow safety guidelines.",
+     "There is no immediate danger for visually impaired people."),
+    ("Tidak ada bahaya secara langsung untuk tunanetra, tetapi mereka harus berhati-hati dan mengikuti "
+     "pedoman keselamatan.",
+     "Tidak ada bahaya secara langsung untuk tunanetra."),
+    ("Tidak ada bahaya secara langsung bagi orang-tunanetra, tetapi mereka mungkin perlu menggunakan "
+     "teknologi bantu atau meminta bantuan untuk menavigasi ruang.",
+     "Tidak ada bahaya secara langsung bagi orang-tunanetra."),
+])
+def test_boilerplate_clause_is_stripped(sentence, expected):
+    assert strip_boilerplate_clause(sentence) == expected
+
+
+def test_clause_with_object_is_kept():
+    sentence = ("Tidak ada bahaya secara langsung untuk tunanetra, tetapi mereka harus berhati-hati "
+                "dari tikar merah.")
+    assert strip_boilerplate_clause(sentence) == sentence
+
+
+def test_real_prediction_boilerplate_clause_dropped():
+    text = _pred("(27)")
+    result = apply_budget(text, max_chars=0)
+    assert "pedoman keselamatan" in text
+    assert "pedoman keselamatan" not in result.text
+    assert len(result.dropped_boilerplate) == 1
+    assert result.sentences_out == result.sentences_in
+
+
+def test_without_budget_hazard_sentences_are_kept_on_real_outputs():
+    for name in sorted(os.listdir(os.path.join(DATA_DIR, "outputs-EN-test"))):
+        text = _output_en(name)
+        result = apply_budget(text, max_chars=0)
+        assert not result.dropped_budget
+        for sentence in textBudget.split_sentences(text):
+            if is_hazard(sentence):
+                assert strip_boilerplate_clause(sentence) in result.text, name
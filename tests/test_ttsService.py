@@ -0,0 +1,24 @@
+import threading
+from concurrent.futures import TimeoutError
+
+import pytest
+
+import ttsService
+from ttsService import TTSService
+
+
+def test_timed_out_request_stays_pending_until_synthesis_finishes(monkeypatch):
+    monkeypatch.setattr(ttsService, "REQUEST_TIMEOUT", 0.05)
+    service = TTSService(voice=None, max_queue=1)
+    release = threading.Event()
+
+    with pytest.raises(TimeoutError):
+        service._submit(release.wait, 5)
+    # sintesis masih berjalan di worker: antrean tetap penuh
+    assert service.pending == 1
+    with pytest.raises(RuntimeError):
+        service._submit(lambda: None)
+
+    release.set()
+    service._executor.shutdown(wait=True)
+    assert service.pending == 0
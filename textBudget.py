@@ -0,0 +1,241 @@
+"""
+Anggaran panjang teks yang diucapkan: dijalankan di antara vision dan
+terjemahan supaya kalimat yang berulang tidak ikut diterjemahkan,
+disintesis dan didengar.
+
+Langkah (semuanya murah, tanpa model):
+1. pecah teks menjadi kalimat
+2. buang kalimat boilerplate (peringatan umum tanpa objek, pembuka "The image shows")
+   dan anak kalimat boilerplate di akhir kalimat, bentuk yang benar-benar
+   dikeluarkan model: "..., but they should be cautious and follow safety
+   guidelines." / "..., tetapi mereka harus berhati-hati." (tanpa objek)
+3. buang kalimat yang mirip kalimat sebelumnya (Jaccard token >= TEXT_DEDUP_THRESHOLD)
+4. kalimat bahaya (stairs, wet floor, tangga, licin, ...) dipindah ke depan;
+   "No danger ..., but ... glass doors" tetap kalimat bahaya karena anak
+   kalimat "but/tetapi" menyebut sesuatu yang harus diwaspadai
+5. potong ke anggaran karakter atau perkiraan durasi bicara
+
+Bekerja untuk teks EN (pipeline) maupun ID (evaluasi preds.json).
+
+Konfigurasi:
+    TEXT_BUDGET            : 0 untuk menonaktifkan (default 1)
+    TEXT_BUDGET_CHARS      : batas karakter (default 0 = tanpa batas; pemotongan
+                             bisa membuang kalimat bahaya, aktifkan hanya bila
+                             evaluate_text_budget.py tidak menunjukkan penurunan metrik)
+    TEXT_BUDGET_SECONDS    : batas perkiraan durasi bicara (default 0 = tanpa batas)
+    TEXT_CHARS_PER_SEC     : kecepatan bicara untuk perkiraan durasi (default 14)
+    TEXT_DEDUP_THRESHOLD   : ambang kemiripan Jaccard (default 0.6)
+
+Coba langsung:
+    python textBudget.py "There is a chair. A chair is visible. Watch out for the stairs."
+"""
+
+import os
+import re
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional, Set
+
+ENABLED = os.getenv("TEXT_BUDGET", "1") != "0"
+BUDGET_CHARS = int(os.getenv("TEXT_BUDGET_CHARS", "0"))
+BUDGET_SECONDS = float(os.getenv("TEXT_BUDGET_SECONDS", "0"))
+CHARS_PER_SEC = float(os.getenv("TEXT_CHARS_PER_SEC", "14"))
+DEDUP_THRESHOLD = float(os.getenv("TEXT_DEDUP_THRESHOLD", "0.6"))
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+")
+_WORD = re.compile(r"\w+", re.UNICODE)
+_STOPWORDS = {
+    # EN
+    "a", "an", "the", "is", "are", "was", "be", "there", "this", "that", "it", "its", "of",
+    "in", "on", "at", "to", "and", "or", "with", "for", "as", "by", "they", "some", "any",
+    # ID
+    "yang", "di", "ke", "dan", "ada", "ini", "itu", "dengan", "untuk", "dari", "pada",
+    "terlihat", "sebuah", "seorang", "beberapa", "juga", "adalah",
+}
+_HAZARD = re.compile(
+    r"\b(danger\w*|hazard\w*|careful\w*|caution\w*|cautious\w*|obstacle\w*|stair\w*|steps?|wet|"
+    r"slip\w*|trip\w*|risk\w*|hole\w*|pothole\w*|"
+    r"traffic|cars?|vehicles?|motorcycles?|edge|uneven|curb|pole\w*|glass door\w*|"
+    r"bahaya\w*|hati-hati|berhati-hati|hati hati|waspada\w*|basah|licin|tersandung|tergelincir|risiko|"
+    r"tangga|lubang|kendaraan|mobil|motor|tepi|tidak rata|rintangan|tiang|pintu kaca)\b",
+    re.IGNORECASE,
+)
+# anak kalimat pertentangan: "No danger, but ..." / "Tidak ada bahaya, tetapi ..."
+_CONTRAST = re.compile(r"(?:,\s*|\s+)\b(?:but|however|although|though|tetapi|namun|meskipun)\b", re.IGNORECASE)
+_NO_HAZARD = re.compile(
+    r"\b(no|not|without|tidak ada|tidak terlihat|tanpa)\b.{0,40}\b(danger|hazard|obstacle|bahaya|rintangan)",
+    re.IGNORECASE,
+)
+# Anak kalimat boilerplate di akhir kalimat (setelah "but/tetapi"): nasihat
+# umum tanpa objek. "..., but they should be cautious of the glass doors."
+# tidak cocok karena menyebut objek.
+_BOILERPLATE_CLAUSES = [
+    re.compile(p, re.IGNORECASE)
+    for p in (
+        r"(?:,\s*|\s+)(?:but|however,?|tetapi|namun,?) (?:they|you|mereka|anda) (?:should|must|need to|harus|perlu)"
+        r" (?:still |tetap )?(?:be careful|be cautious|stay alert|exercise caution|berhati-hati|waspada)"
+        r"(?: and follow (?:the )?safety guidelines| dan mengikuti pedoman keselamatan)?(?=[.!?]?$)",
+        r"(?:,\s*|\s+)(?:but|tetapi) (?:they|mereka) (?:may|might|mungkin) (?:need to |perlu )"
+        r"(?:use|menggunakan) (?:assistive technology|teknologi bantu)\b.*?(?=[.!?]?$)",
+    )
+]
+_BOILERPLATE = [
+    re.compile(p, re.IGNORECASE)
+    for p in (
+        # peringatan umum tanpa objek: "They should be careful." / "Mereka harus berhati-hati."
+        r"^(but |however,? |tetapi |namun,? )?(they|you|visually impaired (people|individuals)|mereka|anda|tunanetra)"
+        r" (should|must|need to|harus|perlu) (still )?(be careful|stay alert|exercise caution|tetap )?"
+        r"(berhati-hati|waspada)?\.?$",
+        r"^(overall|in summary|in conclusion|secara keseluruhan|kesimpulannya)\b.*",
+        r"^(the|this) (image|picture|photo) (shows|depicts)( a| an| the)? (scene|view)\.?$",
+    )
+]
+
+
+@dataclass
+class BudgetResult:
+    """Hasil anggaran teks beserta jumlah pekerjaan yang dihindari."""
+
+    text: str
+    original_chars: int
+    sentences_in: int
+    sentences_out: int
+    dropped_duplicate: List[str] = field(default_factory=list)
+    dropped_boilerplate: List[str] = field(default_factory=list)
+    dropped_budget: List[str] = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def chars_saved(self) -> int:
+        return self.original_chars - len(self.text)
+
+    def metrics(self) -> dict:
+        """Baris `extra` untuk laporan latensi."""
+        return {
+            "text_chars_in": self.original_chars,
+            "text_chars_out": len(self.text),
+            "text_chars_saved": self.chars_saved,
+            "text_sentences_in": self.sentences_in,
+            "text_sentences_out": self.sentences_out,
+            "text_speech_saved_seconds_est": self.chars_saved / CHARS_PER_SEC,
+            "text_budget_seconds": self.seconds,
+        }
+
+
+def split_sentences(text: str) -> List[str]:
+    return [s.strip() for s in _SENTENCE_SPLIT.split(text.strip()) if s.strip()]
+
+
+def _tokens(sentence: str) -> Set[str]:
+    return {w for w in _WORD.findall(sentence.lower()) if w not in _STOPWORDS}
+
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def is_hazard(sentence: str) -> bool:
+    """
+    True bila kalimat menyebut bahaya. Pernyataan "tidak ada bahaya" hanya
+    membatalkan bila tidak diikuti anak kalimat "but/tetapi" yang menyebut bahaya.
+    """
+    contrast = _CONTRAST.search(sentence)
+    if contrast and _HAZARD.search(sentence, contrast.end()):
+        return True
+    return bool(_HAZARD.search(sentence)) and not _NO_HAZARD.search(sentence)
+
+
+def strip_boilerplate_clause(sentence: str) -> str:
+    """Buang anak kalimat boilerplate di akhir kalimat; tanda baca akhir dipertahankan."""
+    for pattern in _BOILERPLATE_CLAUSES:
+        match = pattern.search(sentence)
+        if match:
+            end = sentence[match.end():].strip()
+            return sentence[:match.start()].rstrip(" ,") + (end or ".")
+    return sentence
+
+
+def is_boilerplate(sentence: str) -> bool:
+    return any(p.search(sentence) for p in _BOILERPLATE)
+
+
+def apply_budget(
+    text: str,
+    max_chars: int = BUDGET_CHARS,
+    max_seconds: float = BUDGET_SECONDS,
+    dedup_threshold: float = DEDUP_THRESHOLD,
+) -> BudgetResult:
+    """
+    Pangkas teks sesuai anggaran. Kalimat pertama yang tersisa selalu
+    dipertahankan walau melebihi anggaran.
+    """
+    t0 = time.perf_counter()
+    text = (text or "").strip()
+    sentences = split_sentences(text)
+    result = BudgetResult(text=text, original_chars=len(text), sentences_in=len(sentences),
+                          sentences_out=len(sentences))
+    if not ENABLED or not sentences:
+        result.seconds = time.perf_counter() - t0
+        return result
+
+    kept: List[str] = []
+    kept_tokens: List[Set[str]] = []
+    for sentence in sentences:
+        if is_boilerplate(sentence):
+            result.dropped_boilerplate.append(sentence)
+            continue
+        stripped = strip_boilerplate_clause(sentence)
+        if stripped != sentence:
+            result.dropped_boilerplate.append(sentence[len(stripped) - 1:].strip(" ,"))
+            sentence = stripped
+        tokens = _tokens(sentence)
+        if any(jaccard(tokens, other) >= dedup_threshold for other in kept_tokens):
+            result.dropped_duplicate.append(sentence)
+            continue
+        kept.append(sentence)
+        kept_tokens.append(tokens)
+
+    # bahaya dulu, urutan relatif lainnya tetap
+    ordered = [s for s in kept if is_hazard(s)] + [s for s in kept if not is_hazard(s)]
+
+    limit = max_chars if max_chars > 0 else None
+    if max_seconds > 0:
+        seconds_limit = int(max_seconds * CHARS_PER_SEC)
+        limit = seconds_limit if limit is None else min(limit, seconds_limit)
+
+    selected: List[str] = []
+    length = 0
+    for sentence in ordered:
+        extra = len(sentence) + (1 if selected else 0)
+        if selected and limit is not None and length + extra > limit:
+            result.dropped_budget.append(sentence)
+            continue
+        selected.append(sentence)
+        length += extra
+
+    result.text = " ".join(selected)
+    result.sentences_out = len(selected)
+    result.seconds = time.perf_counter() - t0
+    return result
+
+
+def main(argv: Optional[list] = None):
+    args = argv if argv is not None else sys.argv[1:]
+    if not args:
+        print('Pemakaian: python textBudget.py "teks deskripsi"')
+        return
+    result = apply_budget(" ".join(args))
+    print(result.text)
+    for key, value in result.metrics().items():
+        print(f"{key}={value:.3f}" if isinstance(value, float) else f"{key}={value}")
+    for label, items in (("duplikat", result.dropped_duplicate), ("boilerplate", result.dropped_boilerplate),
+                         ("anggaran", result.dropped_budget)):
+        for sentence in items:
+            print(f"[dibuang:{label}] {sentence}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,14 @@
 import os
 import re
+import threading
 from typing import Optional, Tuple
 
-try:
-    from argostranslate import translate as argos_translate
-except ImportError as exc:  # pragma: no cover - dependency hint
-    argos_translate = None
-    _IMPORT_ERROR = exc
-else:
-    _IMPORT_ERROR = None
+from spanTracer import span
+from stageProfiler import profiled
+
+# argostranslate (beserta torch/ctranslate2) baru diimport saat terjemahan pertama
+argos_translate = None
+_IMPORT_ERROR = None
 
 
 SRC_LANG_CODE = os.getenv("ARGOS_SRC_LANG", "en")
@@ -16,6 +16,13 @@ TGT_LANG_CODE = os.getenv("ARGOS_TGT_LANG", "id")
 
 _translation_cache = None
 _warned_unavailable = False
+# Fungsi ini bisa dipanggil dari beberapa thread sekaligus (executor
+# orkestrator, fase bahaya, load test). _state_lock menjaga load pasangan
+# bahasa dan peringatan agar hanya terjadi sekali; _translate_lock
+# menyerialkan pemanggilan Argos (pemecah kalimat di dalamnya tidak dijamin
+# thread-safe).
+_state_lock = threading.Lock()
+_translate_lock = threading.Lock()
 _REPLACEMENT_PATTERNS = [
     (re.compile(r"\borang (cacat visual|cacat penglihatan)\b", re.IGNORECASE), "tunanetra"),
     (re.compile(r"\bspaced\b", re.IGNORECASE), "berjarak"),
@@ -39,21 +46,45 @@ _REPLACEMENT_PATTERNS = [
     (re.compile(r"\blantainya miring\b", re.IGNORECASE), "lantainya keramik"),
 ]
 
+def _import_argos():
+    """Import argostranslate sekali; return modul translate atau None bila tidak terpasang."""
+    global argos_translate, _IMPORT_ERROR
+
+    if argos_translate is None and _IMPORT_ERROR is None:
+        try:
+            from argostranslate import translate as module
+        except ImportError as exc:  # pragma: no cover - dependency hint
+            _IMPORT_ERROR = exc
+        else:
+            argos_translate = module
+    return argos_translate
+
+
 def _get_translation() -> Optional[object]:
     """
     Lazy-load dan cache pasangan bahasa Argos Translate.
     Return objek Translation atau None jika tidak tersedia.
     """
+    if _translation_cache is not None:
+        return _translation_cache
+    with _state_lock:
+        return _load_translation()
+
+
+def _load_translation() -> Optional[object]:
+    """Isi _translation_cache; dipanggil dengan _state_lock dipegang."""
     global _translation_cache
 
     if _translation_cache is not None:
         return _translation_cache
 
-    if argos_translate is None:
-        return None
+    with span("argos_import"):
+        if _import_argos() is None:
+            return None
 
     try:
-        installed_languages = argos_translate.get_installed_languages()
+        with span("argos_load_languages"):
+            installed_languages = argos_translate.get_installed_languages()
     except Exception:
         return None
 
@@ -71,6 +102,26 @@ def _get_translation() -> Optional[object]:
     return translation
 
 
+def warm_up() -> bool:
+    """
+    Import argostranslate, load pasangan bahasa dan jalankan satu terjemahan
+    pendek (model CTranslate2 baru dimuat saat translate pertama) supaya
+    panggilan pertama pipeline tidak menanggung cold load.
+    Return True bila pasangan bahasa siap.
+    """
+    translation = _get_translation()
+    if translation is None:
+        return False
+    try:
+        with _translate_lock, span("argos_warm_up"):
+            translation.translate("Hello.")
+    except Exception as exc:
+        print(f"[WARN] Pemanasan Argos Translate gagal: {exc}")
+        return False
+    return True
+
+
+@profiled("translate_text_to_indonesian")
 def translate_text_to_indonesian(text: str, fallback_original: bool = True) -> Tuple[str, bool]:
     """
     Terjemahkan teks bahasa Inggris ke bahasa Indonesia.
@@ -85,7 +136,9 @@ def translate_text_to_indonesian(text: str, fallback_original: bool = True) -> T
 
     translation = _get_translation()
     if translation is None:
-        if not _warned_unavailable:
+        with _state_lock:
+            warn, _warned_unavailable = not _warned_unavailable, True
+        if warn:
             if _IMPORT_ERROR:
                 print("[WARN] argostranslate belum terpasang. Install dengan `pip install argostranslate`.")
             else:
@@ -94,13 +147,13 @@ def translate_text_to_indonesian(text: str, fallback_original: bool = True) -> T
                     "       Instal paketnya dengan `argos-translate --from-lang en --to-lang id download` "
                     "dan `install`, kemudian jalankan ulang."
                 )
-            _warned_unavailable = True
         if fallback_original:
             return text, False
         raise RuntimeError("Argos Translate pair en->id tidak tersedia.")
 
     try:
-        translated = translation.translate(text).strip()
+        with _translate_lock, span("argos_translate", chars=len(text)):
+            translated = translation.translate(text).strip()
     except Exception as exc:
         print(f"[ERROR] Gagal menerjemahkan dengan Argos Translate: {exc}")
         if fallback_original:
@@ -110,7 +163,8 @@ def translate_text_to_indonesian(text: str, fallback_original: bool = True) -> T
     if not translated:
         return text if fallback_original else "", False
 
-    fixed_text = _apply_post_translation_fixes(translated)
+    with span("post_translation_fixes"):
+        fixed_text = _apply_post_translation_fixes(translated)
     return fixed_text, True
 
 
@@ -143,7 +197,7 @@ def persist_translated_text(txt_path: Optional[str], translated_text: str) -> bo
         return False
 
     try:
-        with open(txt_path, "w", encoding="utf-8") as f:
+        with span("text_write", lang="id"), open(txt_path, "w", encoding="utf-8") as f:
             f.write(translated_text)
     except Exception as exc:
         print(f"[WARN] Gagal menulis ulang file output: {exc}")
@@ -0,0 +1,355 @@
+"""
+Daemon TTS residen: model Piper dimuat sekali lalu dipakai bersama oleh
+semua entry point (main.py, generateTTS.py, runner di testing-pipeline/)
+melalui Unix socket.
+
+Jalankan di terminal terpisah:
+
+    python ttsService.py
+    python ttsService.py --socket /tmp/piper-tts.sock --max-queue 16
+
+Protokol (satu koneksi = satu permintaan):
+- klien mengirim satu baris JSON, misalnya
+  {"text": "...", "mode": "pcm"} atau {"text": "...", "mode": "wav", "audio_folder": "audios"}
+  (opsional "length_scale": kecepatan bicara, lihat PIPER_LENGTH_SCALE)
+- server membalas satu baris JSON header.
+  mode "pcm": {"ok": true, "sample_rate": .., "sample_width": .., "channels": .., "nbytes": N}
+              diikuti N byte PCM mentah (di-stream per potongan).
+  mode "wav": {"ok": true, "wav_path": "..."}
+  gagal     : {"ok": false, "error": "..."}
+- {"op": "ping"} dibalas {"ok": true, "pending": n} untuk cek status.
+
+Permintaan bersamaan diantrekan ke satu worker sintesis (model Piper
+tidak dipakai paralel), dengan batas antrean `--max-queue`.
+"""
+
+import argparse
+import io
+import json
+import os
+import socket
+import socketserver
+import threading
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, Optional, Tuple
+
+SOCKET_PATH = os.getenv("PIPER_TTS_SOCKET", "/tmp/piper-tts.sock")
+USE_SERVICE = os.getenv("PIPER_TTS_SERVICE", "1") != "0"
+CONNECT_TIMEOUT = 0.2      # detik, cek cepat apakah daemon hidup
+REQUEST_TIMEOUT = 120.0    # detik, batas tunggu satu sintesis (termasuk antre)
+CHUNK_SIZE = 64 * 1024
+MAX_QUEUE = 16
+
+
+# === SISI SERVER ===
+
+class TTSService:
+    """
+    Menyimpan PiperVoice yang sudah diload dan mengantrekan permintaan
+    sintesis ke satu thread worker.
+    """
+
+    def __init__(self, voice, max_queue: int = MAX_QUEUE):
+        self.voice = voice
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="piper-tts")
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        with self._lock:
+            return self._pending
+
+    def _submit(self, func, *args):
+        with self._lock:
+            if self._pending >= self.max_queue:
+                raise RuntimeError(f"antrean TTS penuh ({self.max_queue})")
+            self._pending += 1
+        try:
+            future = self._executor.submit(func, *args)
+        except Exception:
+            self._done(None)
+            raise
+        # dikurangi saat pekerjaan benar-benar selesai, bukan saat klien berhenti menunggu
+        future.add_done_callback(self._done)
+        return future.result(timeout=REQUEST_TIMEOUT)
+
+    def _done(self, _future) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    def _synthesize_pcm(self, text: str, length_scale: Optional[float] = None) -> Tuple[dict, bytes]:
+        from generateTTS import synthesis_config
+
+        syn_config = synthesis_config(length_scale) if length_scale else None
+        buf = io.BytesIO()
+        with wave.open(buf, "wb") as wav_file:
+            if syn_config is None:
+                self.voice.synthesize_wav(text, wav_file)
+            else:
+                self.voice.synthesize_wav(text, wav_file, syn_config=syn_config)
+        buf.seek(0)
+        with wave.open(buf, "rb") as wav_in:
+            params = {
+                "sample_rate": wav_in.getframerate(),
+                "sample_width": wav_in.getsampwidth(),
+                "channels": wav_in.getnchannels(),
+            }
+            frames = wav_in.readframes(wav_in.getnframes())
+        return params, frames
+
+    def _synthesize_wav(self, text: str, audio_folder: Optional[str]) -> Optional[str]:
+        from generateTTS import AUDIO_FOLDER, tts_from_text
+
+        wav_path = tts_from_text(text, voice=self.voice, audio_folder=audio_folder or AUDIO_FOLDER)
+        return os.path.abspath(wav_path) if wav_path else None
+
+    def synthesize_pcm(self, text: str, length_scale: Optional[float] = None) -> Tuple[dict, bytes]:
+        return self._submit(self._synthesize_pcm, text, length_scale)
+
+    def synthesize_wav(self, text: str, audio_folder: Optional[str] = None) -> Optional[str]:
+        return self._submit(self._synthesize_wav, text, audio_folder)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+
+class _TTSRequestHandler(socketserver.StreamRequestHandler):
+    def _reply(self, header: dict):
+        self.wfile.write((json.dumps(header) + "\n").encode("utf-8"))
+
+    def handle(self):
+        service: TTSService = self.server.service  # type: ignore[attr-defined]
+        try:
+            request = json.loads(self.rfile.readline().decode("utf-8") or "{}")
+        except ValueError as exc:
+            self._reply({"ok": False, "error": f"request bukan JSON: {exc}"})
+            return
+
+        if request.get("op") == "ping":
+            self._reply({"ok": True, "pending": service.pending})
+            return
+
+        text = (request.get("text") or "").strip()
+        if not text:
+            self._reply({"ok": False, "error": "teks kosong"})
+            return
+
+        mode = request.get("mode", "pcm")
+        try:
+            if mode == "wav":
+                wav_path = service.synthesize_wav(text, request.get("audio_folder"))
+                if not wav_path:
+                    self._reply({"ok": False, "error": "gagal membuat file audio"})
+                    return
+                self._reply({"ok": True, "wav_path": wav_path})
+                return
+
+            params, frames = service.synthesize_pcm(text, request.get("length_scale"))
+        except Exception as exc:
+            self._reply({"ok": False, "error": str(exc)})
+            return
+
+        header = dict(params, ok=True, nbytes=len(frames))
+        self._reply(header)
+        view = memoryview(frames)
+        for offset in range(0, len(frames), CHUNK_SIZE):
+            self.wfile.write(view[offset:offset + CHUNK_SIZE])
+
+
+def serve(socket_path: str = SOCKET_PATH, max_queue: int = MAX_QUEUE):
+    """
+    Load model Piper sekali, lalu layani permintaan sampai Ctrl+C.
+    """
+    from generateTTS import load_voice
+
+    if not hasattr(socketserver, "ThreadingUnixStreamServer"):
+        print("[ERROR] Unix socket tidak didukung di platform ini.")
+        return
+
+    voice = load_voice(use_service=False)
+    service = TTSService(voice, max_queue=max_queue)
+
+    if os.path.exists(socket_path):
+        if is_service_available(socket_path):
+            print(f"[ERROR] Daemon TTS lain sudah aktif di {socket_path}.")
+            return
+        os.remove(socket_path)  # sisa socket dari proses yang mati
+
+    server = socketserver.ThreadingUnixStreamServer(socket_path, _TTSRequestHandler)
+    server.daemon_threads = True
+    server.service = service  # type: ignore[attr-defined]
+
+    print(f"[INFO] Daemon TTS siap di {socket_path} (antrean maks {max_queue}).")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n[INFO] Daemon TTS dihentikan oleh pengguna.")
+    finally:
+        server.server_close()
+        service.shutdown()
+        try:
+            os.remove(socket_path)
+        except OSError:
+            pass
+
+
+# === SISI KLIEN ===
+
+def _connect(socket_path: str, timeout: float) -> socket.socket:
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(socket_path)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+def _send_request(sock: socket.socket, request: dict):
+    """
+    Kirim satu request JSON dan baca header balasan.
+    Return (header, reader) di mana reader dipakai untuk membaca payload PCM.
+    """
+    sock.sendall((json.dumps(request) + "\n").encode("utf-8"))
+    reader = sock.makefile("rb")
+    header = json.loads(reader.readline().decode("utf-8") or "{}")
+    if not header.get("ok"):
+        reader.close()
+        raise RuntimeError(header.get("error") or "respons daemon TTS tidak valid")
+    return header, reader
+
+
+def is_service_available(socket_path: str = SOCKET_PATH) -> bool:
+    """
+    Cek cepat apakah daemon TTS aktif dan merespons ping.
+    """
+    if not hasattr(socket, "AF_UNIX") or not os.path.exists(socket_path):
+        return False
+    try:
+        sock = _connect(socket_path, CONNECT_TIMEOUT)
+    except OSError:
+        return False
+    try:
+        _send_request(sock, {"op": "ping"})[1].close()
+        return True
+    except Exception:
+        return False
+    finally:
+        sock.close()
+
+
+def stream_pcm(
+    text: str, socket_path: str = SOCKET_PATH, length_scale: Optional[float] = None
+) -> Tuple[dict, Iterator[bytes]]:
+    """
+    Minta daemon menyintesis `text` dan kembalikan (params, iterator potongan PCM).
+    params berisi sample_rate, sample_width, channels, nbytes.
+    length_scale (opsional) mengatur kecepatan bicara.
+    """
+    request = {"text": text, "mode": "pcm"}
+    if length_scale:
+        request["length_scale"] = length_scale
+    sock = _connect(socket_path, REQUEST_TIMEOUT)
+    try:
+        header, reader = _send_request(sock, request)
+    except Exception:
+        sock.close()
+        raise
+
+    def _chunks() -> Iterator[bytes]:
+        remaining = header["nbytes"]
+        try:
+            while remaining > 0:
+                chunk = reader.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    raise RuntimeError("koneksi daemon TTS terputus")
+                remaining -= len(chunk)
+                yield chunk
+        finally:
+            reader.close()
+            sock.close()
+
+    return header, _chunks()
+
+
+def request_pcm(text: str, socket_path: str = SOCKET_PATH) -> Tuple[dict, bytes]:
+    """
+    Versi non-streaming dari stream_pcm: return (params, seluruh PCM).
+    """
+    header, chunks = stream_pcm(text, socket_path)
+    return header, b"".join(chunks)
+
+
+def request_wav(text: str, audio_folder: Optional[str] = None, socket_path: str = SOCKET_PATH) -> str:
+    """
+    Minta daemon menulis file WAV dan return path-nya.
+    """
+    sock = _connect(socket_path, REQUEST_TIMEOUT)
+    try:
+        request = {"text": text, "mode": "wav"}
+        if audio_folder:
+            request["audio_folder"] = os.path.abspath(audio_folder)
+        header, reader = _send_request(sock, request)
+        reader.close()
+        return header["wav_path"]
+    finally:
+        sock.close()
+
+
+class RemoteVoice:
+    """
+    Pengganti PiperVoice di sisi klien. Punya method `synthesize_wav`
+    yang sama sehingga bisa langsung dipakai oleh tts_from_text.
+    """
+
+    def __init__(self, socket_path: str = SOCKET_PATH):
+        self.socket_path = socket_path
+
+    def synthesize_wav(self, text, wav_file, syn_config=None, **_kwargs):
+        length_scale = getattr(syn_config, "length_scale", None)
+        header, chunks = stream_pcm(text, self.socket_path, length_scale=length_scale)
+        wav_file.setnchannels(header["channels"])
+        wav_file.setsampwidth(header["sample_width"])
+        wav_file.setframerate(header["sample_rate"])
+        for chunk in chunks:
+            wav_file.writeframes(chunk)
+
+    def __repr__(self):
+        return f"RemoteVoice({self.socket_path!r})"
+
+
+def connect_service(socket_path: str = SOCKET_PATH) -> Optional[RemoteVoice]:
+    """
+    Return RemoteVoice bila daemon aktif dan tidak dinonaktifkan lewat
+    PIPER_TTS_SERVICE=0, selain itu None.
+    """
+    if not USE_SERVICE:
+        return None
+    if not is_service_available(socket_path):
+        return None
+    return RemoteVoice(socket_path)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Daemon Piper TTS via Unix socket.")
+    parser.add_argument("--socket", default=SOCKET_PATH, help="Path Unix socket.")
+    parser.add_argument(
+        "--max-queue",
+        type=int,
+        default=MAX_QUEUE,
+        help="Jumlah maksimum permintaan yang boleh antre.",
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    serve(args.socket, max_queue=max(args.max_queue, 1))
+
+
+if __name__ == "__main__":
+    main()
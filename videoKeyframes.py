@@ -0,0 +1,183 @@
+"""
+Pemilihan keyframe dari file video untuk pipeline batch.
+
+Video dibaca sebagai stream dengan OpenCV (frame demi frame, tidak dimuat
+seluruhnya). Perubahan adegan dinilai dengan selisih frame tervektorisasi
+pada thumbnail grayscale kecil:
+
+1. hanya sekitar VIDEO_SAMPLE_FPS frame per detik yang di-decode penuh
+   (cap.retrieve); frame lain cukup cap.grab() sehingga tidak dikonversi
+2. frame sampel diperkecil ke lebar VIDEO_ANALYSIS_WIDTH, grayscale, float32
+3. skor = rata-rata |thumbnail - thumbnail keyframe terakhir| (0-1)
+4. keyframe bila skor >= VIDEO_KEYFRAME_THRESHOLD dan jarak dari keyframe
+   terakhir >= VIDEO_MIN_KEYFRAME_GAP_SEC, atau bila VIDEO_MAX_KEYFRAME_GAP_SEC
+   terlampaui (0 = tidak dipaksa). Frame pertama selalu keyframe.
+
+Dibandingkan dengan keyframe terakhir (bukan frame sebelumnya) supaya
+perubahan pelan saat berjalan tetap terakumulasi.
+
+Konfigurasi:
+    VIDEO_SAMPLE_FPS            : frame yang dinilai per detik video (default 5)
+    VIDEO_ANALYSIS_WIDTH        : lebar thumbnail penilaian (default 64)
+    VIDEO_KEYFRAME_THRESHOLD    : ambang perubahan adegan (default 0.12)
+    VIDEO_MIN_KEYFRAME_GAP_SEC  : jarak minimum antar-keyframe (default 2)
+    VIDEO_MAX_KEYFRAME_GAP_SEC  : paksa keyframe setelah selang ini (default 0 = tidak)
+
+Coba langsung (tanpa vision, hanya daftar keyframe):
+    python videoKeyframes.py rekaman.mp4
+"""
+
+import os
+import sys
+import time
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+SAMPLE_FPS = float(os.getenv("VIDEO_SAMPLE_FPS", "5"))
+ANALYSIS_WIDTH = int(os.getenv("VIDEO_ANALYSIS_WIDTH", "64"))
+KEYFRAME_THRESHOLD = float(os.getenv("VIDEO_KEYFRAME_THRESHOLD", "0.12"))
+MIN_KEYFRAME_GAP_SEC = float(os.getenv("VIDEO_MIN_KEYFRAME_GAP_SEC", "2"))
+MAX_KEYFRAME_GAP_SEC = float(os.getenv("VIDEO_MAX_KEYFRAME_GAP_SEC", "0"))
+
+
+@dataclass
+class Keyframe:
+    index: int          # nomor frame di video (mulai 0)
+    timestamp: float    # detik sejak awal video
+    score: float        # selisih terhadap keyframe sebelumnya (1.0 untuk frame pertama)
+    frame: object       # frame BGR resolusi penuh
+
+
+@dataclass
+class KeyframeStats:
+    total_frames: int = 0
+    frames_scored: int = 0
+    keyframes: int = 0
+    fps: float = 0.0
+    decode_seconds: float = 0.0
+    scoring_seconds: float = 0.0
+
+    @property
+    def frames_skipped(self) -> int:
+        return self.total_frames - self.keyframes
+
+    @property
+    def duration_seconds(self) -> float:
+        return self.total_frames / self.fps if self.fps else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "total_frames": self.total_frames,
+            "frames_scored": self.frames_scored,
+            "frames_skipped": self.frames_skipped,
+            "keyframes": self.keyframes,
+            "video_fps": self.fps,
+            "video_duration_seconds": self.duration_seconds,
+            "decode_seconds": self.decode_seconds,
+            "keyframe_scoring_seconds": self.scoring_seconds,
+        }
+
+
+def thumbnail(frame, width: int = ANALYSIS_WIDTH):
+    """Thumbnail grayscale float32 (0-1) untuk penilaian perubahan adegan."""
+    import cv2
+    import numpy as np
+
+    h, w = frame.shape[:2]
+    size = (width, max(round(h * width / w), 1))
+    gray = cv2.cvtColor(cv2.resize(frame, size, interpolation=cv2.INTER_AREA), cv2.COLOR_BGR2GRAY)
+    return gray.astype(np.float32) * (1.0 / 255.0)
+
+
+def change_score(reference, current) -> float:
+    """Rata-rata selisih absolut dua thumbnail (0 = identik, 1 = kebalikan total)."""
+    import numpy as np
+
+    return float(np.mean(np.abs(reference - current)))
+
+
+def iter_keyframes(
+    video_path: str,
+    stats: Optional[KeyframeStats] = None,
+    sample_fps: float = SAMPLE_FPS,
+    threshold: float = KEYFRAME_THRESHOLD,
+    min_gap: float = MIN_KEYFRAME_GAP_SEC,
+    max_gap: float = MAX_KEYFRAME_GAP_SEC,
+) -> Iterator[Keyframe]:
+    """
+    Generator keyframe dari video. `stats` (opsional) diisi selama iterasi,
+    lengkap setelah generator habis.
+    """
+    import cv2
+
+    stats = stats if stats is not None else KeyframeStats()
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise OSError(f"Video tidak bisa dibuka: {video_path}")
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    stats.fps = fps if fps and fps > 0 else 30.0
+    step = max(int(round(stats.fps / sample_fps)), 1) if sample_fps > 0 else 1
+
+    reference = None
+    last_key_ts = None
+    index = -1
+    try:
+        while True:
+            t0 = time.perf_counter()
+            if not cap.grab():
+                stats.decode_seconds += time.perf_counter() - t0
+                break
+            index += 1
+            stats.total_frames += 1
+            if index % step:
+                stats.decode_seconds += time.perf_counter() - t0
+                continue
+            ok, frame = cap.retrieve()
+            stats.decode_seconds += time.perf_counter() - t0
+            if not ok or frame is None:
+                continue
+
+            t1 = time.perf_counter()
+            timestamp = index / stats.fps
+            thumb = thumbnail(frame)
+            if reference is None:
+                score, is_key = 1.0, True
+            else:
+                score = change_score(reference, thumb)
+                gap = timestamp - last_key_ts
+                is_key = (score >= threshold and gap >= min_gap) or (max_gap > 0 and gap >= max_gap)
+            stats.frames_scored += 1
+            stats.scoring_seconds += time.perf_counter() - t1
+
+            if is_key:
+                reference, last_key_ts = thumb, timestamp
+                stats.keyframes += 1
+                yield Keyframe(index=index, timestamp=timestamp, score=score, frame=frame)
+    finally:
+        cap.release()
+
+
+def format_timestamp(seconds: float, separator: str = ",") -> str:
+    """Detik → HH:MM:SS,mmm (format SRT)."""
+    millis = int(round(seconds * 1000))
+    hours, millis = divmod(millis, 3_600_000)
+    minutes, millis = divmod(millis, 60_000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{millis:03d}"
+
+
+def main(argv: Optional[list] = None):
+    paths = argv if argv is not None else sys.argv[1:]
+    if not paths:
+        print("Pemakaian: python videoKeyframes.py video.mp4 [video2.mp4 ...]")
+        return
+    for path in paths:
+        stats = KeyframeStats()
+        for key in iter_keyframes(path, stats):
+            print(f"{format_timestamp(key.timestamp)}  frame {key.index:6d}  skor {key.score:.3f}")
+        for name, value in stats.as_dict().items():
+            print(f"{name}={value:.3f}" if isinstance(value, float) else f"{name}={value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Cache respons vision berbasis isi (content-addressed) dengan mode record/replay.
+
+Kunci = sha256(byte gambar SETELAH preprocessing + prompt + model + opsi),
+sehingga gambar yang sama dengan anggaran token/crop yang sama selalu
+menghasilkan kunci yang sama, sedangkan perubahan prompt/model/opsi otomatis
+menjadi entri baru. Setiap entri disimpan sebagai satu file JSON
+(<kunci>.json) berisi respons Ollama utuh.
+
+Mode (VISION_CACHE_MODE):
+    off       : cache tidak dipakai (default; benchmark latensi dan pipeline live
+                selalu memanggil Ollama, dan capture kamera tidak pernah hit)
+    readwrite : hit dilayani dari disk tanpa HTTP, miss dipanggil lalu disimpan
+    record    : selalu panggil Ollama, respons disimpan/ditimpa
+    replay    : hanya dari disk; miss dianggap gagal (tanpa HTTP)
+
+Ukuran dibatasi VISION_CACHE_MAX_MB; entri yang paling lama tidak dipakai
+(mtime, disentuh saat hit) dihapus lebih dulu.
+
+Konfigurasi:
+    VISION_CACHE_MODE    : off | readwrite | record | replay (default off; batch
+                           runner/eksperimen memilih lewat --vision-cache)
+    VISION_CACHE_DIR     : lokasi cache (default ./vision_cache)
+    VISION_CACHE_MAX_MB  : batas ukuran total (default 50)
+
+Contoh:
+    python visionCache.py            # ringkasan isi cache
+    python visionCache.py --clear    # hapus semua entri
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Optional
+
+MODE_OFF = "off"
+MODE_READWRITE = "readwrite"
+MODE_RECORD = "record"
+MODE_REPLAY = "replay"
+MODES = (MODE_OFF, MODE_READWRITE, MODE_RECORD, MODE_REPLAY)
+
+CACHE_MODE = os.getenv("VISION_CACHE_MODE", MODE_OFF).lower()
+CACHE_DIR = os.getenv("VISION_CACHE_DIR", os.path.join(os.getcwd(), "vision_cache"))
+CACHE_MAX_MB = float(os.getenv("VISION_CACHE_MAX_MB", "50"))
+
+_lock = threading.Lock()
+
+
+def set_mode(mode: str) -> None:
+    """Ganti mode saat runtime (misal dari argumen CLI batch runner)."""
+    global CACHE_MODE
+    mode = mode.lower()
+    if mode not in MODES:
+        raise ValueError(f"Mode cache vision tidak dikenal: {mode} (pilihan: {', '.join(MODES)})")
+    CACHE_MODE = mode
+
+
+def cache_key(image_bytes: bytes, prompt: str, model: str, options: Optional[dict] = None) -> str:
+    digest = hashlib.sha256(image_bytes)
+    digest.update(b"\0")
+    digest.update(json.dumps({"prompt": prompt, "model": model, "options": options or {}},
+                             sort_keys=True).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _entry_path(key: str) -> str:
+    return os.path.join(CACHE_DIR, f"{key}.json")
+
+
+def lookup(key: str) -> Optional[dict]:
+    """Respons Ollama tersimpan untuk kunci ini, atau None. Hit menyentuh mtime (LRU)."""
+    if CACHE_MODE not in (MODE_READWRITE, MODE_REPLAY):
+        return None
+    path = _entry_path(key)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            entry = json.load(f)
+        os.utime(path)
+        return entry["response"]
+    except FileNotFoundError:
+        return None
+    except Exception as exc:
+        print(f"[WARN] Entri cache vision rusak ({exc}), diabaikan: {path}")
+        return None
+
+
+def store(key: str, response: dict, prompt: str, model: str, options: Optional[dict] = None) -> None:
+    """Simpan respons (mode readwrite/record) lalu pangkas cache ke batas ukuran."""
+    if CACHE_MODE not in (MODE_READWRITE, MODE_RECORD):
+        return
+    entry = {
+        "key": key,
+        "model": model,
+        "prompt": prompt,
+        "options": options or {},
+        "created_at": time.time(),
+        "response": response,
+    }
+    path = _entry_path(key)
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except Exception as exc:
+        print(f"[WARN] Gagal menyimpan cache vision: {exc}")
+        return
+    evict()
+
+
+def _entries():
+    try:
+        with os.scandir(CACHE_DIR) as it:
+            return [
+                (e.stat().st_mtime, e.stat().st_size, e.path)
+                for e in it if e.is_file() and e.name.endswith(".json")
+            ]
+    except FileNotFoundError:
+        return []
+
+
+def evict(max_mb: float = None) -> int:
+    """Hapus entri paling lama tidak dipakai sampai ukuran <= batas. Return jumlah yang dihapus."""
+    limit = int((CACHE_MAX_MB if max_mb is None else max_mb) * 1024 * 1024)
+    removed = 0
+    with _lock:
+        entries = sorted(_entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= limit:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                removed += 1
+            except FileNotFoundError:
+                pass
+    return removed
+
+
+def summary() -> dict:
+    entries = _entries()
+    return {
+        "mode": CACHE_MODE,
+        "dir": CACHE_DIR,
+        "entries": len(entries),
+        "size_mb": sum(size for _, size, _ in entries) / (1024 * 1024),
+        "max_mb": CACHE_MAX_MB,
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Ringkasan / pembersihan cache respons vision.")
+    parser.add_argument("--clear", action="store_true", help="Hapus semua entri cache.")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.clear:
+        removed = evict(max_mb=0)
+        print(f"[INFO] {removed} entri cache vision dihapus dari {CACHE_DIR}")
+        return
+    info = summary()
+    print(f"Cache vision ({info['mode']}): {info['dir']}")
+    print(f"  {info['entries']} entri, {info['size_mb']:.2f} / {info['max_mb']:g} MB")
+
+
+if __name__ == "__main__":
+    main()